@@ -0,0 +1,89 @@
+"""
+Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Alembic environment using the migration config of the db extension
+(app.extensions["migrate"]). Outside of an app context the app is created
+with the configuration file given by ISPYB_CONFIG.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from logging.config import fileConfig
+
+from alembic import context
+from flask import current_app, has_app_context
+
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def get_app():
+    """
+    Returns the app of the current context or a new app.
+
+    Returns:
+        Flask app: py-ispyb app
+    """
+    if has_app_context():
+        return current_app._get_current_object()  # pylint: disable=protected-access
+    from pyispyb import create_app  # pylint: disable=import-outside-toplevel
+
+    return create_app()
+
+
+def run_migrations_offline(app, migrate):
+    """
+    Renders the SQL of the migrations without connecting to the database.
+    """
+    context.configure(
+        url=app.config["SQLALCHEMY_DATABASE_URI"],
+        target_metadata=migrate.db.metadata,
+        literal_binds=True,
+        **migrate.configure_args
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online(app, migrate):
+    """
+    Runs the migrations on the database of the app.
+    """
+    with app.app_context():
+        engine = migrate.db.get_engine(app)
+        with engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=migrate.db.metadata,
+                **migrate.configure_args
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+ispyb_app = get_app()
+if context.is_offline_mode():
+    run_migrations_offline(ispyb_app, ispyb_app.extensions["migrate"])
+else:
+    run_migrations_online(ispyb_app, ispyb_app.extensions["migrate"])
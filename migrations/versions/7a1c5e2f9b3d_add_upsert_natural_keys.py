@@ -0,0 +1,54 @@
+"""Add unique indexes on the natural keys of the auto proc upserts
+
+Revision ID: 7a1c5e2f9b3d
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+PUT on /autoproc/programs, /autoproc/integrations and
+/autoproc/scaling_statistics upserts with these keys. Existing duplicates
+must be removed first, for example for AutoProcIntegration:
+
+    SELECT autoProcProgramId, dataCollectionId, COUNT(*)
+    FROM AutoProcIntegration
+    GROUP BY autoProcProgramId, dataCollectionId
+    HAVING COUNT(*) > 1;
+"""
+from alembic import op
+
+
+revision = "7a1c5e2f9b3d"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "AutoProcProgram_naturalKey",
+        "AutoProcProgram",
+        ["processingJobId"],
+        unique=True,
+    )
+    op.create_index(
+        "AutoProcIntegration_naturalKey",
+        "AutoProcIntegration",
+        ["autoProcProgramId", "dataCollectionId"],
+        unique=True,
+    )
+    op.create_index(
+        "AutoProcScalingStatistics_naturalKey",
+        "AutoProcScalingStatistics",
+        ["autoProcScalingId", "scalingStatisticsType"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "AutoProcScalingStatistics_naturalKey",
+        table_name="AutoProcScalingStatistics",
+    )
+    op.drop_index(
+        "AutoProcIntegration_naturalKey", table_name="AutoProcIntegration"
+    )
+    op.drop_index("AutoProcProgram_naturalKey", table_name="AutoProcProgram")
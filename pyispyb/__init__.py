@@ -78,6 +78,11 @@ def create_app(config_path=None, run_mode="dev", **kwargs):
 
     routes.init_app(app)
 
+    from pyispyb.app.extensions.api import api_v1
+    from pyispyb.app.extensions.policy import authorization_policy
+
+    authorization_policy.validate(api_v1.endpoints)
+
     # import ispyb_service_connector
     # ispyb_service_connector.check_service_connection(app.config["SERVICE_CONNECTIONS"])
 
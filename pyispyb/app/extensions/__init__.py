@@ -23,6 +23,8 @@ from .flask_sqlalchemy import SQLAlchemy
 from .report import report
 from .user_office import user_office
 from .authentication import authentication_provider
+from .cache import cache
+from .policy import authorization_policy
 from . import api
 
 __license__ = "LGPLv3+"
@@ -47,5 +49,13 @@ def init_app(app):
     Args:
         app (flask app): Flask application
     """
-    for extension in (api, authentication_provider, logging, db, user_office):
+    for extension in (
+        api,
+        authentication_provider,
+        authorization_policy,
+        logging,
+        db,
+        cache,
+        user_office,
+    ):
         extension.init_app(app)
@@ -0,0 +1,141 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Idempotent POST requests.
+
+Responses to POST requests with an Idempotency-Key header are kept for
+IDEMPOTENCY_KEY_TTL seconds. A retried request with the same key, path,
+credentials and payload gets the stored response instead of adding the
+item again. Responses are stored in the "idempotency" cache, which is
+shared by the worker processes if CACHE_BACKEND is "redis".
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import base64
+import hashlib
+
+from flask import Response, current_app, request
+from flask_restx import abort
+from flask_restx._http import HTTPStatus
+
+from pyispyb.app.extensions.cache import cache
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def get_idempotency_cache():
+    """
+    Returns stored responses.
+
+    Returns:
+        TTLCache or RedisCache: cache of {"payload": str, "response": dict}
+    """
+    return cache.get_cache(
+        "idempotency",
+        current_app.config.get("IDEMPOTENCY_KEY_TTL", 86400),
+        current_app.config.get("IDEMPOTENCY_CACHE_SIZE", 10000),
+    )
+
+
+def _hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def dispatch_idempotent(dispatch):
+    """
+    Dispatches POST request once per Idempotency-Key.
+
+    The key is reserved before the request is dispatched, so concurrent
+    retries get 409 Conflict. A reservation of a worker which died expires
+    after IDEMPOTENCY_LOCK_TTL seconds.
+
+    Args:
+        dispatch (callable): returns flask response of the request
+
+    Returns:
+        flask.Response: response of the first request with the key
+    """
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not idempotency_key:
+        return dispatch()
+
+    responses = get_idempotency_cache()
+    cache_key = _hash(
+        "\n".join(
+            (request.headers.get("Authorization", ""), request.path, idempotency_key)
+        ).encode()
+    )
+    payload_hash = _hash(request.get_data())
+    if not responses.add(
+        cache_key,
+        {"payload": payload_hash, "response": None},
+        ttl=current_app.config.get("IDEMPOTENCY_LOCK_TTL", 60),
+    ):
+        cached_entry = responses.get(cache_key) or {
+            "payload": payload_hash,
+            "response": None,
+        }
+        if cached_entry["payload"] != payload_hash:
+            abort(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                "%s %s was used with another payload"
+                % (IDEMPOTENCY_HEADER, idempotency_key),
+            )
+        if cached_entry["response"] is None:
+            abort(
+                HTTPStatus.CONFLICT,
+                "Request with %s %s is in progress"
+                % (IDEMPOTENCY_HEADER, idempotency_key),
+            )
+        stored = cached_entry["response"]
+        resp = Response(
+            base64.b64decode(stored["body"]),
+            status=stored["status"],
+            headers=[tuple(header) for header in stored["headers"]],
+        )
+        resp.headers[REPLAYED_HEADER] = "true"
+        return resp
+
+    try:
+        resp = dispatch()
+    except Exception:
+        # Failed requests can be retried with the same key
+        responses.pop(cache_key)
+        raise
+
+    if resp.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        responses.pop(cache_key)
+    else:
+        responses.set(
+            cache_key,
+            {
+                "payload": payload_hash,
+                "response": {
+                    "body": base64.b64encode(resp.get_data()).decode(),
+                    "status": resp.status_code,
+                    "headers": [list(header) for header in resp.headers],
+                },
+            },
+        )
+    return resp
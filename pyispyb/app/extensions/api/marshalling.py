@@ -0,0 +1,76 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from functools import wraps
+
+from flask import current_app, has_request_context, request
+from flask_restx.marshalling import marshal, marshal_with
+from flask_restx.utils import unpack
+from werkzeug.wrappers import BaseResponse
+
+
+class marshal_with_fields(marshal_with):
+    # pylint: disable=invalid-name,too-few-public-methods
+    """
+    Extended marshal_with decorator.
+
+    Query parameter ``fields`` (for example ?fields=sessionId,startDate) is
+    used as marshalling mask, so the response contains just the same fields
+    that were loaded from the database. The mask header keeps working as in
+    flask-restx. Responses (for example 204 No Content) are not marshalled.
+    """
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            resp = func(*args, **kwargs)
+            if isinstance(resp, BaseResponse):
+                return resp
+            mask = self.mask
+            if has_request_context():
+                mask_header = current_app.config["RESTX_MASK_HEADER"]
+                mask = (
+                    request.args.get("fields")
+                    or request.headers.get(mask_header)
+                    or mask
+                )
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return (
+                    marshal(
+                        data,
+                        self.fields,
+                        self.envelope,
+                        self.skip_none,
+                        mask,
+                        self.ordered,
+                    ),
+                    code,
+                    headers,
+                )
+            return marshal(
+                resp, self.fields, self.envelope, self.skip_none, mask, self.ordered
+            )
+
+        return wrapper
@@ -31,8 +31,10 @@ import sqlalchemy
 
 from flask_restx import Namespace as BaseNamespace
 from flask_restx._http import HTTPStatus
+from flask_restx.utils import merge
 
 from . import http_exceptions
+from .marshalling import marshal_with_fields
 from .webargs_parser import CustomWebargsParser
 
 
@@ -90,3 +92,28 @@ class Namespace(BaseNamespace):
             if name.endswith("Schema"):
                 name = name[: -len("Schema")]
         return super(Namespace, self).model(name=name, model=model, **kwargs)
+
+    def marshal_with(
+        self, fields, as_list=False, code=HTTPStatus.OK, description=None, **kwargs
+    ):
+        # pylint: disable=arguments-differ
+        """
+        A decorator specifying the fields to use for serialization.
+
+        Same as in flask-restx, but the ``fields`` query parameter is used
+        as marshalling mask (see marshal_with_fields).
+        """
+
+        def wrapper(func):
+            doc = {
+                "responses": {
+                    str(code): (description, [fields], kwargs)
+                    if as_list
+                    else (description, fields, kwargs)
+                },
+                "__mask__": kwargs.get("mask", True),
+            }
+            func.__apidoc__ = merge(getattr(func, "__apidoc__", {}), doc)
+            return marshal_with_fields(fields, ordered=self.ordered, **kwargs)(func)
+
+        return wrapper
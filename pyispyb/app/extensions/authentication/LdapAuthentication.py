@@ -18,11 +18,20 @@ You should have received a copy of the GNU Lesser General Public License
 along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import hashlib
+import hmac
 import logging
+
 import ldap
+from ldap.dn import escape_dn_chars
 
 from flask import current_app
 from pyispyb.app.extensions.authentication.AbstractAuthentication import AbstractAuthentication
+from pyispyb.app.extensions.authentication.connection_pool import (
+    ConnectionPool,
+    PoolTimeout,
+)
+from pyispyb.app.extensions.cache import cache
 
 
 __license__ = "LGPLv3+"
@@ -31,20 +40,98 @@ __license__ = "LGPLv3+"
 log = logging.getLogger(__name__)
 
 
+# Roles granted to users of the LDAP bases, in the order they are tried
+LDAP_BASE_ROLES = (
+    ("LDAP_BASE_INTERNAL", "manager"),
+    ("LDAP_BASE_EXTERNAL", "user"),
+)
+
+
 class LdapAuthentication(AbstractAuthentication):
+    """
+    Authenticates users by binding to LDAP.
+
+    Users of LDAP_BASE_INTERNAL get the manager role, users of
+    LDAP_BASE_EXTERNAL the user role. Connections are pooled, at most
+    LDAP_POOL_SIZE logins talk to LDAP at once. Roles of valid credentials
+    are cached LDAP_CACHE_TTL seconds, failed credentials (unknown users
+    or wrong passwords) LDAP_NEGATIVE_CACHE_TTL seconds.
+    """
+
     def __init__(self):
         AbstractAuthentication.__init__(self)
 
-        self.ldap_conn = None
+        self.ldap_uri = None
+        self.ldap_timeout = None
+        self.pool = None
 
     def init_app(self, app):
         """
-        Initializes ldap connection
+        Initializes ldap connection pool
 
         Args:
             app (flask app): current flask app
         """
-        self.ldap_conn = ldap.initialize(app.config["LDAP_URI"])
+        self.ldap_uri = app.config["LDAP_URI"]
+        self.ldap_timeout = app.config.get("LDAP_TIMEOUT", 5)
+        if self.pool is not None:
+            self.pool.clear()
+        self.pool = ConnectionPool(
+            self.connect,
+            size=app.config.get("LDAP_POOL_SIZE", 10),
+            timeout=app.config.get("LDAP_POOL_TIMEOUT", 10),
+            close=lambda conn: conn.unbind_s(),
+        )
+
+    def connect(self):
+        """
+        Opens ldap connection.
+
+        Returns:
+            [type]: ldap connection
+        """
+        conn = ldap.initialize(self.ldap_uri)
+        conn.set_option(ldap.OPT_NETWORK_TIMEOUT, self.ldap_timeout)
+        conn.set_option(ldap.OPT_TIMEOUT, self.ldap_timeout)
+        return conn
+
+    @staticmethod
+    def get_roles_cache():
+        """
+        Returns cache of the roles of the credentials.
+
+        Returns:
+            TTLCache or RedisCache: cache
+        """
+        return cache.get_cache(
+            "ldap_roles",
+            current_app.config.get("LDAP_CACHE_TTL", 60),
+            current_app.config.get("USER_CACHE_SIZE", 10000),
+        )
+
+    @staticmethod
+    def get_credentials_key(username, password):
+        """
+        Returns cache key of the credentials.
+
+        The password is hashed with the app secret key, so it can not be
+        recovered from the cache.
+
+        Args:
+            username (str): user name
+            password (str): password
+
+        Returns:
+            str: key
+        """
+        secret_key = current_app.config["SECRET_KEY"]
+        if not isinstance(secret_key, bytes):
+            secret_key = secret_key.encode()
+        return hmac.new(
+            secret_key,
+            ("%s\0%s" % (username, password)).encode(),
+            hashlib.sha256,
+        ).hexdigest()
 
     def get_roles(self, username, password):
         """
@@ -57,62 +144,88 @@ class LdapAuthentication(AbstractAuthentication):
         Returns:
             list: [list of roles as strings
         """
-        roles = []
-        search_filter = "(uid=%s)" % username
-        attrs = ["*"]
+        if not username or not password:
+            # Bind without password would be an anonymous bind
+            return []
+
+        roles_cache = self.get_roles_cache()
+        key = self.get_credentials_key(username, password)
+        roles = roles_cache.get(key)
+        if roles is not None:
+            log.debug("LDAP login: cached roles of user %s" % username)
+            return list(roles)
 
         try:
-            msg = "LDAP login: try to authenticate user %s as internal user" % username
-            log.debug(msg)
-            search_str = (
-                "uid=" + username + "," + current_app.config["LDAP_BASE_INTERNAL"]
-            )
-            self.ldap_conn.simple_bind_s(search_str, password)
-            result = self.ldap_conn.search_s(
-                current_app.config["LDAP_BASE_INTERNAL"],
-                ldap.SCOPE_ONELEVEL,
-                search_filter,
-                attrs,
-            )
-            if result:
-                roles.append("manager")
-                msg = (
-                    "LDAP login: user %s authenticated as internal user (manager role)"
-                    % username
-                )
-                log.debug(msg)
-        except ldap.INVALID_CREDENTIALS as ex:
+            roles = self.bind_roles(username, password)
+        except PoolTimeout as ex:
+            log.error("LDAP login: unable to authenticate user %s (%s)" % (
+                username,
+                str(ex),
+            ))
+            return []
+        except ldap.LDAPError as ex:
             msg = "LDAP login: unable to authenticate user %s (%s)" % (
                 username,
                 str(ex),
             )
             log.exception(msg)
+            return []
 
-        try:
-            msg = "LDAP login: try to authenticate user %s as external user" % username
-            log.debug(msg)
-            search_str = (
-                "uid=" + username + "," + current_app.config["LDAP_BASE_EXTERNAL"]
+        if roles:
+            roles_cache.set(key, roles)
+        else:
+            roles_cache.set(
+                key, roles, ttl=current_app.config.get("LDAP_NEGATIVE_CACHE_TTL", 30)
             )
-            self.ldap_conn.simple_bind_s(search_str, password)
-            result = self.ldap_conn.search_s(
-                current_app.config["LDAP_BASE_EXTERNAL"],
-                ldap.SCOPE_ONELEVEL,
-                search_filter,
-                attrs,
+        return roles
+
+    def bind_roles(self, username, password):
+        """
+        Binds as the user in each LDAP base.
+
+        A successful bind with a password proves that the user exists in
+        the base, so no search is needed. An idle connection closed by the
+        server is replaced once.
+
+        Args:
+            username (str): user name
+            password (str): password
+
+        Returns:
+            list: [list of roles as strings
+        """
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as conn:
+                    return self._bind_roles(conn, username, password)
+            except ldap.SERVER_DOWN:
+                if attempt:
+                    raise
+        return []
+
+    @staticmethod
+    def _bind_roles(conn, username, password):
+        roles = []
+        for base_key, role in LDAP_BASE_ROLES:
+            base = current_app.config[base_key]
+            log.debug(
+                "LDAP login: try to authenticate user %s in %s" % (username, base)
             )
-            if result:
-                roles.append("user")
-                msg = (
-                    "LDAP login: user %s authenticated as external user (user role)"
-                    % username
+            try:
+                conn.simple_bind_s(
+                    "uid=%s,%s" % (escape_dn_chars(username), base), password
                 )
-                log.debug(msg)
-        except ldap.INVALID_CREDENTIALS as ex:
-            msg = "LDAP login: unable to authenticate user %s (%s)" % (
+            except (ldap.INVALID_CREDENTIALS, ldap.NO_SUCH_OBJECT) as ex:
+                log.debug("LDAP login: unable to authenticate user %s in %s (%s)" % (
+                    username,
+                    base,
+                    str(ex),
+                ))
+                continue
+            roles.append(role)
+            log.debug("LDAP login: user %s authenticated in %s (%s role)" % (
                 username,
-                str(ex),
-            )
-            log.exception(msg)
-
+                base,
+                role,
+            ))
         return roles
@@ -20,13 +20,17 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 import datetime
+import hashlib
 import importlib
+import time
 from functools import wraps
 
 import jwt
 from flask import current_app, request
 from flask_restx._http import HTTPStatus
 
+from pyispyb.app.extensions.cache import cache
+
 
 __license__ = "LGPLv3+"
 
@@ -75,26 +79,69 @@ class AuthenticationProvider:
             dict: {"username": "", "roles": [], "is_admin": bool}
         """
         user_info = {}
-        token = None
 
         try:
             parts = auth_header.split()
-            token = parts[1]
-            if current_app.config.get("MASTER_TOKEN") == token:
-                user_info["sub"] = "MasterToken"
-                #user_info["roles"] = current_app.config.get("ADMIN_ROLES")
-                user_info["roles"] = ["manager"]
-            else:
-                user_info, msg = decode_token(token)
+            user_info, msg = self.get_user_info_from_token(parts[1])
+            if not user_info:
+                raise ValueError(msg)
+        except BaseException as ex:
+            print("Unable to extract token from Authorization header (%s)" % str(ex))
+
+        return user_info
+
+    def get_user_info_from_token(self, token):
+        """
+        Returns user info of the token.
+
+        Decoded JWTs are cached until they expire, at most USER_CACHE_TTL
+        seconds.
+
+        Args:
+            token (str): master token or JWT
+
+        Returns:
+            tuple: (user info dict with is_admin, error message)
+        """
+        if current_app.config.get("MASTER_TOKEN") == token:
+            user_info, msg = {"sub": "MasterToken", "roles": ["manager"]}, None
+        else:
+            token_cache = cache.get_cache(
+                "token_claims",
+                current_app.config.get("USER_CACHE_TTL", 300),
+                current_app.config.get("USER_CACHE_SIZE", 10000),
+            )
+            token_hash = hashlib.sha256(token.encode()).hexdigest()
+            user_info = token_cache.get(token_hash)
+            if user_info is not None:
+                return dict(user_info), None
+            user_info, msg = decode_token(token)
+        if user_info:
             user_info["is_admin"] = any(
                 role in current_app.config.get("ADMIN_ROLES", [])
-                for role in user_info["roles"]
+                for role in user_info.get("roles", [])
             )
+            if "exp" in user_info:
+                token_cache.set(
+                    token_hash, dict(user_info), ttl=user_info["exp"] - time.time()
+                )
+        return user_info, msg
 
-        except BaseException as ex:
-            print("Unable to extract token from Authorization header (%s)" % str(ex))
+    def get_request_user_info(self):
+        """
+        Returns user info of the current request.
 
-        return user_info
+        The Authorization header is decoded once per request, by
+        authentication_required or by the first call.
+
+        Returns:
+            dict: {"sub": "", "roles": [], "is_admin": bool}
+        """
+        if not hasattr(request, "user_info"):
+            request.user_info = self.get_user_info_from_auth_header(
+                request.headers.get("Authorization")
+            )
+        return request.user_info
 
     def generate_token(self, username, roles):
         """
@@ -202,15 +249,12 @@ def authentication_required(func):
 
         token = parts[1]
 
-        if current_app.config.get("MASTER_TOKEN"):
-            if current_app.config["MASTER_TOKEN"] == token:
-                current_app.logger.info("Master token validated")
-                return func(*args, **kwargs)
-
-        user_info, msg = decode_token(token)
+        user_info, msg = authentication_provider.get_user_info_from_token(token)
         if not user_info:
             return {"message": msg}, HTTPStatus.UNAUTHORIZED
-        else:
-            return func(*args, **kwargs)
+        if current_app.config.get("MASTER_TOKEN") == token:
+            current_app.logger.info("Master token validated")
+        request.user_info = user_info
+        return func(*args, **kwargs)
 
     return decorated
\ No newline at end of file
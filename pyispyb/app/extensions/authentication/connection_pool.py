@@ -0,0 +1,113 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Pool of connections to an authentication server.
+
+Each connection is used by one thread (or greenlet) at a time. A bounded
+semaphore limits the number of connections in use, further callers wait
+up to the pool timeout. The pool only uses threading and queue primitives,
+which gevent monkey patching makes cooperative.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable connections.
+
+    Attributes:
+        size (int): maximal number of connections in use
+        timeout (float): seconds to wait for a free connection
+    """
+
+    def __init__(self, connect, size=10, timeout=10, close=None):
+        """
+        Args:
+            connect (callable): returns a new connection
+            size (int, optional): maximal number of connections in use
+            timeout (float, optional): seconds to wait for a free connection
+            close (callable, optional): closes a discarded connection
+        """
+        self._connect = connect
+        self._close_connection = close
+        self.size = size
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a connection.
+
+        The connection is discarded if the block raises, so a broken
+        connection is not reused.
+
+        Raises:
+            PoolTimeout: if all connections stay in use for timeout seconds
+
+        Yields:
+            [type]: connection
+        """
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                "No connection available after %s seconds" % self.timeout
+            )
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except BaseException:
+                self._close(conn)
+                raise
+            self._idle.put(conn)
+        finally:
+            self._semaphore.release()
+
+    def clear(self):
+        """
+        Closes idle connections.
+        """
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def _close(self, conn):
+        if self._close_connection is not None:
+            try:
+                self._close_connection(conn)
+            except Exception:  # pylint: disable=broad-except
+                pass
@@ -24,11 +24,11 @@ import importlib
 from functools import wraps
 
 import jwt
-from flask import current_app, request
+from flask import request
 from flask_restx._http import HTTPStatus
 
-from pyispyb.app.extensions.authentication import authentication_provider
-from pyispyb.core.modules import contacts, proposal
+from pyispyb.app.extensions.policy import authorization_policy
+from pyispyb.core.modules import contacts
 
 
 __license__ = "LGPLv3+"
@@ -42,7 +42,8 @@ def authorization_required(func):
     Checks if user has role required to access the given resource.
 
     Authorization is done via AUTHORIZATION_RULES dictionary that contains
-    mapping of endpoints with user groups. For example:
+    mapping of endpoints with user groups, compiled at startup into role
+    bitmasks (see AuthorizationPolicy). For example:
 
     AUTHORIZATION_RULES = {
         "proposals": {
@@ -53,7 +54,7 @@ def authorization_required(func):
     define that method GET of endpoint proposals is available for all user groups
     and method POST is accessible just for admin group.
     If an endpoint is not defined in the AUTHORIZATION_RULES then it is available
-    for all user groups.
+    just for the manager group.
 
     Args:
         func (function): function
@@ -70,33 +71,23 @@ def authorization_required(func):
         Returns:
             [type]: [description]
         """
-        user_info = contacts.get_person_info(request)
-        print(user_info)
-
-        methods = current_app.config.get("AUTHORIZATION_RULES").get(self.endpoint, {})
-        # If no role is defined then just manager is allowed to access the resource
-        roles = methods.get(func.__name__, ["manager"])
-        
+        user = contacts.get_user_context()
+        user_mask = authorization_policy.get_user_mask(user.roles)
 
         user_allowed = False
         msg = "User %s is not to allowed to access the resource %s. " % (
-            user_info.get("sub"),
+            user.username,
             str(self.endpoint)
         )
 
-        if user_info["is_admin"]:
+        if user.is_admin:
             user_allowed = True
-        elif (
-            not roles
-            or "all" in roles
-            or any(role in list(roles) for role in list(user_info.get("roles", [])))
-        ):
+        elif authorization_policy.is_allowed(self.endpoint, func.__name__, user_mask):
 
             proposal_id = int(request.headers.get("proposal_id"))
-            proposal_ids = proposal.get_proposal_ids(request)
             if not proposal_id:
                 msg += "No proposal_id in header"
-            elif proposal_id not in proposal_ids:
+            elif proposal_id not in user.proposal_ids:
                 msg += "Proposal with id %d not associated with the user" % proposal_id
             else:
                 user_allowed = True
@@ -0,0 +1,317 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Caches.
+
+Entries expire after a time to live. Caches are kept in memory per worker
+process, or shared by all processes in Redis if CACHE_BACKEND is "redis".
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread safe cache with time to live and maximal size.
+
+    When the cache is full, the least recently set entry is dropped.
+
+    Attributes:
+        ttl (float): time to live of the entries in seconds
+        maxsize (int): maximal number of entries
+    """
+
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _set(self, key, value, now, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (now + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        """
+        Returns cached value.
+
+        Args:
+            key ([type]): hashable key
+            default ([type], optional): returned if the key is not cached
+
+        Returns:
+            [type]: value
+        """
+        with self._lock:
+            entry = self._get(key, time.monotonic())
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None):
+        """
+        Caches value.
+
+        Args:
+            key ([type]): hashable key
+            value ([type]): value
+            ttl (float, optional): shorter time to live of the entry
+        """
+        with self._lock:
+            self._set(key, value, time.monotonic(), ttl)
+
+    def setdefault(self, key, value):
+        """
+        Caches value if the key is not cached.
+
+        Args:
+            key ([type]): hashable key
+            value ([type]): value
+
+        Returns:
+            [type]: cached value, value if it was not cached
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get(key, now)
+            if entry is not None:
+                return entry[1]
+            self._set(key, value, now)
+            return value
+
+    def add(self, key, value, ttl=None):
+        """
+        Caches value if the key is not cached.
+
+        Args:
+            key ([type]): hashable key
+            value ([type]): value
+            ttl (float, optional): shorter time to live of the entry
+
+        Returns:
+            bool: True if the value was cached
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._get(key, now) is not None:
+                return False
+            self._set(key, value, now, ttl)
+            return True
+
+    def pop(self, key, default=None):
+        """
+        Removes key from the cache.
+
+        Args:
+            key ([type]): hashable key
+            default ([type], optional): returned if the key is not cached
+
+        Returns:
+            [type]: removed value
+        """
+        with self._lock:
+            entry = self._get(key, time.monotonic())
+            self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """
+    Cache shared by the worker processes, stored in Redis.
+
+    Keys are strings, values are stored as JSON.
+
+    Attributes:
+        prefix (str): prefix of the Redis keys
+        ttl (float): time to live of the entries in seconds
+    """
+
+    def __init__(self, client, prefix, ttl):
+        self._client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        """
+        Returns cached value.
+
+        Args:
+            key (str): key
+            default ([type], optional): returned if the key is not cached
+
+        Returns:
+            [type]: value
+        """
+        value = self._client.get(self.prefix + key)
+        return default if value is None else json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """
+        Caches value.
+
+        Args:
+            key (str): key
+            value ([type]): JSON serializable value
+            ttl (float, optional): shorter time to live of the entry
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._client.set(
+            self.prefix + key, json.dumps(value), ex=max(1, math.ceil(ttl))
+        )
+
+    def add(self, key, value, ttl=None):
+        """
+        Caches value if the key is not cached, atomically (SET NX).
+
+        Args:
+            key (str): key
+            value ([type]): JSON serializable value
+            ttl (float, optional): shorter time to live of the entry
+
+        Returns:
+            bool: True if the value was cached
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        return bool(
+            self._client.set(
+                self.prefix + key,
+                json.dumps(value),
+                ex=max(1, math.ceil(ttl)),
+                nx=True,
+            )
+        )
+
+    def pop(self, key, default=None):
+        """
+        Removes key from the cache.
+
+        Args:
+            key (str): key
+            default ([type], optional): returned if the key is not cached
+
+        Returns:
+            [type]: removed value
+        """
+        value = self.get(key, default)
+        self._client.delete(self.prefix + key)
+        return value
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        keys = list(self._client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class Cache:
+    """
+    Named caches of the application.
+
+    CACHE_BACKEND selects where the caches are kept: "memory" (default)
+    or "redis", using CACHE_REDIS_URL. redis is an optional dependency.
+    """
+
+    def __init__(self):
+        self.backend = "memory"
+        self._redis = None
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Initializes cache backend.
+
+        Args:
+            app (flask app): Flask application
+
+        Raises:
+            ValueError: if CACHE_BACKEND is not known
+        """
+        self.backend = app.config.get("CACHE_BACKEND", "memory")
+        if self.backend == "redis":
+            import redis  # pylint: disable=import-outside-toplevel
+
+            self._redis = redis.Redis.from_url(app.config["CACHE_REDIS_URL"])
+        elif self.backend != "memory":
+            raise ValueError("Unknown CACHE_BACKEND %s" % self.backend)
+        self._caches = {}
+
+    def get_cache(self, name, ttl, maxsize=1024, memory_ttl=None):
+        """
+        Returns named cache, created on first use.
+
+        Entries of in memory caches are cleared just in the process doing
+        the invalidation. Caches which must not stay stale in the other
+        processes pass a shorter memory_ttl.
+
+        Args:
+            name (str): cache name
+            ttl (float): time to live of the entries in seconds
+            maxsize (int, optional): maximal size of in memory caches
+            memory_ttl (float, optional): maximal time to live of the
+                entries of in memory caches
+
+        Returns:
+            TTLCache or RedisCache: cache
+        """
+        with self._lock:
+            if name not in self._caches:
+                if self._redis is not None:
+                    self._caches[name] = RedisCache(
+                        self._redis, "pyispyb:%s:" % name, ttl
+                    )
+                else:
+                    if memory_ttl is not None:
+                        ttl = min(ttl, memory_ttl)
+                    self._caches[name] = TTLCache(ttl, maxsize)
+            return self._caches[name]
+
+
+cache = Cache()
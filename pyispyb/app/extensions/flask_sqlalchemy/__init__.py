@@ -22,18 +22,150 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 __license__ = "LGPLv3+"
 
 
+import json
+import logging
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 
 from flask_restx import abort
 from flask_restx._http import HTTPStatus
 
 
-from flask import current_app
+from flask import (
+    Response,
+    current_app,
+    has_request_context,
+    request,
+    stream_with_context,
+)
 import sqlalchemy
+from sqlalchemy import orm
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import load_only
 from flask_sqlalchemy import SQLAlchemy as BaseSQLAlchemy
 
 from pyispyb.app.utils import create_response_item
 
+from .bulk_insert import (
+    get_insert_chunks,
+    get_inserted_ids,
+    has_consecutive_ids,
+    is_autoincrement,
+)
+from .etag import (
+    CHECKSUM_DIALECTS,
+    check_etag,
+    get_checksum,
+    make_etag,
+    register_checksum_function,
+)
+from .filters import (
+    OPERATOR_SEPARATOR,
+    convert_value,
+    get_filter_clause,
+    parse_filter_key,
+)
+from .formats import (
+    ARROW_MIMETYPE,
+    COLUMNAR_MIMETYPES,
+    COLUMNS_JSON_MIMETYPE,
+    JSON_MIMETYPE,
+    NDJSON_MIMETYPE,
+    add_vary_accept,
+    columns_to_arrow_stream,
+    columns_to_json,
+    get_response_format,
+)
+from .index_advisor import (
+    IndexAdvisor,
+    get_index_name,
+    is_column_indexed,
+    render_migration,
+)
+from .instrumentation import add_server_timing, register_engine_events
+from .pagination import decode_cursor, encode_cursor, keyset_filter
+from .pool import InstrumentedQueuePool, get_pool_status
+from .replicas import (
+    Replica,
+    ReplicaSet,
+    RoutingSession,
+    add_sticky_cookie,
+    get_primary_until,
+)
+from .serializers import get_serializer
+from .scoping import get_scope_clause
+from .slow_queries import SlowQueryLog
+from .upsert import UPSERT_DIALECTS, get_unique_keys, get_upsert_statement
+
+
+log = logging.getLogger(__name__)
+
+
+def prefers_minimal_return():
+    """
+    Returns True if the client asked for no representation in the response.
+
+    Returns:
+        bool: True if the request has header "Prefer: return=minimal"
+    """
+    if not has_request_context():
+        return False
+    preferences = request.headers.get("Prefer", "").replace(";", ",").split(",")
+    return "return=minimal" in [
+        preference.strip().replace(" ", "") for preference in preferences
+    ]
+
+
+def minimal_response():
+    """
+    Returns 204 No Content response applying "Prefer: return=minimal".
+
+    Returns:
+        flask.Response: response
+    """
+    return Response(
+        status=HTTPStatus.NO_CONTENT, headers={"Preference-Applied": "return=minimal"}
+    )
+
+
+@lru_cache(maxsize=256)
+def get_restricted_schema(ma_schema_class, fields):
+    """
+    Returns marshmallow schema dumping just the given fields.
+
+    Schemas are cached, so they are not rebuilt on every request.
+
+    Args:
+        ma_schema_class ([type]): marshmallow schema class
+        fields (tuple): field names
+
+    Returns:
+        marshmallow schema: schema instance
+    """
+    return ma_schema_class(only=fields)
+
+
+def reads_from_replica(method):
+    """
+    Runs the read helper with a read replica when one can be used.
+
+    Args:
+        method (function): SQLAlchemy extension method
+
+    Returns:
+        function: decorated method
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.read_replica():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
 
 class AlembicDatabaseMigrationConfig:
     """
@@ -80,6 +212,13 @@ class SQLAlchemy(BaseSQLAlchemy):
         )
         """
         super().__init__(*args, **kwargs)
+        self._replicas_lock = threading.Lock()
+        self.index_advisor = IndexAdvisor()
+        # Unique keys of the tables used by upsert_db_item, per engine url
+        self._unique_keys = {}
+        # True per engine url if one INSERT generates consecutive ids
+        self._consecutive_ids = {}
+        self._write_listeners = []
 
     def init_app(self, app):
         """
@@ -103,15 +242,284 @@ class SQLAlchemy(BaseSQLAlchemy):
             self, compare_type=True
         )
 
-    def get_db_items(self, sql_alchemy_model, dict_schema, ma_schema, query_dict):
+        register_engine_events()
+        register_checksum_function()
+        app.after_request(add_vary_accept)
+        if app.config.get("SERVER_TIMING", True):
+            app.after_request(add_server_timing)
+        if app.config.get("SQLALCHEMY_REPLICAS"):
+            app.after_request(add_sticky_cookie)
+        app.extensions["slow_query_log"] = SlowQueryLog(
+            app.config.get("SLOW_QUERY_THRESHOLD"),
+            app.config.get("SLOW_QUERY_HISTORY", 100),
+            app.config.get("SLOW_QUERY_LOG_PATH"),
+            app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 0),
+            app.config.get("SLOW_QUERY_LOG_BACKUP_COUNT", 0),
+        )
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        """
+        Applies DATABASE_POOL config to the engine options.
+
+        Connections are checked with a ping before they are used and
+        recycled before the server closes them, which avoids "MySQL server
+        has gone away" errors. Except for sqlite, InstrumentedQueuePool is
+        used, so the pool usage is reported by get_pool_status.
+
+        Args:
+            app ([type]): flask app
+            sa_url ([type]): database url
+            options (dict): create_engine arguments
+
+        Returns:
+            tuple: (sa_url, options)
+        """
+        pool_config = app.config.get("DATABASE_POOL", {})
+        options["pool_pre_ping"] = pool_config.get("pre_ping", True)
+        if pool_config.get("recycle") is not None:
+            options["pool_recycle"] = pool_config["recycle"]
+        if not sa_url.drivername.startswith("sqlite"):
+            options["poolclass"] = InstrumentedQueuePool
+            for option, key in (
+                ("pool_size", "size"),
+                ("max_overflow", "max_overflow"),
+                ("pool_timeout", "timeout"),
+            ):
+                if pool_config.get(key) is not None:
+                    options[option] = pool_config[key]
+        return super().apply_driver_hacks(app, sa_url, options)
+
+    def create_session(self, options):
+        """
+        Creates session factory of RoutingSession, which sends queries of
+        read helpers to a read replica.
+
+        Args:
+            options (dict): session arguments
+
+        Returns:
+            [type]: session factory
+        """
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def get_replica_set(self, app=None):
+        """
+        Returns read replicas of the app, engines are created on first use.
+
+        Args:
+            app ([type], optional): flask app. Defaults to current app.
+
+        Returns:
+            ReplicaSet: replicas or None if no replica is configured
+        """
+        app = self.get_app(app)
+        if not app.config.get("SQLALCHEMY_REPLICAS"):
+            return None
+        with self._replicas_lock:
+            if "sqlalchemy_replicas" not in app.extensions:
+                replicas = []
+                for replica_config in app.config["SQLALCHEMY_REPLICAS"]:
+                    if isinstance(replica_config, str):
+                        replica_config = {"uri": replica_config}
+                    options = self.apply_pool_defaults(app, {})
+                    sa_url, options = self.apply_driver_hacks(
+                        app, make_url(replica_config["uri"]), options
+                    )
+                    options.update(app.config["SQLALCHEMY_ENGINE_OPTIONS"])
+                    replicas.append(
+                        Replica(
+                            replica_config["uri"],
+                            self.create_engine(sa_url, options),
+                            replica_config.get(
+                                "max_lag", app.config["REPLICA_MAX_LAG"]
+                            ),
+                        )
+                    )
+                app.extensions["sqlalchemy_replicas"] = ReplicaSet(
+                    replicas, app.config["REPLICA_LAG_CHECK_INTERVAL"]
+                )
+        return app.extensions["sqlalchemy_replicas"]
+
+    def _choose_replica(self):
+        """
+        Returns replica for the read queries of the current request.
+
+        The primary database is used by requests other than GET, after the
+        request wrote some items and within REPLICA_STICKY_TIME after a
+        write of the same client (see replicas.get_primary_until), so
+        clients read their own writes.
+
+        Returns:
+            Replica: replica or None for the primary database
+        """
+        replica_set = self.get_replica_set()
+        if replica_set is None:
+            return None
+        if has_request_context():
+            if request.method not in ("GET", "HEAD"):
+                return None
+            if getattr(request, "db_primary", False):
+                return None
+            if time.time() < get_primary_until():
+                return None
+        return replica_set.choose()
+
+    @contextmanager
+    def read_replica(self):
+        """
+        Sends queries of the session to a read replica within the block.
+
+        Falls back to the primary database if no replica can be used.
+        """
+        replica = self._choose_replica()
+        if replica is None:
+            yield None
+            return
+        info = self.session.info
+        previous = info.get("replica")
+        info["replica"] = replica
+        try:
+            yield replica
+        finally:
+            info["replica"] = previous
+
+    def get_slow_queries(self):
+        """
+        Returns slow statements recorded by this worker, the latest first.
+
+        Returns:
+            dict: threshold and records
+        """
+        slow_query_log = current_app.extensions["slow_query_log"]
+        return {
+            "threshold": slow_query_log.threshold,
+            "records": slow_query_log.get_records(),
+        }
+
+    def get_index_suggestions(self, down_revision=None):
+        """
+        Returns indexes suggested from the filter and sort columns used.
+
+        Columns used at least INDEX_ADVISOR_MIN_USES times by this worker
+        and not indexed are suggested, with the estimated number of rows
+        of their table. The suggestions are rendered as an Alembic
+        revision script, which can be added to the migrations directory.
+
+        Args:
+            down_revision (str, optional): current head revision. Defaults to None.
+
+        Returns:
+            dict: {"suggestions": list, "migration": str}
+        """
+        suggestions = []
+        for sql_alchemy_model, column, uses in self.index_advisor.get_unindexed_usage(
+            current_app.config.get("INDEX_ADVISOR_MIN_USES", 1)
+        ):
+            suggestions.append(
+                {
+                    "model": sql_alchemy_model.__name__,
+                    "table": column.table.name,
+                    "column": column.name,
+                    "uses": uses,
+                    "estimated_rows": self._estimate_count(
+                        sql_alchemy_model, sql_alchemy_model.query, False
+                    ),
+                    "index_name": get_index_name(column),
+                }
+            )
+        return {
+            "suggestions": suggestions,
+            "migration": render_migration(suggestions, down_revision),
+        }
+
+    def get_pool_status(self):
+        """
+        Returns connection pool state and counters of this worker.
+
+        Replicas are listed with their pool state and last measured lag.
+
+        Returns:
+            dict: pool state
+        """
+        status = get_pool_status(self.engine.pool)
+        replica_set = self.get_replica_set()
+        if replica_set is not None:
+            status["replicas"] = [
+                dict(replica.get_status(), **get_pool_status(replica.engine.pool))
+                for replica in replica_set.replicas
+            ]
+        return status
+
+    @reads_from_replica
+    def get_db_items(
+        self,
+        sql_alchemy_model,
+        dict_schema,
+        ma_schema,
+        query_dict,
+        negotiate=False,
+        proposal_scope=None,
+        compiled=False,
+    ):
         """
         Returns resource based on the passed models and query parameter
 
+        If query_dict contains key "after" then keyset (cursor) pagination
+        is used instead of offset: items are ordered by primary key and
+        only items placed after the cursor are returned. Empty "after"
+        value returns the first page. The cursor of the next page is
+        returned as "next_cursor" (None if there are no more items).
+
+        Key "total" defines how the total number of items is computed:
+        "exact" (default) counts the items, "estimate" uses the database
+        statistics and "none" skips the count (total is None).
+
+        Key "fields" (comma separated list of dict_schema keys) restricts
+        the columns loaded from the database and the returned fields.
+
+        Key "ids" (comma separated list of primary key values) returns the
+        items with these ids, in the same order, selected by one IN query.
+        Ids without item are returned as "missing_ids".
+
+        Items are dumped by ma_schema. Routes opt into a serializer compiled
+        from dict_schema (see serializers) with compiled=True, so the rows
+        are not passed through marshmallow.
+
+        Keys of dict_schema filter items by equality. Operators are added
+        with "__", for example startTime__gte=2020-01-01 (see filters).
+
+        Key "sort" (comma separated list of dict_schema keys, "-" prefix for
+        descending order) orders the items. The cursor of keyset pagination
+        follows the same ordering.
+
+        If negotiate is True, the response format is chosen by the Accept
+        header of the current request. With "application/x-ndjson" the
+        items are streamed one JSON object per line and the total is sent
+        in the X-Total-Count header. Column oriented formats (see
+        formats.COLUMNAR_MIMETYPES) return {column: [values]} selected
+        directly from the database. Responses carry the negotiated
+        Content-Type and "Vary: Accept". Keyset pagination and ids always
+        return JSON. GET requests with an up to date If-None-Match header
+        raise etag.NotModified before the items are loaded.
+
+        Queries are sent to a read replica if one can be used (see
+        read_replica).
+
+        If proposal_scope is given, only items of the proposals accessible
+        by the person are returned. The restriction is part of the SQL
+        query (see scoping), callers pass None for admins.
+
         Args:
             sql_alchemy_model ([type]): SQLAlchemy ORM model
             dict_schema ([type]): dict with flask fields
             ma_schema ([type]): marshmallows schema
             query_dict (dict): query parameters
+            negotiate (bool, optional): negotiate response format. Defaults
+                to False, internal callers get the dict.
+            proposal_scope (ProposalScope, optional): accessible proposals.
+                Defaults to None, all items.
+            compiled (bool, optional): use the serializer compiled from
+                dict_schema. Defaults to False, marshmallow dump.
 
         Returns:
             dict: {"data": {"total": int, "rows": list},
@@ -119,26 +527,436 @@ class SQLAlchemy(BaseSQLAlchemy):
                     "error": str
                     }
         """
-        if "offset" in query_dict.keys():
-            offset = query_dict.get("offset")
+        offset = self._get_int_param(query_dict, "offset", 0)
+        limit = self._get_int_param(
+            query_dict, "limit", current_app.config.get("PAGINATION_ITEMS_LIMIT")
+        )
+
+        query, filtered, msg = self._filter_query(
+            sql_alchemy_model, dict_schema, sql_alchemy_model.query, query_dict
+        )
+        if proposal_scope is not None:
+            query = query.filter(
+                get_scope_clause(
+                    sqlalchemy.inspect(sql_alchemy_model).local_table, proposal_scope
+                )
+            )
+            filtered = True
+
+        if negotiate:
+            request.negotiated_format = True
+        if negotiate and request.method == "GET":
+            etag = self._get_items_etag(sql_alchemy_model, query)
+            if etag:
+                check_etag(etag)
+
+        total = None
+        if "ids" not in query_dict:
+            total = self._get_total(
+                sql_alchemy_model, query, query_dict.get("total"), filtered
+            )
+
+        order_columns = self._get_order_columns(
+            sql_alchemy_model, dict_schema, query_dict.get("sort")
+        )
+        used_keys = [
+            parsed_key[0]
+            for parsed_key in (
+                parse_filter_key(key, dict_schema) for key in query_dict.keys()
+            )
+            if parsed_key
+        ]
+        if query_dict.get("sort"):
+            used_keys.append(order_columns[0][0].key)
+        self.index_advisor.record(sql_alchemy_model, used_keys)
+
+        if order_columns:
+            sort_msg = self._check_sort_index(sql_alchemy_model, order_columns[0][0])
+            if sort_msg:
+                msg = "%s. %s" % (msg, sort_msg) if msg else sort_msg
+
+        response_format = JSON_MIMETYPE
+        if negotiate and "after" not in query_dict and "ids" not in query_dict:
+            response_format = get_response_format()
+
+        fields = self._get_fields(dict_schema, query_dict.get("fields"))
+        if compiled:
+            serialize = get_serializer(sql_alchemy_model, dict_schema, fields)
         else:
-            offset = 0
-        if "limit" in query_dict.keys():
-            limit = query_dict.get("limit")
+            serialize = self._get_ma_serializer(ma_schema, fields)
+        if fields:
+            if response_format not in COLUMNAR_MIMETYPES:
+                # Ordering columns are loaded as well, they are needed for the cursor
+                load_fields = fields + tuple(
+                    attr.key for attr, _ in order_columns if attr.key not in fields
+                )
+                query = self._load_only(sql_alchemy_model, query, load_fields)
+
+        if "ids" in query_dict:
+            return self._get_db_items_by_ids(
+                sql_alchemy_model, dict_schema, query, query_dict["ids"], serialize, msg
+            )
+
+        if "after" in query_dict:
+            if not order_columns:
+                order_columns = [
+                    (attr, False)
+                    for attr in self._get_primary_key_attributes(sql_alchemy_model)
+                ]
+            return self._get_db_items_after_cursor(
+                serialize, query, order_columns, query_dict["after"], limit, msg, total
+            )
+
+        if order_columns:
+            query = query.order_by(
+                *[attr.desc() if desc else attr.asc() for attr, desc in order_columns]
+            )
+        if limit:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+
+        if response_format == NDJSON_MIMETYPE:
+            return self._stream_db_items(serialize, query, msg, total)
+        if response_format in COLUMNAR_MIMETYPES:
+            return self._get_db_items_columns(
+                sql_alchemy_model, dict_schema, query, fields, response_format, msg, total
+            )
+
+        items = [serialize(db_item) for db_item in query]
+        return create_response_item(msg, total, items)
+
+    def get_db_items_by_ids(
+        self,
+        sql_alchemy_model,
+        dict_schema,
+        ma_schema,
+        ids,
+        fields=None,
+        compiled=False,
+    ):
+        """
+        Returns items by their primary key values.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            ma_schema ([type]): marshmallows schema
+            ids (str or list): comma separated string or list of ids
+            fields (str or list, optional): fields to return. Defaults to None.
+            compiled (bool, optional): use the serializer compiled from
+                dict_schema. Defaults to False.
+
+        Returns:
+            dict: response dict with rows in the order of ids and missing_ids
+        """
+        query_dict = {"ids": ids}
+        if fields:
+            query_dict["fields"] = fields
+        return self.get_db_items(
+            sql_alchemy_model, dict_schema, ma_schema, query_dict, compiled=compiled
+        )
+
+    @staticmethod
+    def _get_ma_serializer(ma_schema, fields):
+        """
+        Returns function dumping one row with the marshmallow schema.
+
+        Args:
+            ma_schema ([type]): marshmallows schema
+            fields (tuple): requested fields, all if None
+
+        Returns:
+            function: row serializer
+        """
+        if fields:
+            ma_schema = get_restricted_schema(ma_schema.__class__, fields)
+        return lambda db_item: ma_schema.dump(db_item)[0]
+
+    def _get_db_items_by_ids(
+        self, sql_alchemy_model, dict_schema, query, ids, serialize, msg
+    ):
+        """
+        Returns items of the query with the given primary key values.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query ([type]): filtered query
+            ids (str or list): comma separated string or list of ids
+            serialize (function): row serializer
+            msg (str): message
+
+        Returns:
+            dict: response dict with rows in the order of ids and missing_ids
+        """
+        pk_attrs = self._get_primary_key_attributes(sql_alchemy_model)
+        if len(pk_attrs) != 1:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "Query parameter ids is not supported for composite primary keys",
+            )
+        pk_attr = pk_attrs[0]
+
+        if isinstance(ids, str):
+            ids = ids.split(",")
+        try:
+            ids = [
+                convert_value(dict_schema.get(pk_attr.key), str(item).strip())
+                for item in ids
+                if str(item).strip()
+            ]
+        except ValueError as ex:
+            abort(HTTPStatus.BAD_REQUEST, "Invalid value of query parameter ids (%s)" % ex)
+        # Duplicates are returned once, at the position of the first occurrence
+        ids = list(dict.fromkeys(ids))
+
+        ids_limit = current_app.config.get("PAGINATION_ITEMS_LIMIT")
+        if ids_limit and len(ids) > ids_limit:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "Query parameter ids contains more than %d ids" % ids_limit,
+            )
+
+        db_items = {}
+        if ids:
+            for db_item in query.filter(pk_attr.in_(ids)):
+                db_items[getattr(db_item, pk_attr.key)] = db_item
+
+        items = [serialize(db_items[item_id]) for item_id in ids if item_id in db_items]
+        missing_ids = [item_id for item_id in ids if item_id not in db_items]
+        return create_response_item(msg, len(items), items, missing_ids=missing_ids)
+
+    def _get_db_items_columns(
+        self, sql_alchemy_model, dict_schema, query, fields, response_format, msg, total
+    ):
+        """
+        Returns items in column oriented format.
+
+        Just the requested columns are selected and the result tuples are
+        transposed to lists of column values, no ORM objects or marshmallow
+        dumps are created.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query ([type]): final query
+            fields (tuple): requested fields, all dict_schema columns if None
+            response_format (str): one of COLUMNAR_MIMETYPES
+            msg (str): message
+            total (int): number of items
+
+        Returns:
+            flask.Response: {"data": {"total": int, "rows": {column: list}}}
+            as JSON or Apache Arrow stream
+        """
+        column_keys = set(
+            attr.key for attr in sqlalchemy.inspect(sql_alchemy_model).column_attrs
+        )
+        names = [name for name in (fields or dict_schema.keys()) if name in column_keys]
+        rows = query.with_entities(
+            *[getattr(sql_alchemy_model, name) for name in names]
+        ).all()
+        columns = dict(zip(names, [list(values) for values in zip(*rows)]))
+        if not rows:
+            columns = {name: [] for name in names}
+
+        if response_format == ARROW_MIMETYPE:
+            try:
+                data = columns_to_arrow_stream(columns)
+            except ImportError as ex:
+                print(ex)
+                abort(HTTPStatus.NOT_ACCEPTABLE, "Apache Arrow format is not available")
+            headers = {}
+            if total is not None:
+                headers["X-Total-Count"] = str(total)
+            return Response(data, mimetype=ARROW_MIMETYPE, headers=headers)
+
+        return Response(
+            json.dumps(create_response_item(msg, total, columns_to_json(columns))),
+            mimetype=COLUMNS_JSON_MIMETYPE,
+        )
+
+    def _stream_db_items(self, serialize, query, msg, total):
+        """
+        Returns streamed response with one JSON item per line.
+
+        The query is iterated in chunks of STREAM_CHUNK_SIZE rows with a
+        server side cursor, so the memory does not grow with the number of
+        items.
+
+        Args:
+            serialize (function): row serializer
+            query ([type]): final query
+            msg (str): message
+            total (int): number of items
+
+        Returns:
+            flask.Response: streamed response
+        """
+        chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+        query = query.execution_options(stream_results=True).yield_per(chunk_size)
+
+        def generate():
+            # The query runs after get_db_items returned
+            with self.read_replica():
+                lines = []
+                for db_item in query:
+                    lines.append(json.dumps(serialize(db_item)))
+                    if len(lines) >= chunk_size:
+                        yield "\n".join(lines) + "\n"
+                        lines = []
+                if lines:
+                    yield "\n".join(lines) + "\n"
+
+        headers = {}
+        if total is not None:
+            headers["X-Total-Count"] = str(total)
+        if msg:
+            headers["X-Message"] = msg
+        return Response(
+            stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers=headers
+        )
+
+    def _get_items_etag(self, sql_alchemy_model, query):
+        """
+        Returns ETag of the items selected by the query.
+
+        The ETag is computed from the number of items, the maximal primary
+        key and a version of the items, selected by one aggregate query, so
+        no item is loaded. The version is the maximum of the column listed
+        in ETAG_VERSION_COLUMNS, which must change on every write done by
+        any client, for example a MySQL ON UPDATE CURRENT_TIMESTAMP column.
+        Tables listed in ETAG_CHECKSUM_TABLES use a checksum of the rows
+        computed by the database (see etag.get_checksum). Other tables get
+        no ETag here, their ETag is computed from the response body.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            query ([type]): filtered query
+
+        Returns:
+            str: ETag or None
+        """
+        table_name = sql_alchemy_model.__tablename__
+        version_key = current_app.config.get("ETAG_VERSION_COLUMNS", {}).get(
+            table_name
+        )
+        aggregates = [sqlalchemy.func.count()]
+        aggregates += [
+            sqlalchemy.func.max(attr)
+            for attr in self._get_primary_key_attributes(sql_alchemy_model)
+        ]
+        if version_key is not None:
+            aggregates.append(
+                sqlalchemy.func.max(getattr(sql_alchemy_model, version_key))
+            )
+        elif (
+            table_name in current_app.config.get("ETAG_CHECKSUM_TABLES", [])
+            and self.get_engine().dialect.name in CHECKSUM_DIALECTS
+        ):
+            aggregates.append(
+                get_checksum(sqlalchemy.inspect(sql_alchemy_model).local_table)
+            )
         else:
-            limit = current_app.config.get("PAGINATION_ITEMS_LIMIT")
+            return None
+        fingerprint = query.order_by(None).with_entities(*aggregates).one()
+
+        return make_etag(
+            request.full_path,
+            request.accept_mimetypes.to_header(),
+            tuple(fingerprint),
+        )
+
+    def _on_write(self, sql_alchemy_model):
+        """
+        Called after items of the model were written.
+
+        Drops memoized items, sends following reads to the primary database
+        and notifies the write listeners.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+        """
+        memo = self._get_request_memo()
+        if memo is not None:
+            memo.pop(sql_alchemy_model, None)
+        if has_request_context():
+            request.db_primary = True
+            sticky_time = current_app.config.get("REPLICA_STICKY_TIME", 0)
+            if sticky_time:
+                request.db_primary_until = time.time() + sticky_time
+        for listener in self._write_listeners:
+            listener(sql_alchemy_model)
+
+    def add_write_listener(self, listener):
+        """
+        Registers function called after items are written by the db helpers.
 
+        Args:
+            listener (callable): called with the SQLAlchemy ORM model
+        """
+        if listener not in self._write_listeners:
+            self._write_listeners.append(listener)
+
+    def _get_request_memo(self):
+        """
+        Returns memo of the items loaded by get_db_item in this request.
+
+        The memo is stored on the request as {model: {key: row or dict}},
+        so it lives just for one request.
+
+        Returns:
+            dict: memo or None outside of a request
+        """
+        if not has_request_context():
+            return None
+        if not hasattr(request, "db_item_memo"):
+            request.db_item_memo = {}
+        return request.db_item_memo
+
+    def _filter_query(self, sql_alchemy_model, dict_schema, query, query_dict):
+        """
+        Filters query by the query_dict keys defined in dict_schema.
+
+        Keys with one value are compared for equality, keys with a list or
+        tuple of values are matched with IN. Keys "name__operator" apply
+        one of the filters.FILTER_OPERATORS (gt, gte, lt, lte, ne,
+        startswith, between, in) with the value converted to the type of
+        the dict_schema field, an unknown operator gives 400. Other keys
+        are ignored.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query ([type]): query to filter
+            query_dict (dict): query parameters
+
+        Returns:
+            tuple: filtered query, True if any filter was applied, error message
+        """
         msg = None
         schema_keys = {}
         multiple_value_query_dict = {}
+        operator_filters = []
 
         for key in query_dict.keys():
-            if key in dict_schema.keys():
-                if isinstance(query_dict[key], (list, tuple)):
-                    multiple_value_query_dict[key] = query_dict[key]
-                else:
-                    schema_keys[key] = query_dict.get(key)
-        query = sql_alchemy_model.query
+            try:
+                filter_key = parse_filter_key(key, dict_schema)
+            except ValueError as ex:
+                abort(
+                    HTTPStatus.BAD_REQUEST,
+                    "Invalid query parameter %s (%s)" % (key, str(ex)),
+                )
+            if filter_key is None:
+                continue
+            name, operator = filter_key
+            if operator:
+                operator_filters.append((name, operator, query_dict[key]))
+            elif isinstance(query_dict[key], (list, tuple)):
+                multiple_value_query_dict[key] = query_dict[key]
+            else:
+                schema_keys[key] = query_dict.get(key)
 
         # Filter items based on schema keys with one value
         if schema_keys:
@@ -158,34 +976,451 @@ class SQLAlchemy(BaseSQLAlchemy):
                     print(ex)
                     msg = "Unable to filter items based on query items (%s)" % str(ex)
 
-        total = query.count()
+        # Filter items based on operators
+        for name, operator, value in operator_filters:
+            attr = getattr(sql_alchemy_model, name, None)
+            if attr is None:
+                msg = "Unable to filter items based on query items (%s)" % name
+                continue
+            try:
+                clause = get_filter_clause(attr, dict_schema[name], operator, value)
+            except ValueError as ex:
+                abort(
+                    HTTPStatus.BAD_REQUEST,
+                    "Invalid value of query parameter %s%s%s (%s)"
+                    % (name, OPERATOR_SEPARATOR, operator, str(ex)),
+                )
+            query = query.filter(clause)
+
+        filtered = bool(schema_keys or multiple_value_query_dict or operator_filters)
+        return query, filtered, msg
+
+    def _get_write_query(
+        self, sql_alchemy_model, dict_schema, query_dict, proposal_scope=None
+    ):
+        """
+        Returns query selecting the items to update or delete in bulk.
+
+        At least one filter is required and filter errors are not ignored,
+        so that a bulk write never targets the whole table by mistake.
+        If proposal_scope is given, just items of the accessible proposals
+        are selected (see scoping).
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query_dict (dict): query parameters
+            proposal_scope (ProposalScope, optional): accessible proposals.
+                Defaults to None, all items.
+
+        Returns:
+            [type]: filtered query
+        """
+        query, filtered, msg = self._filter_query(
+            sql_alchemy_model, dict_schema, sql_alchemy_model.query, query_dict
+        )
+        if msg:
+            abort(HTTPStatus.BAD_REQUEST, msg)
+        if not filtered:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "At least one filter is required to update or delete items",
+            )
+        if proposal_scope is not None:
+            query = query.filter(
+                get_scope_clause(
+                    sqlalchemy.inspect(sql_alchemy_model).local_table, proposal_scope
+                )
+            )
+        return query
+
+    def _get_total(self, sql_alchemy_model, query, total_mode, filtered):
+        """
+        Returns the total number of items as requested by the client.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            query ([type]): filtered query
+            total_mode (str): exact, estimate or none
+            filtered (bool): True if the query has filters
+
+        Returns:
+            int: number of items or None
+        """
+        total_mode = total_mode or "exact"
+        if total_mode == "none":
+            return None
+        elif total_mode == "estimate":
+            return self._estimate_count(sql_alchemy_model, query, filtered)
+        elif total_mode == "exact":
+            return self._count(sql_alchemy_model, query)
+        else:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "Query parameter total should be one of exact, estimate or none",
+            )
+
+    def _count(self, sql_alchemy_model, query):
+        """
+        Counts items of the query.
+
+        The query is wrapped in a subquery selecting just the primary key,
+        so the database does not have to materialize all columns.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            query ([type]): filtered query
+
+        Returns:
+            int: number of items
+        """
+        key_query = query.with_entities(
+            *self._get_primary_key_attributes(sql_alchemy_model)
+        ).order_by(None)
+        return (
+            query.session.query(sqlalchemy.func.count())
+            .select_from(key_query.subquery())
+            .scalar()
+        )
+
+    def _estimate_count(self, sql_alchemy_model, query, filtered):
+        """
+        Estimates number of items of the query.
+
+        MySQL table statistics are used for queries without filters and the
+        EXPLAIN row estimate otherwise. For other databases the items are
+        counted.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            query ([type]): filtered query
+            filtered (bool): True if the query has filters
+
+        Returns:
+            int: estimated number of items
+        """
+        connection = query.session.connection()
+        if connection.dialect.name != "mysql":
+            return self._count(sql_alchemy_model, query)
+
+        try:
+            if not filtered:
+                table_rows = connection.execute(
+                    sqlalchemy.text(
+                        "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+                    ),
+                    table_name=sql_alchemy_model.__tablename__,
+                ).scalar()
+                if table_rows is not None:
+                    return int(table_rows)
+            else:
+                plan = self.explain_query(query.order_by(None))
+                if plan and plan[0].get("rows") is not None:
+                    filtered_percent = plan[0].get("filtered") or 100
+                    return int(plan[0]["rows"] * float(filtered_percent) / 100)
+        except sqlalchemy.exc.DBAPIError as ex:
+            print("Unable to estimate number of items (%s)" % str(ex))
+
+        return self._count(sql_alchemy_model, query)
+
+    def explain_query(self, query):
+        """
+        Returns execution plan of a query (MySQL).
+
+        Args:
+            query ([type]): SQLAlchemy query
+
+        Returns:
+            list: list of dicts, one per row of EXPLAIN output
+        """
+        connection = query.session.connection()
+        compiled = query.statement.compile(dialect=connection.dialect)
+        if compiled.positional:
+            params = [compiled.params[name] for name in compiled.positiontup]
+        else:
+            params = compiled.params
+        result = connection.execute("EXPLAIN " + str(compiled), params)
+        return [dict(row) for row in result]
+
+    def _get_db_items_after_cursor(
+        self, serialize, query, order_columns, cursor, limit, msg, total
+    ):
+        """
+        Returns one page of items using keyset pagination.
+
+        Unlike offset the page is resolved with a range scan of the ordering
+        index, so the latency does not depend on the page depth.
+
+        Args:
+            serialize (function): row serializer
+            query ([type]): filtered query
+            order_columns (list): list of (model attribute, descending) tuples
+            cursor (str): cursor returned with the previous page
+            limit (int): page size
+            msg (str): message
+            total (int): number of items
+
+        Returns:
+            dict: response item with "next_cursor" in data
+        """
+        query = query.order_by(
+            *[attr.desc() if desc else attr.asc() for attr, desc in order_columns]
+        )
+        if cursor:
+            try:
+                query = query.filter(keyset_filter(order_columns, decode_cursor(cursor)))
+            except ValueError as ex:
+                abort(HTTPStatus.BAD_REQUEST, str(ex))
 
         if limit:
-            query = query.limit(limit)
-        if offset:
-            query = query.offset(offset)
+            # One extra item tells if there is a next page
+            query = query.limit(limit + 1)
+        db_items = query.all()
 
-        items = ma_schema.dump(query, many=True)[0]
-        return create_response_item(msg, total, items)
+        next_cursor = None
+        if limit and len(db_items) > limit:
+            db_items = db_items[:limit]
+            next_cursor = encode_cursor(
+                [getattr(db_items[-1], attr.key) for attr, _ in order_columns]
+            )
+
+        items = [serialize(db_item) for db_item in db_items]
+        return create_response_item(msg, total, items, next_cursor=next_cursor)
 
-    def get_db_item(self, sql_alchemy_model, ma_schema, query_dict):
+    def _get_order_columns(self, sql_alchemy_model, dict_schema, sort):
+        """
+        Returns ordering requested by the sort query parameter.
+
+        Sort is a comma separated list of dict_schema keys, prefixed with
+        "-" for descending order. Primary key columns are appended, so that
+        the ordering is deterministic and can be used with a cursor.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            sort (str): sort query parameter
+
+        Returns:
+            list: list of (model attribute, descending) tuples, empty if
+            sort is not defined
+        """
+        if not sort:
+            return []
+
+        order_columns = []
+        for name in sort.split(","):
+            name = name.strip()
+            descending = name.startswith("-")
+            name = name.lstrip("-+")
+            attr = getattr(sql_alchemy_model, name, None)
+            if name not in dict_schema or attr is None:
+                abort(HTTPStatus.BAD_REQUEST, "Unable to sort items by %s" % name)
+            if name not in [prev_attr.key for prev_attr, _ in order_columns]:
+                order_columns.append((attr, descending))
+
+        for attr in self._get_primary_key_attributes(sql_alchemy_model):
+            if attr.key not in [prev_attr.key for prev_attr, _ in order_columns]:
+                order_columns.append((attr, False))
+        return order_columns
+
+    def _check_sort_index(self, sql_alchemy_model, attr):
+        """
+        Checks that sorting by attr can be resolved with an index.
+
+        A column can be used for sorting without filesort if it is the
+        leading column of the primary key or of an index (see
+        index_advisor.is_column_indexed). Sorting by other
+        columns is rejected on tables having more rows than
+        SORT_UNINDEXED_ROWS_LIMIT and allowed with a warning otherwise.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            attr ([type]): first ordering attribute
+
+        Returns:
+            str: warning message or None if the column is indexed
+        """
+        if is_column_indexed(attr.property.columns[0]):
+            return None
+
+        rows_limit = current_app.config.get("SORT_UNINDEXED_ROWS_LIMIT")
+        if rows_limit:
+            rows = self._estimate_count(
+                sql_alchemy_model, sql_alchemy_model.query, False
+            )
+            if rows > rows_limit:
+                abort(
+                    HTTPStatus.BAD_REQUEST,
+                    "Unable to sort items by %s: column is not indexed" % attr.key,
+                )
+        return "Items are sorted by %s, which is not indexed" % attr.key
+
+    def _get_fields(self, schema_fields, fields):
+        """
+        Returns list of fields requested by the client.
+
+        Args:
+            schema_fields (dict): dict_schema or marshmallow schema fields
+            fields (str or list): comma separated string or list of fields
+
+        Returns:
+            tuple: tuple of field names or None if all fields are requested
+        """
+        if not fields:
+            return None
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        fields = tuple(field.strip() for field in fields if field.strip())
+
+        unknown_fields = [field for field in fields if field not in schema_fields]
+        if unknown_fields:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "Unknown fields requested: %s" % ", ".join(unknown_fields),
+            )
+        return fields
+
+    def _load_only(self, sql_alchemy_model, query, fields):
+        """
+        Restricts columns loaded by the query to the requested fields.
+
+        Primary key columns are always loaded.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            query ([type]): query
+            fields (tuple): field names
+
+        Returns:
+            query: query with column projection
+        """
+        column_attrs = sqlalchemy.inspect(sql_alchemy_model).column_attrs
+        column_keys = [field for field in fields if field in column_attrs]
+        if column_keys:
+            query = query.options(load_only(*column_keys))
+        return query
+
+    def _get_column_keys(self, sql_alchemy_model):
+        """
+        Returns names of the model attributes mapped to columns.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+        Returns:
+            set: attribute names
+        """
+        return set(
+            attr.key for attr in sqlalchemy.inspect(sql_alchemy_model).column_attrs
+        )
+
+    def _get_primary_key_attributes(self, sql_alchemy_model):
+        """
+        Returns model attributes mapped to the primary key columns.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+        Returns:
+            list: list of instrumented attributes
+        """
+        mapper = sqlalchemy.inspect(sql_alchemy_model)
+        return [
+            getattr(sql_alchemy_model, mapper.get_property_by_column(column).key)
+            for column in mapper.primary_key
+        ]
+
+    def _get_int_param(self, query_dict, key, default):
+        """
+        Returns query parameter as integer.
+
+        Args:
+            query_dict (dict): query parameters
+            key (str): parameter name
+            default (int): default value
+
+        Returns:
+            int: parameter value
+        """
+        value = query_dict.get(key)
+        if value in (None, ""):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            abort(HTTPStatus.BAD_REQUEST, "Query parameter %s should be an integer" % key)
+
+    @reads_from_replica
+    def get_db_item(
+        self, sql_alchemy_model, ma_schema, query_dict, fields=None, dict_schema=None
+    ):
         """
         Returns data base item by its Id.
 
+        If dict_schema is given, the item is converted by a serializer
+        compiled from it. The result is already marshalled, so routes
+        using it do not need marshal_with.
+
+        Within a request, items are memoized by model and query_dict: the
+        same lookup returns a copy of the already serialized dict and a
+        fully loaded row is serialized again without a new SELECT. Writes
+        of the model done by this extension drop its memo.
+
         Args:
             item_id (int):
+            fields (str or list): fields to load and return, all if None
+            dict_schema (dict, optional): dict with flask fields. Defaults to None.
 
         Returns:
             dict: info dict
         """
-        db_item = sql_alchemy_model.query.filter_by(**query_dict).first_or_404(
-            description="There is no data with item id %s" % str(query_dict)
+        query = sql_alchemy_model.query.filter_by(**query_dict)
+        fields = self._get_fields(ma_schema.fields, fields)
+        if fields:
+            query = self._load_only(sql_alchemy_model, query, fields)
+            ma_schema = get_restricted_schema(ma_schema.__class__, fields)
+
+        memo = self._get_request_memo()
+        row_key = ("row", tuple(sorted(query_dict.items())))
+        item_key = row_key[1:] + (
+            fields,
+            id(ma_schema) if dict_schema is None else id(dict_schema),
         )
+        try:
+            hash(item_key)
+        except TypeError:
+            memo = None
+        if memo is not None:
+            model_memo = memo.setdefault(sql_alchemy_model, {})
+            if item_key in model_memo:
+                return dict(model_memo[item_key])
+
+        db_item = None
+        if memo is not None:
+            db_item = model_memo.get(row_key)
+        if db_item is None:
+            db_item = query.first_or_404(
+                description="There is no data with item id %s" % str(query_dict)
+            )
+            if memo is not None and not fields:
+                # Just fully loaded rows can be serialized with any fields
+                model_memo[row_key] = db_item
+
         # db_item = sql_alchemy_model.query.filter_by(**item_id_dict).first()
-        db_item_json = ma_schema.dump(db_item)[0]
+        if dict_schema is not None:
+            db_item_json = get_serializer(sql_alchemy_model, dict_schema, fields)(
+                db_item
+            )
+        else:
+            db_item_json = ma_schema.dump(db_item)[0]
 
+        if memo is not None:
+            model_memo[item_key] = db_item_json
+            db_item_json = dict(db_item_json)
         return db_item_json
 
+    @reads_from_replica
     def get_db_items_by_view(
         self, sql_alchemy_model, dict_schema, ma_schema, query_dict
     ):
@@ -202,7 +1437,9 @@ class SQLAlchemy(BaseSQLAlchemy):
 
         query = self.session.query(sql_alchemy_model)
 
-        total = query.count()
+        total = self._get_total(
+            sql_alchemy_model, query, query_dict.get("total"), False
+        )
 
         items = ma_schema.dump(query, many=True)[0]
 
@@ -223,6 +1460,7 @@ class SQLAlchemy(BaseSQLAlchemy):
             db_item = sql_alchemy_model(**data)
             self.session.add(db_item)
             self.session.commit()
+            self._on_write(sql_alchemy_model)
             json_data = ma_schema.dump(db_item)[0]
             return json_data, HTTPStatus.OK
         except TypeError as ex:
@@ -238,12 +1476,128 @@ class SQLAlchemy(BaseSQLAlchemy):
             print(ex)
             abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to add db item (%s)" % str(ex))
 
+    def add_db_items(self, sql_alchemy_model, data_list):
+        """
+        Adds list of items to db in one transaction.
+
+        Items are inserted in chunks of BULK_INSERT_CHUNK_SIZE rows with one
+        multi-row INSERT per chunk (see bulk_insert), bypassing the ORM unit
+        of work, and are not dumped back. Just the primary keys of the new
+        items are returned. Generated keys are derived from the lastrowid
+        of each chunk. If the database does not guarantee consecutive ids,
+        they are returned as None with a message.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            data_list (list): list of dicts with item data
+
+        Returns:
+            dict: {"data": {"total": int, "rows": list of primary keys}, ...}
+        """
+        if not isinstance(data_list, list) or not data_list:
+            abort(HTTPStatus.BAD_REQUEST, "Expected a non empty list of items")
+        bulk_items_limit = current_app.config.get("BULK_ITEMS_LIMIT")
+        if bulk_items_limit and len(data_list) > bulk_items_limit:
+            abort(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                "At most %d items can be added at once" % bulk_items_limit,
+            )
+
+        column_keys = self._get_column_keys(sql_alchemy_model)
+        for data in data_list:
+            if not isinstance(data, dict):
+                abort(HTTPStatus.BAD_REQUEST, "Expected a list of objects")
+            unknown_keys = set(data.keys()) - column_keys
+            if unknown_keys:
+                abort(
+                    HTTPStatus.NOT_ACCEPTABLE,
+                    "Attribute %s not defined in the item model"
+                    % ", ".join(sorted(unknown_keys)),
+                )
+
+        mapper = sqlalchemy.inspect(sql_alchemy_model)
+        table = mapper.local_table
+        column_names = {
+            key: mapper.column_attrs[key].columns[0].name for key in column_keys
+        }
+        primary_keys = [
+            attr.key for attr in self._get_primary_key_attributes(sql_alchemy_model)
+        ]
+        chunk_size = current_app.config.get("BULK_INSERT_CHUNK_SIZE", 1000)
+        ids = []
+        try:
+            engine = self.get_engine()
+            generated_ids = is_autoincrement(table) and self._has_consecutive_ids(
+                engine
+            )
+            for chunk in get_insert_chunks(data_list, chunk_size):
+                result = self.session.execute(
+                    table.insert().values(
+                        [
+                            {column_names[key]: value for key, value in data.items()}
+                            for data in chunk
+                        ]
+                    ),
+                    mapper=mapper,
+                )
+                if all(key in chunk[0] for key in primary_keys):
+                    chunk_ids = [[data[key] for key in primary_keys] for data in chunk]
+                elif generated_ids:
+                    chunk_ids = [
+                        [item_id]
+                        for item_id in get_inserted_ids(
+                            engine.dialect.name, result.lastrowid, len(chunk)
+                        )
+                    ]
+                else:
+                    chunk_ids = [
+                        [data.get(key) for key in primary_keys] for data in chunk
+                    ]
+                ids.extend(chunk_ids)
+            self.session.commit()
+            self._on_write(sql_alchemy_model)
+        except Exception as ex:
+            self.session.rollback()
+            print(ex)
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to add db items (%s)" % str(ex))
+
+        msg = None
+        if any(None in item_ids for item_ids in ids):
+            msg = (
+                "Generated ids are not returned, the database does not "
+                "assign consecutive ids"
+            )
+        if len(primary_keys) == 1:
+            ids = [item_ids[0] for item_ids in ids]
+        else:
+            ids = [dict(zip(primary_keys, item_ids)) for item_ids in ids]
+        return create_response_item(msg, len(ids), ids), HTTPStatus.CREATED
+
+    def _has_consecutive_ids(self, engine):
+        """
+        Returns True if one INSERT generates consecutive ids, once per engine.
+
+        Args:
+            engine ([type]): SQLAlchemy engine
+
+        Returns:
+            bool: True if ids can be derived from lastrowid
+        """
+        cache_key = str(engine.url)
+        if cache_key not in self._consecutive_ids:
+            with engine.connect() as connection:
+                self._consecutive_ids[cache_key] = has_consecutive_ids(connection)
+        return self._consecutive_ids[cache_key]
+
     def update_db_item(
         self, sql_alchemy_model, ma_schema, item_id_dict, item_update_dict
     ):
         """
         Updates item in db
 
+        The item is updated with a single UPDATE statement (see
+        _update_db_item). Keys not defined in the model are ignored.
+
         Args:
             sql_alchemy_model ([type]): [description]
             item_id_dict ([type]): [description]
@@ -252,24 +1606,23 @@ class SQLAlchemy(BaseSQLAlchemy):
         Returns:
             [type]: [description]
         """
-        result = None
-        db_item = sql_alchemy_model.query.filter_by(**item_id_dict).first_or_404(
-            description="There is no data with item id %s" % str(item_id_dict)
-        )
-        if db_item:
-            for key, value in item_update_dict.items():
-                if hasattr(db_item, key):
-                    setattr(db_item, key, value)
-                else:
-                    print("Attribute %s not defined in the item model" % key)
-            self.session.commit()
-            result = ma_schema.dump(db_item)[0]
-        return result
+        column_keys = self._get_column_keys(sql_alchemy_model)
+        values = {}
+        for key, value in item_update_dict.items():
+            if key in column_keys:
+                values[key] = value
+            else:
+                print("Attribute %s not defined in the item model" % key)
+        return self._update_db_item(sql_alchemy_model, ma_schema, item_id_dict, values)
 
     def patch_db_item(self, sql_alchemy_model, ma_schema, item_id_dict, item_data_dict):
         """
         Patch db item.
 
+        The item is updated with a single UPDATE statement (see
+        _update_db_item). Keys not defined in the model are rejected before
+        the database is queried.
+
         Args:
             sql_alchemy_model ([type]): [description]
             ma_schema : Marshmallows schema
@@ -279,28 +1632,301 @@ class SQLAlchemy(BaseSQLAlchemy):
         Returns:
             [type]: [description]
         """
-        result = None
-        db_item = sql_alchemy_model.query.filter_by(**item_id_dict).first_or_404(
-            description="There is no data with item id %s" % str(item_id_dict)
+        column_keys = self._get_column_keys(sql_alchemy_model)
+        for key in item_data_dict.keys():
+            if key not in column_keys:
+                abort(
+                    HTTPStatus.NOT_ACCEPTABLE,
+                    "Attribute %s not defined in the item model" % key,
+                )
+        return self._update_db_item(
+            sql_alchemy_model, ma_schema, item_id_dict, item_data_dict
         )
-        if db_item:
-            for key, value in item_data_dict.items():
-                if hasattr(db_item, key):
-                    setattr(db_item, key, value)
-                else:
-                    abort(
-                        HTTPStatus.NOT_ACCEPTABLE,
-                        "Attribute %s not defined in the item model" % key,
-                    )
+
+    def _update_db_item(self, sql_alchemy_model, ma_schema, item_id_dict, values):
+        """
+        Updates item with one UPDATE statement, without loading it first.
+
+        If the request has header "Prefer: return=minimal", 204 No Content
+        is returned, otherwise the item is selected once after the commit
+        and returned.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            ma_schema ([type]): marshmallows schema
+            item_id_dict (dict): primary key values
+            values (dict): values to set
+
+        Returns:
+            dict or flask.Response: updated item or 204 response
+        """
+        query = sql_alchemy_model.query.filter_by(**item_id_dict)
+        description = "There is no data with item id %s" % str(item_id_dict)
+        if values:
+            try:
+                row_count = query.update(values, synchronize_session=False)
+                self.session.commit()
+            except Exception as ex:
+                print(ex)
+                self.session.rollback()
+                abort(
+                    HTTPStatus.NOT_ACCEPTABLE, "Unable to update db item (%s)" % str(ex)
+                )
+            if not row_count:
+                abort(HTTPStatus.NOT_FOUND, description)
+            self._on_write(sql_alchemy_model)
+
+        if prefers_minimal_return():
+            if not values:
+                query.first_or_404(description=description)
+            return minimal_response()
+        return ma_schema.dump(query.first_or_404(description=description))[0]
+
+    def upsert_db_item(
+        self, sql_alchemy_model, dict_schema, ma_schema, data, natural_key
+    ):
+        """
+        Inserts item or updates the item with the same natural key.
+
+        One INSERT ... ON DUPLICATE KEY UPDATE (MySQL) or INSERT ... ON
+        CONFLICT DO UPDATE (SQLite) statement is executed, so clients
+        retrying a write do not have to check first if the item exists.
+        The table must have a unique index on the natural key columns, and
+        the natural key values must not be null, as MySQL unique indexes
+        never match null values.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            ma_schema ([type]): marshmallows schema
+            data (dict): item data including the natural key values
+            natural_key (tuple): names of the natural key attributes
+
+        Returns:
+            dict or flask.Response: item or 204 response
+        """
+        if not isinstance(data, dict):
+            abort(HTTPStatus.BAD_REQUEST, "Expected an object")
+        column_keys = self._get_column_keys(sql_alchemy_model)
+        unknown_keys = set(data.keys()) - column_keys
+        if unknown_keys:
+            abort(
+                HTTPStatus.NOT_ACCEPTABLE,
+                "Attribute %s not defined in the item model"
+                % ", ".join(sorted(unknown_keys)),
+            )
+        missing_keys = [key for key in natural_key if data.get(key) is None]
+        if missing_keys:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                "Natural key attribute %s is required" % ", ".join(missing_keys),
+            )
+
+        mapper = sqlalchemy.inspect(sql_alchemy_model)
+        table = mapper.local_table
+        column_names = {
+            key: mapper.column_attrs[key].columns[0].name for key in column_keys
+        }
+        key_columns = [column_names[key] for key in natural_key]
+        engine = self.get_engine()
+        if engine.dialect.name not in UPSERT_DIALECTS:
+            abort(
+                HTTPStatus.NOT_IMPLEMENTED,
+                "Upsert is not supported by %s" % engine.dialect.name,
+            )
+        if not self._has_unique_key(engine, table.name, key_columns):
+            # Reported as a warning at startup by check_unique_keys
+            abort(
+                HTTPStatus.NOT_IMPLEMENTED,
+                "Table %s has no unique index on %s, apply the migrations"
+                % (table.name, ", ".join(key_columns)),
+            )
+
+        try:
+            data = {
+                key: convert_value(dict_schema.get(key), value)
+                for key, value in data.items()
+            }
+        except ValueError as ex:
+            abort(HTTPStatus.BAD_REQUEST, str(ex))
+        values = {column_names[key]: value for key, value in data.items()}
+        statement = get_upsert_statement(
+            engine.dialect.name, table, values, key_columns
+        )
+        try:
+            self.session.execute(statement, mapper=mapper)
             self.session.commit()
-            result = ma_schema.dump(db_item)[0]
+        except Exception as ex:
+            print(ex)
+            self.session.rollback()
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to upsert db item (%s)" % str(ex))
+        self._on_write(sql_alchemy_model)
 
-        return result
+        if prefers_minimal_return():
+            return minimal_response()
+        key_dict = {key: data[key] for key in natural_key}
+        return ma_schema.dump(sql_alchemy_model.query.filter_by(**key_dict).one())[0]
+
+    def check_unique_keys(self, app, natural_keys):
+        """
+        Checks at startup that the upsert natural keys have unique indexes.
+
+        Missing indexes are logged as a warning, upsert_db_item then
+        returns 501 for the table until the index is created.
+
+        Args:
+            app ([type]): flask app
+            natural_keys (list): list of (SQLAlchemy ORM model, natural key)
+
+        Returns:
+            list: "table (columns)" of the missing unique indexes
+        """
+        missing = []
+        with app.app_context():
+            engine = self.get_engine(app)
+            if engine.dialect.name not in UPSERT_DIALECTS:
+                return missing
+            try:
+                for sql_alchemy_model, natural_key in natural_keys:
+                    mapper = sqlalchemy.inspect(sql_alchemy_model)
+                    key_columns = [
+                        mapper.column_attrs[key].columns[0].name
+                        for key in natural_key
+                    ]
+                    table_name = mapper.local_table.name
+                    if not self._has_unique_key(engine, table_name, key_columns):
+                        missing.append(
+                            "%s (%s)" % (table_name, ", ".join(key_columns))
+                        )
+            except sqlalchemy.exc.OperationalError as ex:
+                # Checked again by upsert_db_item once the database is up
+                log.warning("Unable to check unique indexes (%s)", str(ex))
+                return missing
+        if missing:
+            log.warning(
+                "Unique index required by upsert is missing on %s, upserts "
+                "are refused until the migrations are applied",
+                ", ".join(missing),
+            )
+        return missing
+
+    def _has_unique_key(self, engine, table_name, column_names):
+        """
+        Returns True if the table has a unique index on exactly the columns.
+
+        Indexes are read from the database once per table. They are read
+        again while the key is missing, so an index created by a migration
+        is used without restarting the server.
+
+        Args:
+            engine ([type]): SQLAlchemy engine
+            table_name (str): table name
+            column_names (list): column names
+
+        Returns:
+            bool: True if the columns are a unique key
+        """
+        cache_key = (str(engine.url), table_name)
+        unique_keys = self._unique_keys.get(cache_key)
+        if unique_keys is None or frozenset(column_names) not in unique_keys:
+            unique_keys = get_unique_keys(engine, table_name)
+            self._unique_keys[cache_key] = unique_keys
+        return frozenset(column_names) in unique_keys
+
+    def patch_db_items(
+        self,
+        sql_alchemy_model,
+        dict_schema,
+        query_dict,
+        item_data_dict,
+        proposal_scope=None,
+    ):
+        """
+        Patches all db items matching the query parameters.
+
+        Items are updated with a single UPDATE ... WHERE statement, using the
+        same filters as get_db_items. Callers pass the proposal_scope of
+        non admin users, so items of other proposals are not updated.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query_dict (dict): query parameters
+            item_data_dict (dict): values to set
+            proposal_scope (ProposalScope, optional): accessible proposals.
+                Defaults to None, all items.
+
+        Returns:
+            dict: response dict with the number of updated items as total
+        """
+        if not isinstance(item_data_dict, dict) or not item_data_dict:
+            abort(HTTPStatus.BAD_REQUEST, "Expected an object with values to set")
+        column_keys = set(
+            attr.key for attr in sqlalchemy.inspect(sql_alchemy_model).column_attrs
+        )
+        for key in item_data_dict.keys():
+            if key not in column_keys:
+                abort(
+                    HTTPStatus.NOT_ACCEPTABLE,
+                    "Attribute %s not defined in the item model" % key,
+                )
+
+        query = self._get_write_query(
+            sql_alchemy_model, dict_schema, query_dict, proposal_scope
+        )
+        try:
+            row_count = query.update(item_data_dict, synchronize_session=False)
+            self.session.commit()
+            self._on_write(sql_alchemy_model)
+        except Exception as ex:
+            print(ex)
+            self.session.rollback()
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to update db items (%s)" % str(ex))
+
+        return create_response_item(None, row_count, [])
+
+    def delete_db_items(
+        self, sql_alchemy_model, dict_schema, query_dict, proposal_scope=None
+    ):
+        """
+        Deletes all db items matching the query parameters.
+
+        Items are deleted with a single DELETE ... WHERE statement, using the
+        same filters as get_db_items. Callers pass the proposal_scope of
+        non admin users, so items of other proposals are not deleted.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            dict_schema ([type]): dict with flask fields
+            query_dict (dict): query parameters
+            proposal_scope (ProposalScope, optional): accessible proposals.
+                Defaults to None, all items.
+
+        Returns:
+            dict: response dict with the number of deleted items as total
+        """
+        query = self._get_write_query(
+            sql_alchemy_model, dict_schema, query_dict, proposal_scope
+        )
+        try:
+            row_count = query.delete(synchronize_session=False)
+            self.session.commit()
+            self._on_write(sql_alchemy_model)
+        except Exception as ex:
+            print(ex)
+            self.session.rollback()
+            abort(HTTPStatus.INTERNAL_SERVER_ERROR, str(ex))
+
+        return create_response_item(None, row_count, [])
 
     def delete_db_item(self, sql_alchemy_model, item_id_dict):
         """
         Deletes db item
 
+        The item is deleted with a single DELETE statement, without loading
+        it first. Models do not declare ORM cascades, dependent rows are
+        handled by the database foreign keys as before.
+
         Args:
             sql_alchemy_model ([type]): [description]
             item_id_dict ([type]): [description]
@@ -308,16 +1934,21 @@ class SQLAlchemy(BaseSQLAlchemy):
         Returns:
             [type]: [description]
         """
-        db_item = sql_alchemy_model.query.filter_by(**item_id_dict).first_or_404(
-            description="There is no data with item id %s" % str(item_id_dict)
-        )
-
         try:
-            self.session.delete(db_item)
+            row_count = sql_alchemy_model.query.filter_by(**item_id_dict).delete(
+                synchronize_session=False
+            )
             self.session.commit()
-            return True
         except Exception as ex:
             print(ex)
             # log.exception(str(ex))
             self.session.rollback()
             abort(HTTPStatus.INTERNAL_SERVER_ERROR, str(ex))
+
+        if not row_count:
+            abort(
+                HTTPStatus.NOT_FOUND,
+                "There is no data with item id %s" % str(item_id_dict),
+            )
+        self._on_write(sql_alchemy_model)
+        return True
@@ -0,0 +1,136 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+
+Bulk inserts.
+
+Items are inserted in chunks, each chunk with one multi-row INSERT
+statement, instead of one statement per item. Generated primary keys are
+derived from the lastrowid of the statement: MySQL reports the first id of
+the statement and SQLite the last one. The ids of one statement are
+consecutive on SQLite, and on MySQL when innodb_autoinc_lock_mode is
+traditional (0) or consecutive (1).
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import sqlalchemy
+
+
+# Bound parameters allowed in one statement by SQLite
+MAX_INSERT_PARAMETERS = 32766
+
+
+def get_insert_chunks(values_list, chunk_size):
+    """
+    Splits rows into chunks inserted by one statement.
+
+    Consecutive rows with the same keys are grouped, so columns missing in
+    a row keep their database default.
+
+    Args:
+        values_list (list): list of dicts with column values
+        chunk_size (int): maximal number of rows in a chunk
+
+    Yields:
+        list: list of dicts with the same keys
+    """
+    chunk = []
+    for values in values_list:
+        if chunk and (
+            len(chunk) >= _get_chunk_rows(chunk[0], chunk_size)
+            or values.keys() != chunk[0].keys()
+        ):
+            yield chunk
+            chunk = []
+        chunk.append(values)
+    if chunk:
+        yield chunk
+
+
+def _get_chunk_rows(values, chunk_size):
+    return max(1, min(chunk_size, MAX_INSERT_PARAMETERS // max(1, len(values))))
+
+
+def is_autoincrement(table):
+    """
+    Returns True if the table has a single integer autoincrement primary key.
+
+    Args:
+        table ([type]): SQLAlchemy table
+
+    Returns:
+        bool: True if the database generates the primary key
+    """
+    columns = list(table.primary_key.columns)
+    if len(columns) != 1:
+        return False
+    column = columns[0]
+    if column.autoincrement is True:
+        return True
+    return (
+        column.autoincrement == "auto"
+        and isinstance(column.type, sqlalchemy.Integer)
+        and not column.foreign_keys
+        and column.default is None
+    )
+
+
+def has_consecutive_ids(connection):
+    """
+    Returns True if the ids generated by one INSERT are consecutive.
+
+    Args:
+        connection ([type]): SQLAlchemy connection
+
+    Returns:
+        bool: True if ids can be derived from lastrowid
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "sqlite":
+        return True
+    if dialect_name == "mysql":
+        try:
+            lock_mode = connection.execute(
+                sqlalchemy.text("SELECT @@innodb_autoinc_lock_mode")
+            ).scalar()
+        except sqlalchemy.exc.DBAPIError:
+            return False
+        return lock_mode is not None and int(lock_mode) < 2
+    return False
+
+
+def get_inserted_ids(dialect_name, lastrowid, rowcount):
+    """
+    Returns ids generated by one multi-row INSERT.
+
+    Args:
+        dialect_name (str): SQLAlchemy dialect name
+        lastrowid (int): lastrowid of the statement
+        rowcount (int): number of inserted rows
+
+    Returns:
+        list: list of ids in the order of the rows
+    """
+    first_id = lastrowid
+    if dialect_name != "mysql":
+        first_id = lastrowid - rowcount + 1
+    return list(range(first_id, first_id + rowcount))
@@ -0,0 +1,129 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+ETag helpers for conditional GET requests.
+
+Query helpers compute a fingerprint of the requested items and call
+check_etag before the items are serialized. If the client already has the
+same version, NotModified is raised and the patched Resource answers with
+304 Not Modified. Otherwise the ETag is stored on the request and added to
+the response by the Resource.
+
+The fingerprint of a table listed in ETAG_CHECKSUM_TABLES includes a
+checksum of the selected rows, SUM(CRC32(row)), computed by the database.
+SQLite has no CRC32 function, it is added to every SQLite connection.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import hashlib
+import sqlite3
+import zlib
+
+import sqlalchemy
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+CHECKSUM_DIALECTS = ("mysql", "sqlite")
+CHECKSUM_SEPARATOR = "|"
+CHECKSUM_NULL = "\\N"
+
+
+class NotModified(Exception):
+    """
+    Raised when the client already has the current version of a resource.
+
+    Attributes:
+        etag (str): ETag of the resource
+    """
+
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+
+def make_etag(*parts):
+    """
+    Returns ETag value computed from the parts.
+
+    Args:
+        parts: values identifying the version of a resource
+
+    Returns:
+        str: ETag value (without quotes)
+    """
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def check_etag(etag):
+    """
+    Compares ETag with the If-None-Match header of the current request.
+
+    Args:
+        etag (str): weak ETag of the resource
+
+    Raises:
+        NotModified: if the client has the resource with the same ETag
+    """
+    if request.if_none_match.contains_weak(etag):
+        raise NotModified(etag)
+    request.etag = etag
+
+
+def get_checksum(table):
+    """
+    Returns aggregate checksum of all columns of the selected rows.
+
+    Args:
+        table ([type]): SQLAlchemy table
+
+    Returns:
+        [type]: SUM(CRC32(col1 | col2 | ...)) expression
+    """
+    row = None
+    for column in table.columns:
+        value = sqlalchemy.func.coalesce(
+            sqlalchemy.cast(column, sqlalchemy.String), CHECKSUM_NULL
+        )
+        row = value if row is None else row.concat(CHECKSUM_SEPARATOR).concat(value)
+    return sqlalchemy.func.sum(sqlalchemy.func.crc32(row))
+
+
+def register_checksum_function():
+    """
+    Adds the CRC32 function to SQLite connections of all engines.
+    """
+    if not event.contains(Engine, "connect", _add_sqlite_crc32):
+        event.listen(Engine, "connect", _add_sqlite_crc32)
+
+
+def _add_sqlite_crc32(dbapi_connection, connection_record):
+    # pylint: disable=unused-argument
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function("crc32", 1, _crc32)
+
+
+def _crc32(value):
+    if value is None:
+        return None
+    return zlib.crc32(str(value).encode("utf-8"))
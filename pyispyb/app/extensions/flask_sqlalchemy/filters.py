@@ -0,0 +1,174 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Filter operators used in query parameters.
+
+A query parameter "name__operator=value" filters items by the column name
+using the operator, for example startTime__gte=2020-01-01 or
+imagePrefix__startswith=test. Values are converted according to the flask
+field declared for the column in dict_schema. Every operator compiles to a
+predicate on the bare column, so indexes on the column can be used.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from datetime import datetime
+
+from flask_restx import fields as f_fields
+
+
+OPERATOR_SEPARATOR = "__"
+
+DATETIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%Y%m%d",
+)
+
+LIKE_ESCAPE_CHAR = "\\"
+
+
+def _startswith(attr, value):
+    """
+    Returns prefix LIKE predicate with the wildcards of value escaped.
+
+    Args:
+        attr ([type]): model attribute
+        value (str): prefix
+
+    Returns:
+        [type]: predicate
+    """
+    for char in (LIKE_ESCAPE_CHAR, "%", "_"):
+        value = value.replace(char, LIKE_ESCAPE_CHAR + char)
+    return attr.like(value + "%", escape=LIKE_ESCAPE_CHAR)
+
+
+# operator: (number of values, predicate function)
+FILTER_OPERATORS = {
+    "gt": (1, lambda attr, value: attr > value),
+    "gte": (1, lambda attr, value: attr >= value),
+    "lt": (1, lambda attr, value: attr < value),
+    "lte": (1, lambda attr, value: attr <= value),
+    "ne": (1, lambda attr, value: attr != value),
+    "startswith": (1, _startswith),
+    "between": (2, lambda attr, values: attr.between(*values)),
+    "in": (None, lambda attr, values: attr.in_(values)),
+}
+
+
+def parse_filter_key(key, dict_schema):
+    """
+    Splits query parameter into column name and operator.
+
+    Args:
+        key (str): query parameter name
+        dict_schema (dict): dict with flask fields
+
+    Raises:
+        ValueError: if the column is known but the operator is not
+
+    Returns:
+        tuple: (column name, operator) or None if key is not a filter
+    """
+    if key in dict_schema:
+        return key, None
+    if OPERATOR_SEPARATOR in key:
+        name, operator = key.rsplit(OPERATOR_SEPARATOR, 1)
+        if name in dict_schema:
+            if operator not in FILTER_OPERATORS:
+                raise ValueError(
+                    "Unknown filter operator %s, expected one of %s"
+                    % (operator, ", ".join(FILTER_OPERATORS))
+                )
+            return name, operator
+    return None
+
+
+def convert_value(field, value):
+    """
+    Converts query parameter value to the type of the flask field.
+
+    Args:
+        field ([type]): flask field
+        value (str): value
+
+    Raises:
+        ValueError: if value can not be converted
+
+    Returns:
+        [type]: converted value
+    """
+    if not isinstance(value, str):
+        return value
+    if isinstance(field, f_fields.Integer):
+        return int(value)
+    if isinstance(field, (f_fields.Float, f_fields.Arbitrary)):
+        return float(value)
+    if isinstance(field, f_fields.Boolean):
+        if value.lower() not in ("true", "false", "1", "0"):
+            raise ValueError("Invalid boolean %s" % value)
+        return value.lower() in ("true", "1")
+    if isinstance(field, (f_fields.DateTime, f_fields.Date)):
+        for datetime_format in DATETIME_FORMATS:
+            try:
+                return datetime.strptime(value, datetime_format)
+            except ValueError:
+                pass
+        raise ValueError("Invalid date %s" % value)
+    return value
+
+
+def get_filter_clause(attr, field, operator, value):
+    """
+    Returns SQL predicate for the operator.
+
+    Multiple values (between, in) are passed either as a list or as
+    a comma separated string.
+
+    Args:
+        attr ([type]): model attribute
+        field ([type]): flask field of the attribute
+        operator (str): operator from FILTER_OPERATORS
+        value (str or list): value
+
+    Raises:
+        ValueError: if value is not valid for the operator
+
+    Returns:
+        [type]: predicate
+    """
+    value_count, predicate = FILTER_OPERATORS[operator]
+    if operator == "startswith" and not isinstance(field, f_fields.String):
+        raise ValueError("Operator startswith is supported just for text fields")
+    if value_count == 1:
+        return predicate(attr, convert_value(field, value))
+
+    if isinstance(value, str):
+        value = value.split(",")
+    values = [convert_value(field, item) for item in value]
+    if value_count and len(values) != value_count:
+        raise ValueError(
+            "Operator %s expects %d comma separated values" % (operator, value_count)
+        )
+    return predicate(attr, values)
@@ -0,0 +1,134 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Response formats of list queries negotiated with the Accept header.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import datetime
+import decimal
+
+from flask import has_request_context, request
+
+from .serializers import format_datetime
+
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+COLUMNS_JSON_MIMETYPE = "application/vnd.ispyb.columns+json"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+COLUMNAR_MIMETYPES = (COLUMNS_JSON_MIMETYPE, ARROW_MIMETYPE)
+RESPONSE_FORMATS = [
+    JSON_MIMETYPE,
+    NDJSON_MIMETYPE,
+    COLUMNS_JSON_MIMETYPE,
+    ARROW_MIMETYPE,
+]
+
+
+def get_response_format():
+    """
+    Returns response format accepted by the client of the current request.
+
+    Returns:
+        str: one of RESPONSE_FORMATS, JSON_MIMETYPE by default
+    """
+    if not has_request_context():
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match(
+        RESPONSE_FORMATS, default=JSON_MIMETYPE
+    )
+
+
+def add_vary_accept(response):
+    """
+    Adds Accept to the Vary header of responses to negotiated requests.
+
+    Caches then keep one response per format. get_db_items marks the
+    request with negotiated_format before the ETag is checked, so 304
+    responses get the header as well.
+
+    Args:
+        response ([type]): flask response
+
+    Returns:
+        [type]: flask response
+    """
+    if getattr(request, "negotiated_format", False):
+        response.vary.add("Accept")
+    return response
+
+
+def columns_to_json(columns):
+    """
+    Converts column values to JSON serializable types.
+
+    Datetimes are formatted as in the row responses, see
+    serializers.format_datetime.
+
+    Args:
+        columns (dict): {column name: list of values}
+
+    Returns:
+        dict: {column name: list of values}
+    """
+    for name, values in columns.items():
+        if any(
+            isinstance(value, (datetime.date, decimal.Decimal)) for value in values
+        ):
+            columns[name] = [_to_json_value(value) for value in values]
+    return columns
+
+
+def _to_json_value(value):
+    if isinstance(value, datetime.datetime):
+        return format_datetime(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def columns_to_arrow_stream(columns):
+    """
+    Serializes columns as Apache Arrow IPC stream.
+
+    pyarrow is an optional dependency and is imported on first use.
+
+    Args:
+        columns (dict): {column name: list of values}
+
+    Raises:
+        ImportError: if pyarrow is not installed
+
+    Returns:
+        bytes: Arrow stream
+    """
+    import pyarrow  # pylint: disable=import-outside-toplevel
+
+    table = pyarrow.table(columns)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
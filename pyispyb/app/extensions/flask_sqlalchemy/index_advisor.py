@@ -0,0 +1,180 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Index advisor.
+
+get_db_items records the columns clients filter and sort by. Columns
+without an index are reported with the number of uses and the estimated
+number of rows of the table, together with an Alembic migration creating
+the missing indexes.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import datetime
+import threading
+import uuid
+from collections import Counter
+
+import sqlalchemy
+
+
+MIGRATION_TEMPLATE = '''"""Add indexes suggested by the index advisor
+
+Revision ID: %(revision)s
+Revises: %(down_revision)s
+Create Date: %(create_date)s
+"""
+from alembic import op
+
+
+revision = %(revision)r
+down_revision = %(down_revision)r
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+%(upgrade)s
+
+
+def downgrade():
+%(downgrade)s
+'''
+
+
+def is_column_indexed(column):
+    """
+    Returns True if the column is the leading column of an index.
+
+    Primary keys, unique constraints and indexes declared in the model are
+    considered, as well as foreign keys, which are indexed by InnoDB.
+
+    Args:
+        column ([type]): table column
+
+    Returns:
+        bool: True if queries on the column can use an index
+    """
+    if column.index or column.unique or column.foreign_keys:
+        return True
+    table = column.table
+    indexed_columns = [list(table.primary_key.columns)]
+    indexed_columns += [list(index.columns) for index in table.indexes]
+    indexed_columns += [
+        list(constraint.columns)
+        for constraint in table.constraints
+        if isinstance(constraint, sqlalchemy.UniqueConstraint)
+    ]
+    return any(columns and columns[0] is column for columns in indexed_columns)
+
+
+class IndexAdvisor:
+    """
+    Counts filter and sort columns used per model.
+    """
+
+    def __init__(self):
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql_alchemy_model, keys):
+        """
+        Records use of the model attributes in a query.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            keys (list): attribute names used to filter or sort
+        """
+        if not keys:
+            return
+        with self._lock:
+            self._usage.setdefault(sql_alchemy_model, Counter()).update(set(keys))
+
+    def get_unindexed_usage(self, min_uses=1):
+        """
+        Returns used columns without index.
+
+        Args:
+            min_uses (int, optional): minimal number of uses. Defaults to 1.
+
+        Returns:
+            list: list of (model, column, uses) tuples, the most used first
+        """
+        with self._lock:
+            usage = [
+                (sql_alchemy_model, key, uses)
+                for sql_alchemy_model, counter in self._usage.items()
+                for key, uses in counter.items()
+                if uses >= min_uses
+            ]
+        result = []
+        for sql_alchemy_model, key, uses in usage:
+            column_attrs = sqlalchemy.inspect(sql_alchemy_model).column_attrs
+            if key not in column_attrs:
+                continue
+            column = column_attrs[key].columns[0]
+            if not is_column_indexed(column):
+                result.append((sql_alchemy_model, column, uses))
+        return sorted(result, key=lambda item: -item[2])
+
+
+def get_index_name(column):
+    """
+    Returns name of the suggested index.
+
+    Args:
+        column ([type]): table column
+
+    Returns:
+        str: index name
+    """
+    return "ix_%s_%s" % (column.table.name, column.name)
+
+
+def render_migration(suggestions, down_revision=None):
+    """
+    Returns Alembic revision script creating the suggested indexes.
+
+    Args:
+        suggestions (list): suggestions returned by get_index_suggestions
+        down_revision (str, optional): current head revision. Defaults to None.
+
+    Returns:
+        str: revision script
+    """
+    upgrade = [
+        "    op.create_index(%r, %r, [%r])"
+        % (suggestion["index_name"], suggestion["table"], suggestion["column"])
+        for suggestion in suggestions
+    ]
+    downgrade = [
+        "    op.drop_index(%r, table_name=%r)"
+        % (suggestion["index_name"], suggestion["table"])
+        for suggestion in reversed(suggestions)
+    ]
+    return MIGRATION_TEMPLATE % {
+        "revision": uuid.uuid4().hex[:12],
+        "down_revision": down_revision,
+        "create_date": datetime.datetime.now().isoformat(" "),
+        "upgrade": "\n".join(upgrade) or "    pass",
+        "downgrade": "\n".join(downgrade) or "    pass",
+    }
@@ -0,0 +1,189 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Per request SQL statistics.
+
+Engine events count the statements executed during a request, their total
+time and how many times each statement shape ran. Responses get a
+Server-Timing header and statement shapes executed more than
+DB_N_PLUS_ONE_THRESHOLD times are logged as N+1 queries. Slow statements
+are passed to the slow query log of the app.
+
+Headers are sent before the body of streamed responses (NDJSON) is
+generated, so these get neither the header nor the N+1 check, which would
+miss the queries executed while streaming.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+log = logging.getLogger(__name__)
+
+# Lists of placeholders, for example IN (?, ?, ?), have one shape
+PLACEHOLDER_LIST_RE = re.compile(r"\((\s*(\?|%s|:\w+)\s*,)+\s*(\?|%s|:\w+)\s*\)")
+
+
+class RequestStats:
+    """
+    SQL statistics of one request.
+
+    Attributes:
+        count (int): number of statements
+        duration (float): total execution time in seconds
+        shapes (Counter): number of executions per statement shape
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def add(self, statement, duration):
+        """
+        Adds executed statement.
+
+        Args:
+            statement (str): SQL statement with placeholders
+            duration (float): execution time in seconds
+        """
+        self.count += 1
+        self.duration += duration
+        self.shapes[get_statement_shape(statement)] += 1
+
+    def get_repeated_shapes(self, threshold):
+        """
+        Returns statement shapes executed more than threshold times.
+
+        Args:
+            threshold (int): maximal number of executions
+
+        Returns:
+            list: list of (shape, count) tuples
+        """
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    def get_server_timing(self):
+        """
+        Returns Server-Timing header value.
+
+        Returns:
+            str: header value
+        """
+        return 'db;dur=%.1f;desc="%d queries"' % (self.duration * 1000, self.count)
+
+
+def get_statement_shape(statement):
+    """
+    Returns statement with lists of placeholders collapsed to one.
+
+    Args:
+        statement (str): SQL statement with placeholders
+
+    Returns:
+        str: statement shape
+    """
+    return PLACEHOLDER_LIST_RE.sub("(?)", " ".join(statement.split()))
+
+
+def get_request_stats():
+    """
+    Returns SQL statistics of the current request.
+
+    Returns:
+        RequestStats: statistics or None outside of a request
+    """
+    if not has_request_context():
+        return None
+    if not hasattr(request, "db_stats"):
+        request.db_stats = RequestStats()
+    return request.db_stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    stats = get_request_stats()
+    if stats is not None:
+        stats.add(statement, duration)
+    if has_app_context():
+        slow_query_log = current_app.extensions.get("slow_query_log")
+        if slow_query_log is not None:
+            slow_query_log.add(
+                conn, statement, parameters, context, executemany, duration
+            )
+
+
+def register_engine_events():
+    """
+    Registers statement timing on all engines, including read replicas.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def add_server_timing(response):
+    """
+    Adds Server-Timing header and logs N+1 queries of the request.
+
+    Streamed responses are skipped, their queries run after this hook.
+
+    Args:
+        response ([type]): flask response
+
+    Returns:
+        [type]: flask response
+    """
+    stats = getattr(request, "db_stats", None)
+    if stats is None or response.is_streamed:
+        return response
+
+    response.headers.add("Server-Timing", stats.get_server_timing())
+    threshold = current_app.config.get("DB_N_PLUS_ONE_THRESHOLD")
+    if threshold:
+        for shape, count in stats.get_repeated_shapes(threshold):
+            log.warning(
+                "N+1 queries: %s %s executed %d times: %s",
+                request.method,
+                request.path,
+                count,
+                shape,
+            )
+    return response
@@ -0,0 +1,158 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import base64
+import datetime
+import decimal
+import json
+
+import sqlalchemy
+
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def encode_cursor(values):
+    """
+    Encodes ordering key values of the last returned row as an opaque token.
+
+    Args:
+        values (list): values of the ordering columns
+
+    Returns:
+        str: url safe cursor
+    """
+    payload = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    cursor = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    return cursor.rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes cursor created by encode_cursor.
+
+    Args:
+        cursor (str): cursor passed by the client
+
+    Raises:
+        ValueError: if the cursor is malformed
+
+    Returns:
+        list: values of the ordering columns
+    """
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = base64.urlsafe_b64decode((cursor + padding).encode("ascii"))
+        values = json.loads(payload.decode("utf-8"))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid pagination cursor")
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid pagination cursor")
+    try:
+        return [_from_json(value) for value in values]
+    except (TypeError, ValueError, decimal.InvalidOperation):
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(order_columns, values):
+    """
+    Returns filter selecting rows placed after values in the given ordering.
+
+    For ordering (a, b) and values (x, y) the filter is
+    a > x OR (a = x AND b > y), which can be resolved via index range scan.
+    NULL values are placed first in ascending order and last in descending
+    order, as MySQL sorts them.
+
+    Args:
+        order_columns (list): list of (model attribute, descending) tuples
+        values (list): values of the ordering columns of the last seen row
+
+    Raises:
+        ValueError: if number of values does not match the ordering
+
+    Returns:
+        sqlalchemy expression: filter expression
+    """
+    if len(order_columns) != len(values):
+        raise ValueError("Pagination cursor does not match the ordering")
+
+    clauses = []
+    for index, (column, descending) in enumerate(order_columns):
+        equal_clauses = [
+            prev_column == prev_value
+            for (prev_column, _), prev_value in zip(
+                order_columns[:index], values[:index]
+            )
+        ]
+        after_clause = _after_clause(column, values[index], descending)
+        if after_clause is not None:
+            clauses.append(sqlalchemy.and_(*equal_clauses, after_clause))
+
+    return sqlalchemy.or_(*clauses)
+
+
+def _after_clause(column, value, descending):
+    """
+    Returns filter selecting column values placed after value.
+
+    Args:
+        column ([type]): model attribute
+        value ([type]): value of the last seen row
+        descending (bool): True for descending order
+
+    Returns:
+        sqlalchemy expression: filter expression or None if no value can
+        be placed after value
+    """
+    if descending:
+        if value is None:
+            return None
+        return sqlalchemy.or_(column < value, column.is_(None))
+    if value is None:
+        return column.isnot(None)
+    return column > value
+
+
+def _to_json(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.strftime(DATETIME_FORMAT)}
+    if isinstance(value, datetime.date):
+        return {"d": value.strftime(DATE_FORMAT)}
+    if isinstance(value, decimal.Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.datetime.strptime(value["dt"], DATETIME_FORMAT)
+        if "d" in value:
+            return datetime.datetime.strptime(value["d"], DATE_FORMAT).date()
+        if "dec" in value:
+            return decimal.Decimal(value["dec"])
+        raise ValueError("Invalid pagination cursor")
+    return value
@@ -0,0 +1,135 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Connection pool with usage counters.
+
+Counters are kept per pool, so every worker process reports its own pool.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+# Checkouts waiting longer than this (in seconds) are counted as waits
+POOL_WAIT_THRESHOLD = 0.001
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool counting checkouts, waits for a free connection and timeouts.
+
+    Opening new connections is counted separately from the waits, so slow
+    connects to the database are not reported as a too small pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        # Connect time of the checkout running in the current thread
+        self._checkout = threading.local()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.connect_time = 0.0
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            self._checkout.connect_time = (
+                getattr(self._checkout, "connect_time", 0.0) + elapsed
+            )
+            with self._stats_lock:
+                self.connects += 1
+                self.connect_time += elapsed
+
+    def _do_get(self):
+        self._checkout.connect_time = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start - self._checkout.connect_time
+            with self._stats_lock:
+                self.checkouts += 1
+                if elapsed > POOL_WAIT_THRESHOLD:
+                    self.waits += 1
+                    self.wait_time += elapsed
+                    self.max_wait_time = max(self.max_wait_time, elapsed)
+
+    def get_stats(self):
+        """
+        Returns usage counters of the pool.
+
+        Returns:
+            dict: counters, times in seconds
+        """
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "max_wait_time": self.max_wait_time,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "connect_time": self.connect_time,
+            }
+
+
+def get_pool_status(pool):
+    """
+    Returns state of the connection pool of this worker.
+
+    Args:
+        pool ([type]): SQLAlchemy pool
+
+    Returns:
+        dict: pool state
+    """
+    status = {"pid": os.getpid(), "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.get_stats())
+    return status
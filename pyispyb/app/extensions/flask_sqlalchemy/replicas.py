@@ -0,0 +1,219 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Read replicas.
+
+SQLALCHEMY_REPLICAS lists the replica databases, either as URIs or as
+dicts {"uri": str, "max_lag": seconds}. Read helpers of the SQLAlchemy
+extension use a replica if its replication lag does not exceed max_lag
+(REPLICA_MAX_LAG by default), otherwise the primary database is used.
+
+After a write, the response carries a signed primary-until time in a
+cookie and in the X-Primary-Until header. Requests of the same client
+sending it back read from the primary until then, whichever worker
+serves them, so clients read their own writes.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import itertools
+import threading
+import time
+
+from flask import current_app, request
+from flask_sqlalchemy import SignallingSession
+from itsdangerous import BadSignature, Signer
+
+
+STICKY_COOKIE = "ispyb_primary_until"
+STICKY_HEADER = "X-Primary-Until"
+
+
+class Replica:
+    """
+    Read replica with cached replication lag.
+
+    Attributes:
+        uri (str): database URI
+        engine ([type]): SQLAlchemy engine
+        max_lag (float): maximal accepted lag in seconds
+    """
+
+    def __init__(self, uri, engine, max_lag):
+        self.uri = uri
+        self.engine = engine
+        self.max_lag = max_lag
+        self.lag = None
+        self._lag_checked_at = None
+        self._lock = threading.Lock()
+
+    def is_available(self, check_interval):
+        """
+        Returns True if the replica lag is within max_lag.
+
+        The lag is measured at most once per check_interval seconds.
+        Unreachable replicas are not available until the next check.
+
+        Args:
+            check_interval (float): seconds between lag checks
+
+        Returns:
+            bool: True if the replica can be used
+        """
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self._lag_checked_at is None
+                or now - self._lag_checked_at >= check_interval
+            ):
+                self._lag_checked_at = now
+                try:
+                    self.lag = get_replication_lag(self.engine)
+                except Exception as ex:
+                    print("Replica %s is not available: %s" % (self.engine.url, ex))
+                    self.lag = None
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def get_status(self):
+        """
+        Returns replica state.
+
+        Returns:
+            dict: replica url, lag and max_lag
+        """
+        return {
+            "url": repr(self.engine.url),
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+        }
+
+
+class ReplicaSet:
+    """
+    Replicas of one application used in round robin order.
+    """
+
+    def __init__(self, replicas, check_interval):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._order = itertools.cycle(range(len(replicas)))
+
+    def choose(self):
+        """
+        Returns next available replica.
+
+        Returns:
+            Replica: replica or None if no replica is available
+        """
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._order)]
+            if replica.is_available(self.check_interval):
+                return replica
+        return None
+
+
+def get_replication_lag(engine):
+    """
+    Returns replication lag of the database in seconds.
+
+    MySQL replicas report Seconds_Behind_Master (Seconds_Behind_Source
+    since MySQL 8.0.22). Other databases, for example sqlite used in tests,
+    are considered up to date.
+
+    Args:
+        engine ([type]): SQLAlchemy engine
+
+    Returns:
+        float: lag in seconds or None if the replication is not running
+    """
+    if engine.dialect.name != "mysql":
+        return 0
+    with engine.connect() as connection:
+        row = connection.execute("SHOW SLAVE STATUS").first()
+    if row is None:
+        return None
+    row = dict(row)
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending queries to the replica engine set in info["replica"].
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        replica = self.info.get("replica")
+        if replica is not None:
+            return replica.engine
+        return super().get_bind(mapper, clause)
+
+
+def _get_sticky_signer():
+    secret_key = current_app.secret_key
+    if not secret_key:
+        return None
+    return Signer(secret_key, salt="pyispyb.replica_sticky")
+
+
+def get_primary_until():
+    """
+    Returns time until which the client of the request reads the primary.
+
+    The time comes from the sticky cookie or header of the request, values
+    with a wrong signature are ignored.
+
+    Returns:
+        float: time.time() value, 0 if the client did not write recently
+    """
+    value = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    signer = _get_sticky_signer()
+    if not value or signer is None:
+        return 0
+    try:
+        return float(signer.unsign(value))
+    except (BadSignature, ValueError):
+        return 0
+
+
+def add_sticky_cookie(response):
+    """
+    Sends primary-until time of a request that wrote items to the client.
+
+    Args:
+        response ([type]): flask response
+
+    Returns:
+        [type]: flask response
+    """
+    primary_until = getattr(request, "db_primary_until", None)
+    signer = _get_sticky_signer()
+    if primary_until is None or signer is None:
+        return response
+    value = signer.sign(repr(primary_until)).decode()
+    response.set_cookie(
+        STICKY_COOKIE,
+        value,
+        max_age=max(1, int(primary_until - time.time()) + 1),
+        httponly=True,
+    )
+    response.headers[STICKY_HEADER] = value
+    return response
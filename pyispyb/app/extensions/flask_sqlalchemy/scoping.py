@@ -0,0 +1,182 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Proposal scoping.
+
+Restricts queries to items of the proposals a person can access: proposals
+of which the person is the main contact, is a member (ProposalHasPerson) or
+takes part in a session (Session_has_Person). Tables without proposalId
+column reach the proposal through their foreign keys, for example
+BLSample -> Crystal -> Protein, and are filtered with a correlated EXISTS
+subquery, so no list of proposal ids is sent to the database.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from collections import deque
+from functools import lru_cache
+
+import sqlalchemy
+
+
+PROPOSAL_ID_COLUMN = "proposalId"
+# Maximal number of foreign keys followed from a table to a proposalId
+MAX_PATH_LENGTH = 6
+# Foreign keys to these tables are followed first, so items are scoped by
+# their session or sample rather than by shared items like Screen
+PREFERRED_TABLES = (
+    "Shipping",
+    "BLSession",
+    "Protein",
+    "DataCollectionGroup",
+    "DataCollection",
+    "Crystal",
+    "BLSample",
+    "Container",
+    "Dewar",
+)
+
+
+class ProposalScope:
+    """
+    Proposals accessible by a person.
+
+    Attributes:
+        person_id (int): personId, None matches no proposal
+    """
+
+    def __init__(self, person_id):
+        self.person_id = person_id
+
+
+@lru_cache(maxsize=None)
+def get_proposal_path(table, max_length=MAX_PATH_LENGTH):
+    """
+    Returns the shortest chain of foreign keys leading to a proposalId.
+
+    Among chains of the same length, the one through PREFERRED_TABLES is
+    chosen.
+
+    Args:
+        table ([type]): SQLAlchemy table
+        max_length (int, optional): maximal number of foreign keys
+
+    Returns:
+        list: list of ForeignKey objects, empty if the table has proposalId
+            column, None if no proposal can be reached
+    """
+    queue = deque([(table, [])])
+    visited = {table}
+    while queue:
+        current, path = queue.popleft()
+        if PROPOSAL_ID_COLUMN in current.c:
+            return path
+        if len(path) >= max_length:
+            continue
+        targets = []
+        for foreign_key in current.foreign_keys:
+            try:
+                target = foreign_key.column.table
+            except sqlalchemy.exc.NoReferencedTableError:
+                continue
+            if target.name in PREFERRED_TABLES:
+                priority = PREFERRED_TABLES.index(target.name)
+            else:
+                priority = len(PREFERRED_TABLES)
+            targets.append((priority, foreign_key.parent.name, target, foreign_key))
+        for _, _, target, foreign_key in sorted(targets, key=lambda item: item[:2]):
+            if target not in visited:
+                visited.add(target)
+                queue.append((target, path + [foreign_key]))
+    return None
+
+
+def get_accessible_proposals(metadata, person_id):
+    """
+    Returns select of the ids of the proposals accessible by the person.
+
+    Args:
+        metadata ([type]): SQLAlchemy metadata with the ISPyB tables
+        person_id (int): personId
+
+    Returns:
+        [type]: UNION of selects of proposalId
+    """
+    proposal = metadata.tables["Proposal"]
+    proposal_has_person = metadata.tables["ProposalHasPerson"]
+    selects = [
+        sqlalchemy.select([proposal.c.proposalId]).where(
+            proposal.c.personId == person_id
+        ),
+        sqlalchemy.select([proposal_has_person.c.proposalId]).where(
+            proposal_has_person.c.personId == person_id
+        ),
+    ]
+    session_has_person = metadata.tables.get("Session_has_Person")
+    if session_has_person is not None:
+        session = metadata.tables["BLSession"]
+        selects.append(
+            sqlalchemy.select([session.c.proposalId])
+            .select_from(
+                session.join(
+                    session_has_person,
+                    session.c.sessionId == session_has_person.c.sessionId,
+                )
+            )
+            .where(session_has_person.c.personId == person_id)
+        )
+    return sqlalchemy.union(*selects)
+
+
+def get_scope_clause(table, scope):
+    """
+    Returns WHERE clause restricting the table to the proposal scope.
+
+    Args:
+        table ([type]): SQLAlchemy table
+        scope (ProposalScope): accessible proposals
+
+    Raises:
+        ValueError: if the table is not related to a proposal
+
+    Returns:
+        [type]: SQL expression
+    """
+    path = get_proposal_path(table)
+    if path is None:
+        raise ValueError("%s is not related to a proposal" % table.name)
+    if scope.person_id is None:
+        return sqlalchemy.false()
+
+    accessible = get_accessible_proposals(table.metadata, scope.person_id)
+    if not path:
+        return table.c[PROPOSAL_ID_COLUMN].in_(accessible)
+
+    conditions = []
+    current = table
+    for foreign_key in path:
+        target = foreign_key.column.table.alias()
+        conditions.append(
+            target.c[foreign_key.column.name] == current.c[foreign_key.parent.name]
+        )
+        current = target
+    conditions.append(current.c[PROPOSAL_ID_COLUMN].in_(accessible))
+    return sqlalchemy.exists().where(sqlalchemy.and_(*conditions))
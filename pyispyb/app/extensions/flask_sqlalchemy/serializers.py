@@ -0,0 +1,153 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Compiled row serializers.
+
+A serializer is a function generated from dict_schema that converts one
+ORM row to a dict in a single pass. The output is the same as a marshmallow
+dump followed by flask-restx marshalling: datetimes are ISO 8601 strings
+in UTC and None values are kept. Serializers are compiled once per model,
+schema and requested fields.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import datetime
+
+import sqlalchemy
+from flask_restx import fields as f_fields
+
+
+# flask field class: expression formatting a not None value
+FIELD_FORMATS = {
+    f_fields.Integer: "int(%s)",
+    f_fields.Float: "float(%s)",
+    f_fields.String: "str(%s)",
+    f_fields.Boolean: "bool(%s)",
+    f_fields.Date: "%s.isoformat()",
+    f_fields.DateTime: "format_datetime(%s)",
+}
+
+_serializers = {}
+
+
+def format_datetime(value):
+    """
+    Returns ISO 8601 string of the datetime, naive values are UTC.
+
+    Args:
+        value (datetime): datetime or date
+
+    Returns:
+        str: formatted datetime
+    """
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    else:
+        value = value.astimezone(datetime.timezone.utc)
+    return value.isoformat()
+
+
+def _get_format(field):
+    """
+    Returns format expression of the flask field.
+
+    Args:
+        field ([type]): flask field
+
+    Returns:
+        str: expression with one %s placeholder or None
+    """
+    if isinstance(field, f_fields.DateTime) and field.dt_format != "iso8601":
+        return None
+    return FIELD_FORMATS.get(type(field))
+
+
+def compile_serializer(sql_alchemy_model, dict_schema, fields=None):
+    """
+    Generates function converting a row of the model to a dict.
+
+    Fields without a column in the model are returned as None, fields of
+    other flask field types are formatted by the field itself.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        dict_schema (dict): dict with flask fields
+        fields (tuple, optional): field names, all if None. Defaults to None.
+
+    Returns:
+        function: serializer taking one row and returning dict
+    """
+    column_keys = set(
+        attr.key for attr in sqlalchemy.inspect(sql_alchemy_model).column_attrs
+    )
+    namespace = {"format_datetime": format_datetime}
+    lines = ["def serialize(row):"]
+    items = []
+    for index, name in enumerate(fields or dict_schema.keys()):
+        if name not in column_keys:
+            items.append("%r: None" % name)
+            continue
+
+        value = "v%d" % index
+        if name.isidentifier():
+            lines.append("    %s = row.%s" % (value, name))
+        else:
+            lines.append("    %s = getattr(row, %r)" % (value, name))
+
+        field_format = _get_format(dict_schema[name])
+        if field_format is None:
+            namespace["_format_%d" % index] = dict_schema[name].format
+            field_format = "_format_%d(%%s)" % index
+        items.append(
+            "%r: None if %s is None else %s" % (name, value, field_format % value)
+        )
+    lines.append("    return {%s}" % ", ".join(items))
+
+    source = "\n".join(lines)
+    exec(  # pylint: disable=exec-used
+        compile(source, "<serializer %s>" % sql_alchemy_model.__name__, "exec"),
+        namespace,
+    )
+    return namespace["serialize"]
+
+
+def get_serializer(sql_alchemy_model, dict_schema, fields=None):
+    """
+    Returns cached serializer of the model and schema.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        dict_schema (dict): dict with flask fields
+        fields (tuple, optional): field names, all if None. Defaults to None.
+
+    Returns:
+        function: serializer taking one row and returning dict
+    """
+    key = (sql_alchemy_model, id(dict_schema), fields)
+    if key not in _serializers:
+        _serializers[key] = (
+            compile_serializer(sql_alchemy_model, dict_schema, fields),
+            dict_schema,
+        )
+    return _serializers[key][0]
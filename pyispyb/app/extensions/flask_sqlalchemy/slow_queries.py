@@ -0,0 +1,177 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Slow query log.
+
+Statements running longer than SLOW_QUERY_THRESHOLD seconds are recorded
+with their parameters, the endpoint, the calling module and the EXPLAIN
+plan of SELECT statements. Records are kept in memory for the admin route
+and, if SLOW_QUERY_LOG_PATH is set, written as JSON lines to this rotating
+log file. The log is disabled unless SLOW_QUERY_THRESHOLD is set.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import traceback
+from collections import deque
+
+from flask import has_request_context, request
+
+
+EXTENSION_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.abspath(os.path.join(EXTENSION_DIR, "..", "..", ".."))
+
+
+def get_caller():
+    """
+    Returns the pyispyb code that executed the statement.
+
+    Returns:
+        str: "module:function:line" or None
+    """
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(PACKAGE_DIR) and not frame.filename.startswith(
+            EXTENSION_DIR
+        ):
+            module = os.path.relpath(frame.filename, os.path.dirname(PACKAGE_DIR))
+            module = os.path.splitext(module)[0].replace(os.sep, ".")
+            return "%s:%s:%d" % (module, frame.name, frame.lineno)
+    return None
+
+
+def explain_statement(connection, statement, parameters):
+    """
+    Returns EXPLAIN plan of the statement.
+
+    The plan is queried with a new DBAPI cursor, so no engine events are
+    triggered.
+
+    Args:
+        connection ([type]): SQLAlchemy connection that executed the statement
+        statement (str): SQL statement
+        parameters ([type]): bound parameters
+
+    Returns:
+        list: list of plan rows as dicts
+    """
+    prefix = "EXPLAIN "
+    if connection.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+    Records statements slower than the threshold.
+
+    Attributes:
+        threshold (float): minimal duration in seconds
+        records (deque): latest records
+    """
+
+    def __init__(
+        self, threshold, history_size=100, log_path=None, max_bytes=0, backup_count=0
+    ):
+        self.threshold = threshold
+        self.records = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self.logger = None
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            self.logger = logging.getLogger("pyispyb.slow_queries.%s" % log_path)
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+            if not self.logger.handlers:
+                handler = logging.handlers.RotatingFileHandler(
+                    log_path, maxBytes=max_bytes, backupCount=backup_count
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.logger.addHandler(handler)
+
+    def add(self, connection, statement, parameters, context, executemany, duration):
+        """
+        Records the statement if it is slow.
+
+        Args:
+            connection ([type]): SQLAlchemy connection
+            statement (str): SQL statement
+            parameters ([type]): bound parameters
+            context ([type]): execution context
+            executemany (bool): True if executed with many parameter sets
+            duration (float): execution time in seconds
+        """
+        if self.threshold is None or duration < self.threshold:
+            return
+
+        record = {
+            "time": datetime.datetime.now().isoformat(),
+            "duration": round(duration, 6),
+            "statement": statement,
+            "parameters": parameters,
+            "endpoint": None,
+            "method": None,
+            "caller": get_caller(),
+            "explain": None,
+        }
+        if has_request_context():
+            record["endpoint"] = request.endpoint
+            record["method"] = request.method
+
+        stream_results = context is not None and context.execution_options.get(
+            "stream_results"
+        )
+        if (
+            statement.lstrip().upper().startswith("SELECT")
+            and not executemany
+            and not stream_results
+        ):
+            try:
+                record["explain"] = explain_statement(connection, statement, parameters)
+            except Exception as ex:
+                record["explain"] = "Unable to explain statement: %s" % ex
+
+        record = json.loads(json.dumps(record, default=str))
+        with self._lock:
+            self.records.append(record)
+        if self.logger:
+            self.logger.info(json.dumps(record))
+
+    def get_records(self):
+        """
+        Returns recorded statements, the latest first.
+
+        Returns:
+            list: list of record dicts
+        """
+        with self._lock:
+            return list(reversed(self.records))
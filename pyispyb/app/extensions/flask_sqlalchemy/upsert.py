@@ -0,0 +1,125 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Upsert statements.
+
+A row is inserted, or updated if a row with the same natural key exists,
+with one statement: INSERT ... ON DUPLICATE KEY UPDATE on MySQL and
+INSERT ... ON CONFLICT DO UPDATE on SQLite. Both rely on a unique index
+covering exactly the natural key columns.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import sqlalchemy
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Insert
+
+
+UPSERT_DIALECTS = ("mysql", "sqlite")
+
+
+class SQLiteUpsert(Insert):
+    """
+    INSERT ... ON CONFLICT (natural key) DO UPDATE statement.
+
+    SQLAlchemy 1.3 has no SQLite upsert construct, the clause is appended
+    to the compiled INSERT.
+    """
+
+    def __init__(self, table, values, conflict_columns, update_columns):
+        super().__init__(table, values)
+        self.conflict_columns = conflict_columns
+        self.update_columns = update_columns
+
+
+@compiles(SQLiteUpsert, "sqlite")
+def _compile_sqlite_upsert(element, compiler, **kw):
+    quote = compiler.preparer.quote
+    statement = compiler.visit_insert(element, **kw)
+    statement += " ON CONFLICT (%s)" % ", ".join(
+        quote(name) for name in element.conflict_columns
+    )
+    if not element.update_columns:
+        return statement + " DO NOTHING"
+    return statement + " DO UPDATE SET %s" % ", ".join(
+        "%s = excluded.%s" % (quote(name), quote(name))
+        for name in element.update_columns
+    )
+
+
+def get_upsert_statement(dialect_name, table, values, natural_key):
+    """
+    Returns upsert statement for the database dialect.
+
+    Args:
+        dialect_name (str): SQLAlchemy dialect name
+        table ([type]): SQLAlchemy table
+        values (dict): column values
+        natural_key (list): natural key column names
+
+    Returns:
+        [type]: SQLAlchemy statement
+    """
+    update_columns = [
+        name
+        for name in values
+        if name not in natural_key and not table.c[name].primary_key
+    ]
+    if dialect_name == "mysql":
+        statement = mysql.insert(table).values(values)
+        if not update_columns:
+            # Keeps the existing row, as DO NOTHING would
+            update_columns = natural_key[:1]
+        return statement.on_duplicate_key_update(
+            {name: statement.inserted[name] for name in update_columns}
+        )
+    if dialect_name == "sqlite":
+        return SQLiteUpsert(table, values, natural_key, update_columns)
+    raise NotImplementedError("Upsert is not supported by %s" % dialect_name)
+
+
+def get_unique_keys(engine, table_name):
+    """
+    Returns column sets of the primary key and unique indexes of the table.
+
+    Args:
+        engine ([type]): SQLAlchemy engine
+        table_name (str): table name
+
+    Returns:
+        list: list of frozensets of column names
+    """
+    inspector = sqlalchemy.inspect(engine)
+    unique_keys = [
+        frozenset(inspector.get_pk_constraint(table_name)["constrained_columns"])
+    ]
+    unique_keys += [
+        frozenset(index["column_names"])
+        for index in inspector.get_indexes(table_name)
+        if index["unique"]
+    ]
+    unique_keys += [
+        frozenset(constraint["column_names"])
+        for constraint in inspector.get_unique_constraints(table_name)
+    ]
+    return unique_keys
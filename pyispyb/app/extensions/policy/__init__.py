@@ -0,0 +1,207 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+Authorization policy.
+
+AUTHORIZATION_RULES are compiled at startup into a read only table
+(endpoint, method) -> role bitmask. Each role named in the rules gets one
+bit, so a request is checked with one dict lookup and one bitwise AND.
+Once the routes are registered, rules of unknown endpoints are reported.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import threading
+from types import MappingProxyType
+
+
+# Roles of resources without rule
+DEFAULT_ROLES = ("manager",)
+# Rule allowing all users, even without role
+ALL_ROLES = -1
+HTTP_METHODS = ("get", "post", "put", "patch", "delete", "head", "options")
+
+
+def get_role_bits(rules):
+    """
+    Assigns one bit to each role named in the rules.
+
+    Args:
+        rules (dict): {endpoint: {method: [roles]}}
+
+    Returns:
+        dict: {role: bit}
+    """
+    roles = set(DEFAULT_ROLES)
+    for methods in rules.values():
+        for method_roles in methods.values():
+            roles.update(method_roles or [])
+    roles.discard("all")
+    return {role: 1 << index for index, role in enumerate(sorted(roles))}
+
+
+def get_roles_mask(roles, role_bits):
+    """
+    Returns bitmask of the roles.
+
+    Args:
+        roles (list): role names
+        role_bits (dict): {role: bit}
+
+    Returns:
+        int: bitmask, ALL_ROLES if "all" or no role is given
+    """
+    if not roles or "all" in roles:
+        return ALL_ROLES
+    mask = 0
+    for role in roles:
+        mask |= role_bits.get(role, 0)
+    return mask
+
+
+def compile_rules(rules, role_bits):
+    """
+    Compiles authorization rules.
+
+    Args:
+        rules (dict): {endpoint: {method: [roles]}}
+        role_bits (dict): {role: bit}
+
+    Returns:
+        MappingProxyType: read only {(endpoint, method): bitmask}
+    """
+    table = {}
+    for endpoint, methods in rules.items():
+        for method, roles in methods.items():
+            table[(endpoint, method.lower())] = get_roles_mask(roles, role_bits)
+    return MappingProxyType(table)
+
+
+def validate_rules(rules, endpoints):
+    """
+    Checks that the rules reference existing endpoints and HTTP methods.
+
+    Args:
+        rules (dict): {endpoint: {method: [roles]}}
+        endpoints (set): names of the API endpoints
+
+    Returns:
+        list: error messages
+    """
+    errors = []
+    for endpoint, methods in rules.items():
+        if endpoint not in endpoints:
+            errors.append("Authorization rule for unknown endpoint %s" % endpoint)
+        for method in methods:
+            if method.lower() not in HTTP_METHODS:
+                errors.append(
+                    "Authorization rule for unknown method %s of endpoint %s"
+                    % (method, endpoint)
+                )
+    return errors
+
+
+class AuthorizationPolicy:
+    """
+    Compiled AUTHORIZATION_RULES of the application.
+    """
+
+    def __init__(self):
+        self.rules = {}
+        self.role_bits = {}
+        self.table = MappingProxyType({})
+        self.default_mask = 0
+        self._user_masks = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Compiles AUTHORIZATION_RULES of the app.
+
+        Args:
+            app (flask app): Flask application
+        """
+        self.rules = app.config.get("AUTHORIZATION_RULES") or {}
+        role_bits = get_role_bits(self.rules)
+        table = compile_rules(self.rules, role_bits)
+        with self._lock:
+            self.role_bits = role_bits
+            self.table = table
+            self.default_mask = get_roles_mask(DEFAULT_ROLES, role_bits)
+            self._user_masks = {}
+
+    def validate(self, endpoints):
+        """
+        Reports rules of unknown endpoints or methods.
+
+        Called once the routes are registered.
+
+        Args:
+            endpoints (set): names of the API endpoints
+
+        Returns:
+            list: error messages
+        """
+        errors = validate_rules(self.rules, endpoints)
+        for error in errors:
+            print(error)
+        return errors
+
+    def get_user_mask(self, roles):
+        """
+        Returns bitmask of the user roles.
+
+        Masks are computed once per set of roles. Roles not named in the
+        rules have no bit.
+
+        Args:
+            roles (list): user roles
+
+        Returns:
+            int: bitmask
+        """
+        key = frozenset(roles)
+        mask = self._user_masks.get(key)
+        if mask is None:
+            mask = 0
+            for role in key:
+                mask |= self.role_bits.get(role, 0)
+            with self._lock:
+                self._user_masks[key] = mask
+        return mask
+
+    def is_allowed(self, endpoint, method, user_mask):
+        """
+        Checks if a user with the roles bitmask can call the endpoint method.
+
+        Args:
+            endpoint (str): endpoint name
+            method (str): lower case HTTP method
+            user_mask (int): bitmask of the user roles
+
+        Returns:
+            bool: True if allowed
+        """
+        mask = self.table.get((endpoint, method), self.default_mask)
+        return mask == ALL_ROLES or bool(mask & user_mask)
+
+
+authorization_policy = AuthorizationPolicy()
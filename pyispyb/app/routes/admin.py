@@ -0,0 +1,74 @@
+"""
+Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from flask import request
+
+from pyispyb.flask_restx_patched import Resource
+
+from pyispyb.app.extensions import db
+from pyispyb.app.extensions.api import api_v1, Namespace
+from pyispyb.app.extensions.authentication import authentication_required
+from pyispyb.app.extensions.authorization import authorization_required
+
+
+__license__ = "LGPLv3+"
+
+
+api = Namespace("Admin", description="Server administration namespace", path="/admin")
+api_v1.add_namespace(api)
+
+
+@api.route("/db_pool", endpoint="admin_db_pool")
+@api.doc(security="apikey")
+class DatabasePool(Resource):
+    """Allows to monitor the database connection pool"""
+
+    @authentication_required
+    @authorization_required
+    def get(self):
+        """Returns connection pool state and counters of the worker"""
+        return db.get_pool_status()
+
+
+@api.route("/slow_queries", endpoint="admin_slow_queries")
+@api.doc(security="apikey")
+class SlowQueries(Resource):
+    """Allows to get statements slower than SLOW_QUERY_THRESHOLD"""
+
+    @authentication_required
+    @authorization_required
+    def get(self):
+        """Returns slow statements recorded by the worker with their plans"""
+        return db.get_slow_queries()
+
+
+@api.route("/index_suggestions", endpoint="admin_index_suggestions")
+@api.doc(security="apikey")
+class IndexSuggestions(Resource):
+    """Allows to get indexes missing for the filters used by clients"""
+
+    @authentication_required
+    @authorization_required
+    @api.doc(params={"down_revision": "Alembic head revision of the database"})
+    def get(self):
+        """Returns suggested indexes and Alembic migration creating them"""
+        return db.get_index_suggestions(request.args.get("down_revision"))
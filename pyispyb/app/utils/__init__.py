@@ -22,7 +22,7 @@ from requests import get
 from flask import current_app
 
 
-def create_response_item(msg=None, num_items=None, data=[]):
+def create_response_item(msg=None, num_items=None, data=[], **kwargs):
     """
     Creates response dictionary.
 
@@ -31,13 +31,16 @@ def create_response_item(msg=None, num_items=None, data=[]):
         error_msg ([type]): [description]
         num_items ([type]): [description]
         data ([type]): [description]
+        kwargs: additional items added to data (for example next_cursor)
 
     Returns:
         [type]: [description]
     """
+    data_dict = {"total": num_items, "rows": data}
+    data_dict.update(kwargs)
 
     return {
-        "data": {"total": num_items, "rows": data},
+        "data": data_dict,
         "message": msg,
     }
 
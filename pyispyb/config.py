@@ -38,9 +38,68 @@ class BaseConfig:
     API_ROOT = "/ispyb/api/v1"
     SECRET_KEY = os.urandom(16)
     SQLALCHEMY_TRACK_MODIFICATIONS = True
-    # SQLALCHEMY_POOL_RECYCLE = 2999
-    # SQLALCHEMY_POOL_TIMEOUT = 20
+    # Connection pool of each worker, updated by database_pool in the yaml
+    # config. Size, overflow and timeout are not used with sqlite.
+    DATABASE_POOL = {
+        "size": 10,
+        "max_overflow": 20,
+        "recycle": 2999,
+        "pre_ping": True,
+        "timeout": 20,
+    }
+    # Read replicas: list of URIs or {"uri": str, "max_lag": seconds} dicts
+    SQLALCHEMY_REPLICAS = []
+    REPLICA_MAX_LAG = 10  # in seconds
+    REPLICA_LAG_CHECK_INTERVAL = 5  # in seconds
+    # Reads of a client go to the primary for this time after its write
+    REPLICA_STICKY_TIME = 10  # in seconds
+    # Adds SQL statistics of the request in the Server-Timing header,
+    # streamed responses have none
+    SERVER_TIMING = True
+    # Logs statements executed more times in one request as N+1 queries
+    DB_N_PLUS_ONE_THRESHOLD = 10
+    # Statements slower than this (in seconds) are logged with their
+    # EXPLAIN plan, None disables the slow query log (e.g. set 1.0)
+    SLOW_QUERY_THRESHOLD = None
+    SLOW_QUERY_HISTORY = 100  # records kept in memory for /admin/slow_queries
+    # Rotating JSON lines file of the slow queries, None keeps them in memory
+    SLOW_QUERY_LOG_PATH = None
+    SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUP_COUNT = 5
+    # Unindexed filter and sort columns used this many times are suggested
+    # for indexing by /admin/index_suggestions
+    INDEX_ADVISOR_MIN_USES = 10
     PAGINATION_ITEMS_LIMIT = 1000
+    BULK_ITEMS_LIMIT = 10000
+    BULK_INSERT_CHUNK_SIZE = 1000  # rows inserted by one statement
+    SORT_UNINDEXED_ROWS_LIMIT = 100000
+    STREAM_CHUNK_SIZE = 500
+    # List ETags of these tables are computed by an aggregate query before
+    # the items are loaded, other ETags from the response body.
+    # {table name: column} of columns changed by every write, for example
+    # ON UPDATE CURRENT_TIMESTAMP columns with sub-second precision
+    ETAG_VERSION_COLUMNS = {}
+    # Tables of polled lists fingerprinted by a checksum of the rows
+    ETAG_CHECKSUM_TABLES = ["BLSession", "DataCollection", "Proposal"]
+    # Responses to POST requests with an Idempotency-Key header are
+    # returned again for retries during this time (in seconds)
+    IDEMPOTENCY_KEY_TTL = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE = 10000
+    # Keys of requests in progress are reserved this long (in seconds)
+    IDEMPOTENCY_LOCK_TTL = 60
+    # "memory" keeps caches per worker process, "redis" shares them
+    # between processes (requires the redis package and CACHE_REDIS_URL)
+    CACHE_BACKEND = "memory"
+    CACHE_REDIS_URL = None
+    # Decoded tokens and user proposal membership are cached this long
+    # (in seconds). Writes to Person, Proposal, ProposalHasPerson, BLSession
+    # and SessionHasPerson done through the API invalidate the membership
+    # cache, in all processes with the redis backend.
+    USER_CACHE_TTL = 300
+    USER_CACHE_SIZE = 10000
+    # With the memory backend, other worker processes keep serving revoked
+    # memberships until their entries expire, after at most this long
+    USER_CACHE_MEMORY_TTL = 5
 
     DEBUG = True
     ERROR_404_HELP = False
@@ -58,6 +117,14 @@ class BaseConfig:
     TOKEN_EXP_TIME = 300  # in minutes
     MASTER_TOKEN = "MasterToken"
     ADMIN_ROLES = ["manager", "admin"]  # allows to access all resources
+    # LdapAuthentication: at most LDAP_POOL_SIZE logins talk to LDAP at once,
+    # others wait LDAP_POOL_TIMEOUT seconds. Roles of valid credentials are
+    # cached LDAP_CACHE_TTL seconds, failed logins LDAP_NEGATIVE_CACHE_TTL.
+    LDAP_POOL_SIZE = 10
+    LDAP_POOL_TIMEOUT = 10
+    LDAP_TIMEOUT = 5
+    LDAP_CACHE_TTL = 60
+    LDAP_NEGATIVE_CACHE_TTL = 30
 
     BARCODE_TYPE = "code39"
     TEMP_FOLDER = os.path.join(tempfile.gettempdir(), "pyispyb", "tmp")
@@ -90,6 +157,13 @@ class BaseConfig:
             for key, value in config["server"].items():
                 setattr(self, key, value)
 
+            if config.get("database_pool") is not None:
+                self.DATABASE_POOL = dict(self.DATABASE_POOL)
+                for key, value in config["database_pool"].items():
+                    if key not in self.DATABASE_POOL:
+                        raise ValueError("Unknown database_pool option %s" % key)
+                    self.DATABASE_POOL[key] = value
+
             if config.get("authorization_rules") is not None:
                 self.AUTHORIZATION_RULES = {}
                 for key, value in config["authorization_rules"].items():
@@ -118,6 +118,9 @@ class AutoProc(db.Model):
 
 class AutoProcIntegration(db.Model):
     __tablename__ = 'AutoProcIntegration'
+    __table_args__ = (
+        db.Index('AutoProcIntegration_naturalKey', 'autoProcProgramId', 'dataCollectionId', unique=True),
+    )
 
     autoProcIntegrationId = db.Column(db.Integer, primary_key=True, info='Primary key (auto-incremented)')
     dataCollectionId = db.Column(db.ForeignKey('DataCollection.dataCollectionId', ondelete='CASCADE', onupdate='CASCADE'), nullable=False, index=True, info='DataCollection item')
@@ -149,6 +152,9 @@ class AutoProcIntegration(db.Model):
 
 class AutoProcProgram(db.Model):
     __tablename__ = 'AutoProcProgram'
+    __table_args__ = (
+        db.Index('AutoProcProgram_naturalKey', 'processingJobId', unique=True),
+    )
 
     autoProcProgramId = db.Column(db.Integer, primary_key=True, info='Primary key (auto-incremented)')
     processingCommandLine = db.Column(db.String(255), info='Command line for running the automatic processing')
@@ -212,6 +218,9 @@ class AutoProcScaling(db.Model):
 
 class AutoProcScalingStatistic(db.Model):
     __tablename__ = 'AutoProcScalingStatistics'
+    __table_args__ = (
+        db.Index('AutoProcScalingStatistics_naturalKey', 'autoProcScalingId', 'scalingStatisticsType', unique=True),
+    )
 
     autoProcScalingStatisticsId = db.Column(db.Integer, primary_key=True, info='Primary key (auto-incremented)')
     autoProcScalingId = db.Column(db.ForeignKey('AutoProcScaling.autoProcScalingId', ondelete='CASCADE', onupdate='CASCADE'), index=True, info='Related autoProcScaling item (used by foreign key)')
@@ -31,6 +31,40 @@ from pyispyb.core import models, schemas
 __license__ = "LGPLv3+"
 
 
+# Natural keys identifying items re-submitted by processing pipelines.
+# Upserts require a unique index on these columns, declared on the models
+# and created by the migrations. Key values are required, MySQL unique
+# indexes do not match NULL values. A program is identified by its
+# processing job, programs without a job are added with POST.
+AUTO_PROC_PROGRAM_NATURAL_KEY = ("processingJobId",)
+AUTO_PROC_INTEGRATION_NATURAL_KEY = ("autoProcProgramId", "dataCollectionId")
+AUTO_PROC_SCALING_STATISTICS_NATURAL_KEY = (
+    "autoProcScalingId",
+    "scalingStatisticsType",
+)
+
+
+def init_app(app, **kwargs):
+    """
+    Warns about missing unique indexes of the natural keys.
+
+    Args:
+        app (Flask app): Flask application
+    """
+    # pylint: disable=unused-argument
+    db.check_unique_keys(
+        app,
+        [
+            (models.AutoProcProgram, AUTO_PROC_PROGRAM_NATURAL_KEY),
+            (models.AutoProcIntegration, AUTO_PROC_INTEGRATION_NATURAL_KEY),
+            (
+                models.AutoProcScalingStatistic,
+                AUTO_PROC_SCALING_STATISTICS_NATURAL_KEY,
+            ),
+        ],
+    )
+
+
 def get_auto_procs(request):
     """
     Returns auto_proc entries.
@@ -45,6 +79,7 @@ def get_auto_procs(request):
         schemas.auto_proc.dict_schema,
         schemas.auto_proc.ma_schema,
         query_params,
+        negotiate=True,
     )
 
 
@@ -76,6 +111,18 @@ def add_auto_proc(data_dict):
     """
     return db.add_db_item(models.AutoProc, schemas.auto_proc.ma_schema, data_dict)
 
+def add_auto_procs(data_list):
+    """
+    Adds auto_proc items in one transaction.
+
+    Args:
+        data_list (list): list of auto_proc dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.AutoProc, data_list)
+
 
 def get_auto_proc_status(request):
     """
@@ -91,6 +138,7 @@ def get_auto_proc_status(request):
         schemas.auto_proc_status.dict_schema,
         schemas.auto_proc_status.ma_schema,
         query_params,
+        negotiate=True,
     )
 
 
@@ -139,6 +187,7 @@ def get_auto_proc_programs(request):
         schemas.auto_proc_program.dict_schema,
         schemas.auto_proc_program.ma_schema,
         query_params,
+        negotiate=True,
     )
 
 
@@ -173,6 +222,144 @@ def add_auto_proc_program(data_dict):
     )
 
 
+def add_auto_proc_programs(data_list):
+    """
+    Adds auto_proc_program items in one transaction.
+
+    Args:
+        data_list (list): list of auto_proc_program dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.AutoProcProgram, data_list)
+
+
+def upsert_auto_proc_program(data_dict):
+    """
+    Adds auto_proc_program or updates the one with the same natural key.
+
+    Args:
+        data_dict (dict): auto_proc_program data
+
+    Returns:
+        dict: info about auto_proc_program as dict
+    """
+    return db.upsert_db_item(
+        models.AutoProcProgram,
+        schemas.auto_proc_program.dict_schema,
+        schemas.auto_proc_program.ma_schema,
+        data_dict,
+        AUTO_PROC_PROGRAM_NATURAL_KEY,
+    )
+
+
+def get_auto_proc_integrations(request):
+    """
+    Returns auto_proc_integration entries.
+
+    Returns:
+        [type]: [description]
+    """
+    query_params = request.args.to_dict()
+
+    return db.get_db_items(
+        models.AutoProcIntegration,
+        schemas.auto_proc_integration.dict_schema,
+        schemas.auto_proc_integration.ma_schema,
+        query_params,
+        negotiate=True,
+    )
+
+
+def add_auto_proc_integration(data_dict):
+    """
+    Adds a auto_proc_integration to db.
+
+    Args:
+        data_dict ([type]): [description]
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_item(
+        models.AutoProcIntegration, schemas.auto_proc_integration.ma_schema, data_dict
+    )
+
+
+def upsert_auto_proc_integration(data_dict):
+    """
+    Adds auto_proc_integration or updates the one with the same natural key.
+
+    Args:
+        data_dict (dict): auto_proc_integration data
+
+    Returns:
+        dict: info about auto_proc_integration as dict
+    """
+    return db.upsert_db_item(
+        models.AutoProcIntegration,
+        schemas.auto_proc_integration.dict_schema,
+        schemas.auto_proc_integration.ma_schema,
+        data_dict,
+        AUTO_PROC_INTEGRATION_NATURAL_KEY,
+    )
+
+
+def get_auto_proc_scaling_statistics(request):
+    """
+    Returns auto_proc_scaling_statistics entries.
+
+    Returns:
+        [type]: [description]
+    """
+    query_params = request.args.to_dict()
+
+    return db.get_db_items(
+        models.AutoProcScalingStatistic,
+        schemas.auto_proc_scaling_statistics.dict_schema,
+        schemas.auto_proc_scaling_statistics.ma_schema,
+        query_params,
+        negotiate=True,
+    )
+
+
+def add_auto_proc_scaling_statistics(data_dict):
+    """
+    Adds a auto_proc_scaling_statistics to db.
+
+    Args:
+        data_dict ([type]): [description]
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_item(
+        models.AutoProcScalingStatistic,
+        schemas.auto_proc_scaling_statistics.ma_schema,
+        data_dict,
+    )
+
+
+def upsert_auto_proc_scaling_statistics(data_dict):
+    """
+    Adds auto_proc_scaling_statistics or updates the one with the same natural key.
+
+    Args:
+        data_dict (dict): auto_proc_scaling_statistics data
+
+    Returns:
+        dict: info about auto_proc_scaling_statistics as dict
+    """
+    return db.upsert_db_item(
+        models.AutoProcScalingStatistic,
+        schemas.auto_proc_scaling_statistics.dict_schema,
+        schemas.auto_proc_scaling_statistics.ma_schema,
+        data_dict,
+        AUTO_PROC_SCALING_STATISTICS_NATURAL_KEY,
+    )
+
+
 def get_attachments_by_query(query_params):
     """
     Returns auto_proc_program_attachment entries.
@@ -237,6 +424,7 @@ def get_auto_proc_program_messages(request):
         schemas.auto_proc_program_message.dict_schema,
         schemas.auto_proc_program_message.ma_schema,
         query_params,
+        negotiate=True,
     )
 
 def get_attachment_zip_by_program_id(program_id):
@@ -306,3 +494,16 @@ def add_auto_proc_program_message(data_dict):
         schemas.auto_proc_program_message.ma_schema,
         data_dict,
     )
+
+
+def add_auto_proc_program_messages(data_list):
+    """
+    Adds auto_proc_program_message items in one transaction.
+
+    Args:
+        data_list (list): list of auto_proc_program_message dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.AutoProcProgramMessage, data_list)
@@ -44,6 +44,7 @@ def get_beamline_setups(request):
         schemas.beamline_setup.dict_schema,
         schemas.beamline_setup.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
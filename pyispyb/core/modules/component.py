@@ -41,6 +41,7 @@ def get_component_types(request):
         schemas.component_type.dict_schema,
         schemas.component_type.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -20,8 +20,12 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
 
 
+from flask import current_app, request
+
 from pyispyb.app.extensions import db
 from pyispyb.app.extensions.authentication import authentication_provider
+from pyispyb.app.extensions.cache import cache
+from pyispyb.app.extensions.flask_sqlalchemy.scoping import ProposalScope
 
 from pyispyb.core import models, schemas
 from pyispyb.core.modules import proposal, sample, protein, crystal
@@ -30,6 +34,139 @@ from pyispyb.core.modules import proposal, sample, protein, crystal
 __license__ = "LGPLv3+"
 
 
+class UserContext:
+    """
+    User sending the request.
+
+    Identity and roles come from the token decoded by
+    authentication_required. The person id and proposal ids are looked up
+    on first use and cached per login (see get_user_cache).
+
+    Attributes:
+        username (str): login name (token subject)
+        roles (list): user roles
+        is_admin (bool): True if the user has an admin role
+    """
+
+    def __init__(self, user_info):
+        self.username = user_info.get("sub")
+        self.roles = list(user_info.get("roles", []))
+        self.is_admin = bool(user_info.get("is_admin"))
+        self._membership = None
+        self._all_proposal_ids = None
+
+    def _get_membership(self):
+        if self._membership is None:
+            user_cache = get_user_cache()
+            membership = user_cache.get(self.username) if self.username else None
+            if membership is None:
+                person_id = get_person_id_by_login(self.username)
+                membership = {
+                    "person_id": person_id,
+                    "proposal_ids": proposal.get_proposal_ids_by_person_id(person_id)
+                    if person_id
+                    else [],
+                }
+                if self.username:
+                    user_cache.set(self.username, membership)
+            self._membership = membership
+        return self._membership
+
+    @property
+    def person_id(self):
+        """
+        Returns personId of the user.
+
+        Returns:
+            int: personId or None if the login is not in the db
+        """
+        return self._get_membership()["person_id"]
+
+    @property
+    def proposal_ids(self):
+        """
+        Returns ids of the proposals the user can access.
+
+        Admins can access all proposals.
+
+        Returns:
+            list: list of proposal ids
+        """
+        if self.is_admin:
+            if self._all_proposal_ids is None:
+                self._all_proposal_ids = proposal.get_all_proposal_ids()
+            return self._all_proposal_ids
+        return self._get_membership()["proposal_ids"]
+
+
+def get_proposal_scope():
+    """
+    Returns proposals accessible by the user of the current request.
+
+    Returns:
+        ProposalScope: scope passed to db.get_db_items, None for admins
+    """
+    user = get_user_context()
+    if user.is_admin:
+        return None
+    return ProposalScope(user.person_id)
+
+
+def get_user_cache():
+    """
+    Returns cache of {"person_id": int, "proposal_ids": list} per login.
+
+    Writes clear the cache of the writing process only, so in memory
+    caches keep entries at most USER_CACHE_MEMORY_TTL seconds.
+
+    Returns:
+        [type]: TTL cache
+    """
+    return cache.get_cache(
+        "user_membership",
+        current_app.config.get("USER_CACHE_TTL", 300),
+        current_app.config.get("USER_CACHE_SIZE", 10000),
+        memory_ttl=current_app.config.get("USER_CACHE_MEMORY_TTL", 5),
+    )
+
+
+def invalidate_user_cache(sql_alchemy_model):
+    """
+    Clears user cache after writes changing proposal membership.
+
+    Users are members of a proposal through Proposal_has_Person or through
+    Session_has_Person of one of its sessions.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model written
+    """
+    if sql_alchemy_model in (
+        models.Person,
+        models.Proposal,
+        models.ProposalHasPerson,
+        models.BLSession,
+        models.SessionHasPerson,
+    ):
+        get_user_cache().clear()
+
+
+db.add_write_listener(invalidate_user_cache)
+
+
+def get_user_context():
+    """
+    Returns user context of the current request, created once per request.
+
+    Returns:
+        UserContext: user sending the request
+    """
+    if not hasattr(request, "user_context"):
+        request.user_context = UserContext(
+            authentication_provider.get_request_user_info()
+        )
+    return request.user_context
+
+
 def get_person_by_id(person_id):
     id_dict = {"personId": person_id}
     return db.get_db_item(
@@ -37,9 +174,7 @@ def get_person_by_id(person_id):
     )
 
 def get_person_info(request):
-    user_info = authentication_provider.get_user_info_from_auth_header(
-        request.headers.get("Authorization")
-    )
+    user_info = dict(authentication_provider.get_request_user_info())
     query_dict = request.args.to_dict()
     if "login_name" in query_dict:
         #Return info about requested login name
@@ -92,14 +227,15 @@ def get_persons(request):
         dict: info about person as dict
     """
     query_dict = request.args.to_dict()
-    return get_persons_by_query(query_dict)
+    return get_persons_by_query(query_dict, negotiate=True)
 
-def get_persons_by_query(query_dict):
+def get_persons_by_query(query_dict, negotiate=False):
     return db.get_db_items(
         models.Person,
         schemas.person.dict_schema,
         schemas.person.ma_schema,
         query_dict,
+        negotiate=negotiate,
     )
 
 def get_person_id_by_login(login_name):
@@ -112,9 +248,13 @@ def get_person_id_by_login(login_name):
         [type]: [description]
     """
     if login_name:
-        persons = get_persons_by_query({"login": login_name})["data"]["rows"]
-        if persons:
-            return persons[0]["personId"]
+        row = (
+            db.session.query(models.Person.personId)
+            .filter(models.Person.login == login_name)
+            .first()
+        )
+        if row:
+            return row[0]
 
 
 def add_person(data_dict):
@@ -187,6 +327,7 @@ def get_lab_contacts(request):
         schemas.lab_contact.dict_schema,
         schemas.lab_contact.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -283,6 +424,7 @@ def get_laboratories(request):
         schemas.laboratory.dict_schema,
         schemas.laboratory.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -22,6 +22,7 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 from pyispyb.app.extensions import db
 from pyispyb.core import models, schemas
+from pyispyb.core.modules import contacts
 
 
 __license__ = "LGPLv3+"
@@ -42,6 +43,7 @@ def get_containers(request):
         schemas.dewar.dict_schema,
         schemas.dewar.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -121,3 +123,43 @@ def delete_container(container_id):
     """
     id_dict = {"containerId": container_id}
     return db.delete_db_item(models.Container, id_dict)
+
+
+def patch_containers(request, data_dict):
+    """
+    Patches all containers matching the query parameters.
+
+    Args:
+        request ([type]): request with the filter query parameters
+        data_dict (dict): values to set
+
+    Returns:
+        dict: response dict with the number of updated items
+    """
+    query_dict = request.args.to_dict()
+    return db.patch_db_items(
+        models.Container,
+        schemas.container.dict_schema,
+        query_dict,
+        data_dict,
+        proposal_scope=contacts.get_proposal_scope(),
+    )
+
+
+def delete_containers(request):
+    """
+    Deletes all containers matching the query parameters.
+
+    Args:
+        request ([type]): request with the filter query parameters
+
+    Returns:
+        dict: response dict with the number of deleted items
+    """
+    query_dict = request.args.to_dict()
+    return db.delete_db_items(
+        models.Container,
+        schemas.container.dict_schema,
+        query_dict,
+        proposal_scope=contacts.get_proposal_scope(),
+    )
@@ -41,6 +41,7 @@ def get_crystals(request):
         schemas.crystal.dict_schema,
         schemas.crystal.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
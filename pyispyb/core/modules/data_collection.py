@@ -44,6 +44,8 @@ def get_data_collections(request):
         schemas.data_collection.dict_schema,
         schemas.data_collection.ma_schema,
         query_dict,
+        negotiate=True,
+        compiled=True,
     )
 
 
@@ -64,12 +66,26 @@ def add_data_collection(data_dict):
     )
 
 
-def get_data_collection_by_id(data_collection_id):
+def add_data_collections(data_list):
+    """
+    Adds data collection items in one transaction.
+
+    Args:
+        data_list (list): list of data collection dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.DataCollection, data_list)
+
+
+def get_data_collection_by_id(data_collection_id, fields=None):
     """
     Returns data_collection by its id.
 
     Args:
         data_collection_id (int): corresponds to dataCollectionId in db
+        fields (str, optional): comma separated fields to return. Defaults to None.
 
     Returns:
         dict: info about data_collection as dict
@@ -77,7 +93,9 @@ def get_data_collection_by_id(data_collection_id):
     return db.get_db_item(
         models.DataCollection,
         schemas.data_collection.ma_schema,
-        {"dataCollectionId": data_collection_id}
+        {"dataCollectionId": data_collection_id},
+        fields,
+        dict_schema=schemas.data_collection.dict_schema,
     )
 
 
@@ -99,6 +117,8 @@ def get_data_collection_groups(request):
         schemas.data_collection_group.dict_schema,
         schemas.data_collection_group.ma_schema,
         query_dict,
+        negotiate=True,
+        compiled=True,
     )
 
 
@@ -119,12 +139,26 @@ def add_data_collection_group(data_dict):
     )
 
 
-def get_data_collection_group_by_id(data_collection_group_id):
+def add_data_collection_groups(data_list):
+    """
+    Adds data collection group items in one transaction.
+
+    Args:
+        data_list (list): list of data collection group dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.DataCollectionGroup, data_list)
+
+
+def get_data_collection_group_by_id(data_collection_group_id, fields=None):
     """
     Returns data collection group by its id.
 
     Args:
         data_collection_group_id (int): corresponds to dataCollectionGroupId
+        fields (str, optional): comma separated fields to return. Defaults to None.
 
     Returns:
         dict: info about data collection group as dict
@@ -132,5 +166,7 @@ def get_data_collection_group_by_id(data_collection_group_id):
     return db.get_db_item(
         models.DataCollectionGroup,
         schemas.data_collection_group.ma_schema,
-        {"dataCollectionGroupId": data_collection_group_id}
+        {"dataCollectionGroupId": data_collection_group_id},
+        fields,
+        dict_schema=schemas.data_collection_group.dict_schema,
     )
@@ -44,6 +44,7 @@ def get_detectors(request):
         schemas.detector.dict_schema,
         schemas.detector.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -38,11 +38,15 @@ def get_dewars(request):
 
     query_dict = request.args.to_dict()
 
-    return get_dewars_by_query(query_dict)
+    return get_dewars_by_query(query_dict, negotiate=True)
 
-def get_dewars_by_query(query_dict):
+def get_dewars_by_query(query_dict, negotiate=False):
     return db.get_db_items(
-        models.Dewar, schemas.dewar.dict_schema, schemas.dewar.ma_schema, query_dict
+        models.Dewar,
+        schemas.dewar.dict_schema,
+        schemas.dewar.ma_schema,
+        query_dict,
+        negotiate=negotiate,
     )
 
 
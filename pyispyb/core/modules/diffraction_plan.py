@@ -41,6 +41,7 @@ def get_diffraction_plans(request):
         schemas.diffraction_plan.dict_schema,
         schemas.diffraction_plan.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -41,4 +41,5 @@ def get_energy_scans(request):
         schemas.energy_scan.dict_schema,
         schemas.energy_scan.ma_schema,
         query_dict,
+        negotiate=True,
     )
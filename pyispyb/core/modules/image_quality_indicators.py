@@ -40,4 +40,18 @@ def get_image_quality_indicators(request):
         schemas.image_quality_indicators.dict_schema,
         schemas.image_quality_indicators.ma_schema,
         query_dict,
+        negotiate=True,
     )
+
+
+def add_image_quality_indicators(data_list):
+    """
+    Adds image quality indicator items in one transaction.
+
+    Args:
+        data_list (list): list of image quality indicator dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.ImageQualityIndicator, data_list)
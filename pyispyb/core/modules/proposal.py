@@ -26,7 +26,6 @@ __license__ = "LGPLv3+"
 from flask_restx._http import HTTPStatus
 
 from pyispyb.app.extensions import db
-from pyispyb.app.extensions.authentication import authentication_provider 
 
 from pyispyb.core import models, schemas
 from pyispyb.core.modules import contacts, session
@@ -43,17 +42,18 @@ def get_proposals(request):
     """
     query_dict = request.args.to_dict()
 
-    user_info = contacts.get_person_info(request)
-    if not user_info["is_admin"]:
-        query_dict["proposalId"] = get_proposal_ids(request)
-    return get_proposals_by_query(query_dict)
+    return get_proposals_by_query(
+        query_dict, negotiate=True, proposal_scope=contacts.get_proposal_scope()
+    )
 
-def get_proposals_by_query(query_dict):
+def get_proposals_by_query(query_dict, negotiate=False, proposal_scope=None):
     return db.get_db_items(
         models.Proposal,
         schemas.proposal.dict_schema,
         schemas.proposal.ma_schema,
         query_dict,
+        negotiate=negotiate,
+        proposal_scope=proposal_scope,
     )
 
 def get_proposals_has_person_by_query(query_dict):
@@ -164,18 +164,48 @@ def delete_proposal(proposal_id):
 
 
 def get_proposal_ids_by_person_id(person_id):
-    proposal_ids = []
-    proposal_dict = get_proposals_by_query({"personId": person_id})
-    if proposal_dict["data"]["rows"]:
-        for proposal in proposal_dict["data"]["rows"]:
-            proposal_ids.append(proposal["proposalId"])
-    proposal_has_person_dict = get_proposals_has_person_by_query(
-        {"personId": person_id}
+    """
+    Returns ids of the proposals of the person.
+
+    The person is either the proposal main contact, a member through
+    ProposalHasPerson or takes part in a session of the proposal through
+    Session_has_Person, as in the proposal scoping of db.get_db_items.
+    Only the ids are selected, in one query.
+
+    Args:
+        person_id (int): personId
+
+    Returns:
+        list: sorted list of proposal ids
+    """
+    query = (
+        db.session.query(models.Proposal.proposalId)
+        .filter(models.Proposal.personId == person_id)
+        .union(
+            db.session.query(models.ProposalHasPerson.proposalId).filter(
+                models.ProposalHasPerson.personId == person_id
+            ),
+            db.session.query(models.BLSession.proposalId)
+            .join(
+                models.SessionHasPerson,
+                models.SessionHasPerson.sessionId == models.BLSession.sessionId,
+            )
+            .filter(models.SessionHasPerson.personId == person_id),
+        )
     )
-    if proposal_has_person_dict["data"]["rows"]:
-        for proposal in proposal_has_person_dict["data"]["rows"]:
-            proposal_ids.append(proposal["proposalId"])
-    return proposal_ids
+    return sorted(row[0] for row in query)
+
+
+def get_all_proposal_ids():
+    """
+    Returns ids of all proposals.
+
+    Returns:
+        list: sorted list of proposal ids
+    """
+    query = db.session.query(models.Proposal.proposalId)
+    return sorted(row[0] for row in query)
+
 
 def get_proposal_ids(request):
     """
@@ -187,19 +217,4 @@ def get_proposal_ids(request):
     Returns:
         list: list of proposal ids
     """
-
-    user_info = authentication_provider.get_user_info_from_auth_header(
-        request.headers.get("Authorization")
-    )
-
-    proposal_ids = []
-    if user_info["is_admin"]:
-        proposal_dict = get_proposals_by_query({})
-        
-        for proposal in proposal_dict["data"]["rows"]:
-            proposal_ids.append(proposal["proposalId"])
-    else:
-        person_id = contacts.get_person_id_by_login(user_info["sub"])
-        proposal_ids = get_proposal_ids_by_person_id(person_id)
-    
-    return proposal_ids
+    return contacts.get_user_context().proposal_ids
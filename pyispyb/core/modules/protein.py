@@ -22,7 +22,7 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 from pyispyb.app.extensions import db
 from pyispyb.core import models, schemas
-from pyispyb.core.modules import proposal
+from pyispyb.core.modules import contacts
 
 
 __license__ = "LGPLv3+"
@@ -36,43 +36,19 @@ def get_proteins(request):
         [type]: [description]
     """
     query_dict = request.args.to_dict()
-    return get_proteins_by_query(query_dict)
-
-    """
-
-    is_admin, proposal_id_list = proposal.get_proposal_ids(request)
-
-    run_query = False
-    if is_admin:
-        run_query = True
-    else:
-        if not proposal_id_list:
-            msg = "No sessions returned. User has no proposals."
-        else:
-            if "proposalId" in query_dict.keys():
-                if query_dict["proposalId"] in proposal_id_list:
-                    run_query = True
-                else:
-                    msg = (
-                        "Proposal with id %s is not associated with user"
-                        % query_dict["proposalId"]
-                    )
-            else:
-                query_dict["proposalId"] = proposal_id_list
-
-    if run_query:
-        return get_proteins_by_query(query_dict)
-    else:
-        return create_response_item(msg=msg)
-    """
+    return get_proteins_by_query(
+        query_dict, negotiate=True, proposal_scope=contacts.get_proposal_scope()
+    )
 
 
-def get_proteins_by_query(query_dict):
+def get_proteins_by_query(query_dict, negotiate=False, proposal_scope=None):
     return db.get_db_items(
         models.Protein,
         schemas.protein.dict_schema,
         schemas.protein.ma_schema,
         query_dict,
+        negotiate=negotiate,
+        proposal_scope=proposal_scope,
     )
 
 
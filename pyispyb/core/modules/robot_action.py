@@ -44,6 +44,7 @@ def get_robot_actions(request):
         schemas.robot_action.dict_schema,
         schemas.robot_action.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -22,6 +22,7 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 from pyispyb.app.extensions import db
 from pyispyb.core import models, schemas
+from pyispyb.core.modules import contacts
 
 
 __license__ = "LGPLv3+"
@@ -41,22 +42,29 @@ def get_samples(request):
         schemas.sample.dict_schema,
         schemas.sample.ma_schema,
         query_dict,
+        negotiate=True,
+        compiled=True,
     )
 
 
-def get_sample_by_id(sample_id):
+def get_sample_by_id(sample_id, fields=None):
     """
     Returns sample by its sampleId.
 
     Args:
         sample (int): corresponds to sampleId in db
+        fields (str, optional): comma separated fields to return. Defaults to None.
 
     Returns:
         dict: info about sample as dict
     """
     data_dict = {"blSampleId": sample_id}
     return db.get_db_item(
-        models.BLSample, schemas.sample.ma_schema, data_dict
+        models.BLSample,
+        schemas.sample.ma_schema,
+        data_dict,
+        fields,
+        dict_schema=schemas.sample.dict_schema,
     )
 
 
@@ -76,6 +84,19 @@ def add_sample(data_dict):
     return db.add_db_item(models.BLSample, schemas.sample.ma_schema, data_dict)
 
 
+def add_samples(data_list):
+    """
+    Adds sample items in one transaction.
+
+    Args:
+        data_list (list): list of sample dicts
+
+    Returns:
+        dict: response dict with the ids of the new items
+    """
+    return db.add_db_items(models.BLSample, data_list)
+
+
 def update_sample(sample_id, data_dict):
     """
     Updates sample.
@@ -123,3 +144,43 @@ def delete_sample(sample_id):
     """
     id_dict = {"blSampleId": sample_id}
     return db.delete_db_item(models.BLSample, id_dict)
+
+
+def patch_samples(request, data_dict):
+    """
+    Patches all samples matching the query parameters.
+
+    Args:
+        request ([type]): request with the filter query parameters
+        data_dict (dict): values to set
+
+    Returns:
+        dict: response dict with the number of updated items
+    """
+    query_dict = request.args.to_dict()
+    return db.patch_db_items(
+        models.BLSample,
+        schemas.sample.dict_schema,
+        query_dict,
+        data_dict,
+        proposal_scope=contacts.get_proposal_scope(),
+    )
+
+
+def delete_samples(request):
+    """
+    Deletes all samples matching the query parameters.
+
+    Args:
+        request ([type]): request with the filter query parameters
+
+    Returns:
+        dict: response dict with the number of deleted items
+    """
+    query_dict = request.args.to_dict()
+    return db.delete_db_items(
+        models.BLSample,
+        schemas.sample.dict_schema,
+        query_dict,
+        proposal_scope=contacts.get_proposal_scope(),
+    )
@@ -21,9 +21,9 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
 from pyispyb.app.extensions import db
-from pyispyb.app.utils import create_response_item
+from pyispyb.app.extensions.flask_sqlalchemy.filters import get_filter_clause
 from pyispyb.core import models, schemas
-from pyispyb.core.modules import beamline_setup, proposal
+from pyispyb.core.modules import beamline_setup, contacts
 
 
 __license__ = "LGPLv3+"
@@ -41,19 +41,15 @@ def get_sessions(request):
     """
     query_dict = request.args.to_dict()
 
-    proposal_ids = proposal.get_proposal_ids(request)
-    if not proposal_ids:
-        create_response_item(
-            msg="No sessions returned. User has no proposals."
-        )
-    else:
-        query_dict["proposalId"] = proposal_ids
-        return db.get_db_items(
-            models.BLSession,
-            schemas.session.dict_schema,
-            schemas.session.ma_schema,
-            query_dict,
-        )
+    return db.get_db_items(
+        models.BLSession,
+        schemas.session.dict_schema,
+        schemas.session.ma_schema,
+        query_dict,
+        negotiate=True,
+        proposal_scope=contacts.get_proposal_scope(),
+    )
+
 
 def add_session(data_dict):
     """
@@ -112,6 +108,9 @@ def get_sessions_by_date(start_date=None, end_date=None, beamline=None):
     """
     Returns list of sessions by start_date, end_date and beamline.
 
+    The dates are applied as the startDate__gte and endDate__lte filter
+    operators of list queries.
+
     Args:
         start_date (datetime, optional): start date. Defaults to None.
         end_date (datetime, optional): end date. Defaults to None.
@@ -121,10 +120,19 @@ def get_sessions_by_date(start_date=None, end_date=None, beamline=None):
         list: list of session dicts
     """
     query = models.BLSession.query
-    if start_date:
-        query = query.filter(models.BLSession.startDate >= start_date)
-    if end_date:
-        query = query.filter(models.BLSession.endDate <= end_date)
+    for name, operator, value in (
+        ("startDate", "gte", start_date),
+        ("endDate", "lte", end_date),
+    ):
+        if value:
+            query = query.filter(
+                get_filter_clause(
+                    getattr(models.BLSession, name),
+                    schemas.session.dict_schema[name],
+                    operator,
+                    value,
+                )
+            )
     if beamline:
         query = query.filter(models.BLSession.beamLineName == beamline)
     return schemas.session.ma_schema.dump(query, many=True)
@@ -196,6 +204,7 @@ def get_beam_calendars(request):
         schemas.beam_calendar.dict_schema,
         schemas.beam_calendar.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
@@ -38,6 +38,7 @@ def get_shippings(request):
         schemas.shipping.dict_schema,
         schemas.shipping.ma_schema,
         query_dict,
+        negotiate=True,
     )
 
 
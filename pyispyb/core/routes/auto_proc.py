@@ -28,14 +28,18 @@ from pyispyb.app.extensions.authentication import authentication_required
 from pyispyb.app.extensions.authorization import authorization_required
 
 from pyispyb.core.schemas import auto_proc as auto_proc_schemas
+from pyispyb.core.schemas import auto_proc_integration as auto_proc_integration_schemas
 from pyispyb.core.schemas import auto_proc_program as auto_proc_program_schemas
 from pyispyb.core.schemas import (
     auto_proc_program_attachment as auto_proc_program_attachment_schemas,
 )
 
-# from pyispyb.core.schemas import (
-#    auto_proc_program_message as auto_proc_program_message_schemas,
-# )
+from pyispyb.core.schemas import (
+    auto_proc_program_message as auto_proc_program_message_schemas,
+)
+from pyispyb.core.schemas import (
+    auto_proc_scaling_statistics as auto_proc_scaling_statistics_schemas,
+)
 from pyispyb.core.schemas import auto_proc_status as auto_proc_status_schemas
 from pyispyb.core.modules import auto_proc
 
@@ -70,6 +74,19 @@ class AutoProcs(Resource):
         return auto_proc.add_auto_proc(api.payload)
 
 
+@api.route("/bulk", endpoint="auto_procs_bulk")
+@api.doc(security="apikey")
+class AutoProcsBulk(Resource):
+    """Allows to add auto proc entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([auto_proc_schemas.f_schema])
+    def post(self):
+        """Adds a list of auto proc entries and returns their ids"""
+        return auto_proc.add_auto_procs(api.payload)
+
+
 @api.route("/<int:auto_proc_id>", endpoint="auto_proc_by_id")
 @api.param("auto_proc_id", "auto_proc id (integer)")
 @api.doc(security="apikey")
@@ -143,6 +160,32 @@ class AutoProcPrograms(Resource):
         """Adds a new auto proc program"""
         return auto_proc.add_auto_proc_program(api.payload)
 
+    @authentication_required
+    @authorization_required
+    @api.doc(
+        description="Updates the auto proc program with the same %s if it exists"
+        % ", ".join(auto_proc.AUTO_PROC_PROGRAM_NATURAL_KEY)
+    )
+    @api.expect(auto_proc_program_schemas.f_schema)
+    @api.marshal_with(auto_proc_program_schemas.f_schema, code=HTTPStatus.OK)
+    def put(self):
+        """Adds or updates an auto proc program"""
+        return auto_proc.upsert_auto_proc_program(api.payload)
+
+
+@api.route("/programs/bulk", endpoint="auto_proc_programs_bulk")
+@api.doc(security="apikey")
+class AutoProcProgramsBulk(Resource):
+    """Allows to add auto proc program entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([auto_proc_program_schemas.f_schema])
+    def post(self):
+        """Adds a list of auto proc program entries and returns their ids"""
+        return auto_proc.add_auto_proc_programs(api.payload)
+
+
 @api.route("/programs/<int:program_id>", endpoint="program_by_id")
 @api.param("program_id", "program id (integer)")
 @api.doc(security="apikey")
@@ -161,6 +204,72 @@ class AutoProcProgramById(Resource):
         return auto_proc.get_auto_proc_program_by_id(program_id)
 
 
+@api.route("/integrations", endpoint="auto_proc_integrations")
+@api.doc(security="apikey")
+class AutoProcIntegrations(Resource):
+    """Allows to get all auto proc integration entries"""
+
+    @authentication_required
+    @authorization_required
+    def get(self):
+        """Returns all auto_proc_integration entries"""
+        return auto_proc.get_auto_proc_integrations(request)
+
+    @authentication_required
+    @authorization_required
+    @api.expect(auto_proc_integration_schemas.f_schema)
+    @api.marshal_with(auto_proc_integration_schemas.f_schema, code=201)
+    def post(self):
+        """Adds a new auto proc integration"""
+        return auto_proc.add_auto_proc_integration(api.payload)
+
+    @authentication_required
+    @authorization_required
+    @api.doc(
+        description="Updates the auto proc integration with the same %s if it exists"
+        % ", ".join(auto_proc.AUTO_PROC_INTEGRATION_NATURAL_KEY)
+    )
+    @api.expect(auto_proc_integration_schemas.f_schema)
+    @api.marshal_with(auto_proc_integration_schemas.f_schema, code=HTTPStatus.OK)
+    def put(self):
+        """Adds or updates an auto proc integration"""
+        return auto_proc.upsert_auto_proc_integration(api.payload)
+
+
+@api.route("/scaling_statistics", endpoint="auto_proc_scaling_statistics")
+@api.doc(security="apikey")
+class AutoProcScalingStatistics(Resource):
+    """Allows to get all auto proc scaling statistics entries"""
+
+    @authentication_required
+    @authorization_required
+    def get(self):
+        """Returns all auto_proc_scaling_statistics entries"""
+        return auto_proc.get_auto_proc_scaling_statistics(request)
+
+    @authentication_required
+    @authorization_required
+    @api.expect(auto_proc_scaling_statistics_schemas.f_schema)
+    @api.marshal_with(auto_proc_scaling_statistics_schemas.f_schema, code=201)
+    def post(self):
+        """Adds new auto proc scaling statistics"""
+        return auto_proc.add_auto_proc_scaling_statistics(api.payload)
+
+    @authentication_required
+    @authorization_required
+    @api.doc(
+        description="Updates the scaling statistics with the same %s if they exist"
+        % ", ".join(auto_proc.AUTO_PROC_SCALING_STATISTICS_NATURAL_KEY)
+    )
+    @api.expect(auto_proc_scaling_statistics_schemas.f_schema)
+    @api.marshal_with(
+        auto_proc_scaling_statistics_schemas.f_schema, code=HTTPStatus.OK
+    )
+    def put(self):
+        """Adds or updates auto proc scaling statistics"""
+        return auto_proc.upsert_auto_proc_scaling_statistics(api.payload)
+
+
 @api.route("/attachments", endpoint="auto_proc_program_attachments")
 @api.doc(security="apikey")
 class Attachments(Resource):
@@ -273,3 +382,16 @@ class AttachmenDownloadById(Resource):
                 HTTPStatus.NOT_FOUND,
                 "Autoproc program attachment %s not found" % path
             )
+
+
+@api.route("/programs/messages/bulk", endpoint="auto_proc_program_messages_bulk")
+@api.doc(security="apikey")
+class AutoProcProgramMessagesBulk(Resource):
+    """Allows to add auto proc program message entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([auto_proc_program_message_schemas.f_schema])
+    def post(self):
+        """Adds a list of auto proc program message entries and returns their ids"""
+        return auto_proc.add_auto_proc_program_messages(api.payload)
@@ -30,7 +30,10 @@ from pyispyb.app.extensions.authorization import authorization_required
 
 from pyispyb.core.schemas import data_collection as data_collection_schemas
 from pyispyb.core.schemas import data_collection_group as data_collection_group_schemas
-from pyispyb.core.modules import data_collection
+from pyispyb.core.schemas import (
+    image_quality_indicators as image_quality_indicators_schemas,
+)
+from pyispyb.core.modules import data_collection, image_quality_indicators
 
 
 __license__ = "LGPLv3+"
@@ -51,11 +54,6 @@ class DataColletions(Resource):
 
     @authentication_required
     @authorization_required
-    @api.marshal_list_with(
-        data_collection_schemas.f_schema,
-        skip_none=False,
-        code=HTTPStatus.OK
-    )
     def get(self):
         """Returns list of data_collections"""
         return data_collection.get_data_collections(request)
@@ -69,6 +67,19 @@ class DataColletions(Resource):
         return data_collection.add_data_collection(api.payload)
 
 
+@api.route("/bulk", endpoint="data_collections_bulk")
+@api.doc(security="apikey")
+class DataCollectionsBulk(Resource):
+    """Allows to add data collection entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([data_collection_schemas.f_schema])
+    def post(self):
+        """Adds a list of data collection entries and returns their ids"""
+        return data_collection.add_data_collections(api.payload)
+
+
 @api.route("/<int:data_collection_id>")
 @api.param("data_collection_id", "Data collection id (integer)")
 @api.doc(security="apikey")
@@ -79,14 +90,16 @@ class DataCollectionById(Resource):
     @authentication_required
     @authorization_required
     @api.doc(description="data_collection_id should be an integer ")
-    @api.marshal_with(
-        data_collection_schemas.f_schema,
-        skip_none=False,
+    @api.response(
         code=HTTPStatus.OK,
+        description="Data collection",
+        model=data_collection_schemas.f_schema,
     )
     def get(self, data_collection_id):
         """Returns a data_collection by data_collectionId"""
-        return data_collection.get_data_collection_by_id(data_collection_id)
+        return data_collection.get_data_collection_by_id(
+            data_collection_id, request.args.get("fields")
+        )
 
 @api.route("/<int:data_collection_id>/snapshot/<int:snapshot_index>")
 @api.param("data_collection_id", "data_collection_id (integer)")
@@ -179,11 +192,6 @@ class DataCollectionGroups(Resource):
 
     @authentication_required
     @authorization_required
-    @api.marshal_list_with(
-        data_collection_schemas.f_schema,
-        skip_none=False,
-        code=HTTPStatus.OK
-    )
     def get(self):
         """Returns list of data_collection_groups"""
         return data_collection.get_data_collection_groups(request)
@@ -196,6 +204,20 @@ class DataCollectionGroups(Resource):
         """Adds a new session"""
         return data_collection.add_data_collection_group(api.payload)
 
+
+@api.route("/groups/bulk", endpoint="data_collection_groups_bulk")
+@api.doc(security="apikey")
+class DataCollectionGroupsBulk(Resource):
+    """Allows to add data collection group entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([data_collection_group_schemas.f_schema])
+    def post(self):
+        """Adds a list of data collection group entries and returns their ids"""
+        return data_collection.add_data_collection_groups(api.payload)
+
+
 @api.route("/groups/<int:data_collection_group_id>")
 @api.param("data_collection_group_id", "data_collection group_id (integer)")
 @api.doc(security="apikey")
@@ -206,11 +228,26 @@ class DataCollectionGroupById(Resource):
     @authentication_required
     @authorization_required
     @api.doc(description="data_collection_group_id should be an integer ")
-    @api.marshal_with(
-        data_collection_group_schemas.f_schema,
-        skip_none=False,
+    @api.response(
         code=HTTPStatus.OK,
+        description="Data collection group",
+        model=data_collection_group_schemas.f_schema,
     )
     def get(self, data_collection_group_id):
         """Returns a data_collection group by dataCollection_group_id"""
-        return data_collection.get_data_collection_group_by_id(data_collection_group_id)
+        return data_collection.get_data_collection_group_by_id(
+            data_collection_group_id, request.args.get("fields")
+        )
+
+
+@api.route("/image_quality_indicators/bulk", endpoint="image_quality_indicators_bulk")
+@api.doc(security="apikey")
+class ImageQualityIndicatorsBulk(Resource):
+    """Allows to add image quality indicator entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([image_quality_indicators_schemas.f_schema])
+    def post(self):
+        """Adds a list of image quality indicator entries and returns their ids"""
+        return image_quality_indicators.add_image_quality_indicators(api.payload)
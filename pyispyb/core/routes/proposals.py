@@ -128,14 +128,14 @@ class ProposalInfoById(Resource):
     # @api.marshal_with(proposal_desc_f_schema)
     def get(self, proposal_id):
         """Returns a full description of a proposal by proposalId"""
-        user_info = contacts.get_person_info(request)
-        if user_info["is_admin"] or proposal_id in user_info["proposal_ids"]:
+        user = contacts.get_user_context()
+        if user.is_admin or proposal_id in user.proposal_ids:
             return proposal.get_proposal_info_by_id(proposal_id)
         else:
             abort(
                 HTTPStatus.METHOD_NOT_ALLOWED,
                 "Permission denied. Proposal %d is not assigned to user %s" % (
                     proposal_id,
-                    user_info["login_name"]
+                    user.username
                 )
             )
\ No newline at end of file
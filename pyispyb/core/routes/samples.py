@@ -63,6 +63,32 @@ class Sample(Resource):
         """Adds a new sample item"""
         return sample.add_sample(api.payload)
 
+    @authentication_required
+    @authorization_required
+    @api.expect(sample_schemas.f_schema)
+    def patch(self):
+        """Partially updates all sample items matching the query parameters"""
+        return sample.patch_samples(request, api.payload)
+
+    @authentication_required
+    @authorization_required
+    def delete(self):
+        """Deletes all sample items matching the query parameters"""
+        return sample.delete_samples(request)
+
+
+@api.route("/bulk", endpoint="samples_bulk")
+@api.doc(security="apikey")
+class SamplesBulk(Resource):
+    """Allows to add sample entries in bulk"""
+
+    @authentication_required
+    @authorization_required
+    @api.expect([sample_schemas.f_schema])
+    def post(self):
+        """Adds a list of sample entries and returns their ids"""
+        return sample.add_samples(api.payload)
+
 
 @api.route("/<int:sample_id>", endpoint="sample_by_id")
 @api.param("sample_id", "Sample id (integer)")
@@ -74,10 +100,12 @@ class SampleById(Resource):
     @authentication_required
     @authorization_required
     @api.doc(description="sample_id should be an integer ")
-    @api.marshal_with(sample_schemas.f_schema, skip_none=False, code=HTTPStatus.OK)
+    @api.response(
+        code=HTTPStatus.OK, description="Sample", model=sample_schemas.f_schema
+    )
     def get(self, sample_id):
         """Returns a sample by sampleId"""
-        return sample.get_sample_by_id(sample_id)
+        return sample.get_sample_by_id(sample_id, request.args.get("fields"))
 
     @authentication_required
     @authorization_required
@@ -218,6 +218,19 @@ class Containers(Resource):
         """Adds a new container item"""
         return container.add_container(api.payload)
 
+    @authentication_required
+    @authorization_required
+    @api.expect(container_schemas.f_schema)
+    def patch(self):
+        """Partially updates all container items matching the query parameters"""
+        return container.patch_containers(request, api.payload)
+
+    @authentication_required
+    @authorization_required
+    def delete(self):
+        """Deletes all container items matching the query parameters"""
+        return container.delete_containers(request)
+
 
 @api.route("/containers/<int:container_id>", endpoint="container_by_id")
 @api.param("container_id", "Container id (integer)")
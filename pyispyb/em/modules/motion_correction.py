@@ -55,6 +55,7 @@ def get_motion_corrections(request):
             schemas.motion_correction.dict_schema,
             schemas.motion_correction.ma_schema,
             query_dict,
+            negotiate=True,
         )
     else:
         return create_response_item(msg=msg)
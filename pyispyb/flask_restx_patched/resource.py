@@ -3,7 +3,15 @@
 import flask
 from flask_restx import Resource as OriginalResource
 from flask_restx._http import HTTPStatus
+from flask_restx.utils import unpack
 from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import BaseResponse
+
+from pyispyb.app.extensions.api.idempotency import (
+    IDEMPOTENCY_HEADER,
+    dispatch_idempotent,
+)
+from pyispyb.app.extensions.flask_sqlalchemy.etag import NotModified
 
 
 class Resource(OriginalResource):
@@ -28,6 +36,77 @@ class Resource(OriginalResource):
             decorated_method_func = decorator(getattr(cls, method_name))
             setattr(cls, method_name, decorated_method_func)
 
+    def dispatch_request(self, *args, **kwargs):
+        """
+        Dispatches the request and adds ETag to successful GET responses.
+
+        List queries compute a fingerprint ETag before loading the items
+        (see flask_sqlalchemy.etag) and raise NotModified if the client
+        already has it. Other GET responses get an ETag computed from the
+        response body. Requests with a matching If-None-Match header are
+        answered with 304 Not Modified.
+
+        POST requests with an Idempotency-Key header are dispatched once,
+        retries get the stored response (see api.idempotency).
+        """
+        if (
+            flask.request.method == "POST"
+            and IDEMPOTENCY_HEADER in flask.request.headers
+        ):
+            return dispatch_idempotent(
+                lambda: self._make_response(
+                    super(Resource, self).dispatch_request(*args, **kwargs)
+                )
+            )
+
+        try:
+            resp = super().dispatch_request(*args, **kwargs)
+        except NotModified as ex:
+            resp = flask.Response(status=HTTPStatus.NOT_MODIFIED)
+            resp.set_etag(ex.etag, weak=True)
+            return resp
+
+        if flask.request.method not in ("GET", "HEAD"):
+            return resp
+
+        etag = getattr(flask.request, "etag", None)
+        if isinstance(resp, BaseResponse):
+            if resp.status_code != HTTPStatus.OK:
+                return resp
+            if etag:
+                resp.set_etag(etag, weak=True)
+            if resp.is_streamed:
+                # Streamed and file responses are returned as they are
+                return resp
+            if not etag:
+                resp.add_etag(weak=True)
+            return resp.make_conditional(flask.request)
+
+        data, code, headers = unpack(resp)
+        if code != HTTPStatus.OK:
+            return resp
+        resp = self.api.make_response(data, code, headers=headers)
+        if etag:
+            resp.set_etag(etag, weak=True)
+        else:
+            resp.add_etag(weak=True)
+        return resp.make_conditional(flask.request)
+
+    def _make_response(self, resp):
+        """
+        Returns flask response of the resource method result.
+
+        Args:
+            resp ([type]): response, data or (data, code, headers) tuple
+
+        Returns:
+            flask.Response: response
+        """
+        if isinstance(resp, BaseResponse):
+            return resp
+        data, code, headers = unpack(resp)
+        return self.api.make_response(data, code, headers=headers)
+
     def options(self, *args, **kwargs):
         """
         Check which methods are allowed.
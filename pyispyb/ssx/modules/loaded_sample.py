@@ -45,6 +45,7 @@ def get_loaded_samples(request):
             schemas.loaded_sample.dict_schema,
             schemas.loaded_sample.ma_schema,
             query_dict,
+            negotiate=True,
         ),
         HTTPStatus.OK,
     )
@@ -194,6 +195,7 @@ def get_sample_delivery_devices(request):
             schemas.sample_delivery_device.f_schema,
             schemas.sample_delivery_device.ma_schema,
             query_dict,
+            negotiate=True,
         ),
         HTTPStatus.OK,
     )
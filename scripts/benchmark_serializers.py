@@ -0,0 +1,107 @@
+# encoding: utf-8
+#
+#  Project: py-ispyb
+#  https://github.com/ispyb/py-ispyb
+#
+#  This file is part of py-ispyb software.
+#
+#  py-ispyb is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  py-ispyb is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compares compiled row serializers with marshmallow dump + flask-restx marshal.
+
+Rows are built in memory, so no database is needed:
+
+    python scripts/benchmark_serializers.py [rows] [repeat]
+"""
+
+import datetime
+import os
+import sys
+import timeit
+
+ispyb_root = os.path.dirname(os.path.abspath(__file__)).split(os.sep)
+ispyb_root = "/" + os.path.join(*ispyb_root[1:-1])
+sys.path.insert(0, ispyb_root)
+
+from flask_restx import marshal
+
+from pyispyb import create_app
+
+config_path = os.getenv(
+    "ISPYB_CONFIG", os.path.join(ispyb_root, "ispyb_core_config.yml")
+)
+app = create_app(config_path, "test")
+
+from pyispyb.app.extensions.flask_sqlalchemy.serializers import get_serializer
+from pyispyb.core import models, schemas
+
+
+def make_rows(sql_alchemy_model, dict_schema, count):
+    """Returns model instances with all columns set"""
+    values = {
+        "Integer": 1,
+        "Float": 1.5,
+        "String": "value",
+        "DateTime": datetime.datetime(2020, 1, 1, 12, 30),
+        "Boolean": True,
+    }
+    columns = sql_alchemy_model.__table__.columns.keys()
+    row = {
+        key: values.get(type(field).__name__)
+        for key, field in dict_schema.items()
+        if key in columns
+    }
+    return [sql_alchemy_model(**row) for _ in range(count)]
+
+
+def benchmark(name, sql_alchemy_model, schema_module, count, repeat):
+    rows = make_rows(sql_alchemy_model, schema_module.dict_schema, count)
+    serialize = get_serializer(sql_alchemy_model, schema_module.dict_schema)
+
+    def current():
+        items = schema_module.ma_schema.dump(rows, many=True)[0]
+        return marshal(items, schema_module.f_schema)
+
+    def compiled():
+        return [serialize(row) for row in rows]
+
+    assert [dict(item) for item in current()] == compiled()
+
+    current_time = min(timeit.repeat(current, number=1, repeat=repeat))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=repeat))
+    print(
+        "%-16s %6d rows  marshmallow + marshal: %8.2f ms  compiled: %8.2f ms  (x%.1f)"
+        % (
+            name,
+            count,
+            current_time * 1000,
+            compiled_time * 1000,
+            current_time / compiled_time,
+        )
+    )
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with app.app_context():
+        benchmark(
+            "DataCollection",
+            models.DataCollection,
+            schemas.data_collection,
+            row_count,
+            repeat_count,
+        )
+        benchmark("BLSample", models.BLSample, schemas.sample, row_count, repeat_count)
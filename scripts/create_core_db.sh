@@ -7,3 +7,4 @@ mysql -u root -D pydb_test < schema/data.sql
 mysql -u root -D pydb_test < schema/routines.sql
 mysql -u root -e "CREATE USER mxuser@'localhost' IDENTIFIED BY 'mxpass';"
 mysql -u root -e "GRANT ALL ON pydb_test.* TO 'mxuser'@'localhost';"
+(cd .. && alembic -c migrations/alembic.ini upgrade head)
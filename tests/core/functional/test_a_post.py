@@ -172,6 +172,16 @@ def test_post(ispyb_core_app, ispyb_core_token):
     print("Dewar id: %d" % dewar_id)
     assert dewar_id
 
+    route = ispyb_core_app.config["API_ROOT"] + "/data_collections/groups/bulk"
+    data_collection_group_list = [
+        {"sessionId": session_id, "experimentType": "OSC"} for _ in range(3)
+    ]
+    response = client.post(route, json=data_collection_group_list, headers=headers)
+
+    assert response.status_code == 201, "[POST] %s failed" % route
+    data_collection_group_ids = response.json["data"]["rows"]
+    assert len(data_collection_group_ids) == 3 and all(data_collection_group_ids)
+
     """
     route = ispyb_core_app.config["API_ROOT"] + "/samples"
     sample_dict = data.test_sample
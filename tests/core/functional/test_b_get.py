@@ -37,6 +37,15 @@ def test_get(ispyb_core_app, ispyb_core_token):
         "/contacts/persons?login=boaty",
         "/data_collections",
         "/data_collections?offset=1&limit=1",
+        "/data_collections?after=&limit=1",
+        "/data_collections?total=estimate",
+        "/data_collections?total=none",
+        "/data_collections?fields=dataCollectionId,startTime,runStatus",
+        "/data_collections?startTime__gte=2020-01-01&resolution__lt=3.5",
+        "/data_collections?imagePrefix__startswith=ref_",
+        "/data_collections?sort=-startTime&limit=50",
+        "/data_collections?sort=-startTime&after=&limit=1",
+        "/data_collections?ids=1,2",
         "/beamline/detectors",
         "/beamline/detectors?offset=1&limit=1",
         "/beamline/detectors?detectorModel=T1",
@@ -53,6 +62,7 @@ def test_get(ispyb_core_app, ispyb_core_token):
         "/samples/crystals?offset=1&limit=1",
         "/samples/crystals?spaceGroup=P4" "/samples",
         "/samples?offset=1&limit=1",
+        "/samples?after=&limit=1",
         "/samples?holderLength=22",
     ]
 
@@ -65,3 +75,22 @@ def test_get(ispyb_core_app, ispyb_core_token):
 
         assert response.status_code == 200, "[GET] %s " % (route)
         assert data, "[GET] %s No data returned" % route
+
+    route = ispyb_core_app.config["API_ROOT"] + "/contacts/persons?limit=0"
+    response = client.get(
+        route, headers=dict(headers, Accept="application/x-ndjson")
+    )
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert response.mimetype == "application/x-ndjson"
+    assert len(lines) == int(response.headers["X-Total-Count"])
+
+    route = ispyb_core_app.config["API_ROOT"] + "/contacts/persons?limit=1"
+    person_id = client.get(route, headers=headers).json["data"]["rows"][0]["personId"]
+    route = ispyb_core_app.config["API_ROOT"] + "/contacts/persons?ids=%d,0" % person_id
+    response = client.get(route, headers=headers)
+
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert [row["personId"] for row in response.json["data"]["rows"]] == [person_id]
+    assert response.json["data"]["missing_ids"] == [0]
@@ -32,6 +32,11 @@ def test_patch(ispyb_core_app, ispyb_core_token):
     response = client.patch(route, json=mod_laboratory, headers=headers)
     assert response.status_code == 200, "[PATCH] %s failed" % (route)
 
+    minimal_headers = dict(headers, Prefer="return=minimal")
+    response = client.patch(route, json=mod_laboratory, headers=minimal_headers)
+    assert response.status_code == 204, "[PATCH] %s return=minimal failed" % (route)
+    assert response.headers["Preference-Applied"] == "return=minimal"
+
     route = ispyb_core_app.config["API_ROOT"] + "/contacts/persons"
     response = client.get(route, headers=headers)
     person_id = response.json["data"]["rows"][0]["personId"]
@@ -115,3 +120,12 @@ def test_patch(ispyb_core_app, ispyb_core_token):
 
     response = client.patch(route, json=mod_sample, headers=headers)
     assert response.status_code == 200, "[PATCH] %s failed" % (route)
+
+    route = ispyb_core_app.config["API_ROOT"] + "/samples"
+    response = client.patch(route, json=mod_sample, headers=headers)
+    assert response.status_code == 400, "[PATCH] %s without filter accepted" % (route)
+
+    route = ispyb_core_app.config["API_ROOT"] + "/samples?blSampleId=" + str(sample_id)
+    response = client.patch(route, json=mod_sample, headers=headers)
+    assert response.status_code == 200, "[PATCH] %s failed" % (route)
+    assert response.json["data"]["total"] == 1
@@ -0,0 +1,48 @@
+from flask import Flask
+
+from pyispyb.app.extensions.policy import (
+    AuthorizationPolicy,
+    validate_rules,
+)
+
+
+RULES = {
+    "proposals": {"get": ["manager", "user"], "post": ["admin"]},
+    "sessions": {"get": ["all"], "post": []},
+}
+
+
+def get_policy(endpoints=None):
+    app = Flask(__name__)
+    app.config["AUTHORIZATION_RULES"] = RULES
+    policy = AuthorizationPolicy()
+    policy.init_app(app)
+    return policy, policy.validate(endpoints or set())
+
+
+def test_is_allowed():
+    policy, _ = get_policy()
+    user = policy.get_user_mask(["user"])
+    manager = policy.get_user_mask(["manager", "unknown_role"])
+
+    assert policy.is_allowed("proposals", "get", user)
+    assert not policy.is_allowed("proposals", "post", user)
+    assert policy.is_allowed("sessions", "get", 0)
+    assert policy.is_allowed("sessions", "post", 0)
+    # Resources without rule are allowed just for managers
+    assert policy.is_allowed("proteins", "get", manager)
+    assert not policy.is_allowed("proteins", "get", user)
+    assert not policy.is_allowed("proposals", "put", user)
+
+
+def test_validate_rules():
+    _, errors = get_policy({"proposals", "sessions"})
+    assert errors == []
+    _, errors = get_policy({"proposals"})
+    assert errors == ["Authorization rule for unknown endpoint sessions"]
+
+    errors = validate_rules({"prposals": {"gte": ["user"]}}, {"proposals"})
+    assert errors == [
+        "Authorization rule for unknown endpoint prposals",
+        "Authorization rule for unknown method gte of endpoint prposals",
+    ]
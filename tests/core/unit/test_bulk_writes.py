@@ -0,0 +1,124 @@
+import flask
+from flask_restx import fields as f_fields
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+from pyispyb.app.extensions.flask_sqlalchemy.bulk_insert import (
+    get_insert_chunks,
+    get_inserted_ids,
+)
+from pyispyb.app.extensions.flask_sqlalchemy.scoping import ProposalScope
+
+
+db = SQLAlchemy()
+
+
+class Proposal(db.Model):
+    __tablename__ = "Proposal"
+    proposalId = Column(Integer, primary_key=True)
+    personId = Column(Integer)
+
+
+class ProposalHasPerson(db.Model):
+    __tablename__ = "ProposalHasPerson"
+    proposalHasPersonId = Column(Integer, primary_key=True)
+    proposalId = Column(Integer, ForeignKey("Proposal.proposalId"))
+    personId = Column(Integer)
+
+
+class Item(db.Model):
+    __tablename__ = "Item"
+    itemId = Column(Integer, primary_key=True)
+    proposalId = Column(Integer, ForeignKey("Proposal.proposalId"))
+    name = Column(String(45))
+
+
+dict_schema = {
+    "itemId": f_fields.Integer(),
+    "proposalId": f_fields.Integer(),
+    "name": f_fields.String(),
+}
+
+
+def create_app(tmp_path):
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "test.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [
+                Proposal(proposalId=1, personId=1),
+                Proposal(proposalId=2, personId=2),
+                Item(itemId=1, proposalId=1, name="mine"),
+                Item(itemId=2, proposalId=2, name="other"),
+            ]
+        )
+        db.session.commit()
+    return app
+
+
+def test_bulk_writes_are_scoped(tmp_path):
+    app = create_app(tmp_path)
+    scope = ProposalScope(1)
+
+    with app.test_request_context("/items", method="DELETE"):
+        result = db.delete_db_items(Item, dict_schema, {"proposalId": "2"}, scope)
+        assert result["data"]["total"] == 0
+        result = db.patch_db_items(
+            Item, dict_schema, {"name": "other"}, {"name": "changed"}, scope
+        )
+        assert result["data"]["total"] == 0
+        assert Item.query.get(2).name == "other"
+
+        result = db.delete_db_items(Item, dict_schema, {"proposalId": "1"}, scope)
+        assert result["data"]["total"] == 1
+        # Admins pass no scope
+        result = db.delete_db_items(Item, dict_schema, {"proposalId": "2"})
+        assert result["data"]["total"] == 1
+        db.session.remove()
+
+
+def test_get_insert_chunks():
+    rows = [{"a": 1}, {"a": 2}, {"a": 3}, {"a": 4, "b": 1}]
+    assert list(get_insert_chunks(rows, 2)) == [
+        [{"a": 1}, {"a": 2}],
+        [{"a": 3}],
+        [{"a": 4, "b": 1}],
+    ]
+    assert get_inserted_ids("mysql", 10, 3) == [10, 11, 12]
+    assert get_inserted_ids("sqlite", 12, 3) == [10, 11, 12]
+
+
+def test_bulk_insert_in_chunks(tmp_path):
+    import sqlalchemy
+
+    app = create_app(tmp_path)
+    app.config["BULK_INSERT_CHUNK_SIZE"] = 1000
+    statements = []
+
+    with app.test_request_context("/items", method="POST"):
+        sqlalchemy.event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        data_list = [{"proposalId": 1, "name": "item%d" % i} for i in range(2500)]
+        result, status = db.add_db_items(Item, data_list)
+        assert status == 201
+        inserts = [statement for statement in statements if "INSERT" in statement]
+        assert len(inserts) == 3
+
+        ids = result["data"]["rows"]
+        assert len(ids) == 2500
+        assert [Item.query.get(item_id).name for item_id in ids[::500]] == [
+            "item%d" % i for i in range(0, 2500, 500)
+        ]
+
+        # Explicit ids are returned as sent
+        result, _ = db.add_db_items(Item, [{"itemId": 9000, "name": "x"}])
+        assert result["data"]["rows"] == [9000]
+        db.session.remove()
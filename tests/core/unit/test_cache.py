@@ -0,0 +1,42 @@
+import time
+
+import flask
+
+from pyispyb.app.extensions.cache import Cache, TTLCache
+
+
+def test_ttl_cache():
+    cache = TTLCache(ttl=0.05, maxsize=2)
+    cache.set("a", 1)
+    assert cache.setdefault("a", 2) == 1
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert len(cache) == 2
+    assert cache.pop("b") == 2
+
+    time.sleep(0.06)
+    assert cache.get("c", "expired") == "expired"
+
+
+def test_ttl_cache_entry_ttl():
+    cache = TTLCache(ttl=60)
+    cache.set("token", {"sub": "user"}, ttl=0.01)
+    cache.set("login", {"person_id": 1}, ttl=120)
+    time.sleep(0.02)
+    assert cache.get("token") is None
+    assert cache.get("login") == {"person_id": 1}
+
+
+def test_ttl_cache_add():
+    cache = TTLCache(ttl=60)
+    assert cache.add("key", 1)
+    assert not cache.add("key", 2)
+    assert cache.get("key") == 1
+
+
+def test_memory_ttl():
+    cache = Cache()
+    cache.init_app(flask.Flask(__name__))
+    assert cache.get_cache("users", 300, memory_ttl=5).ttl == 5
+    assert cache.get_cache("tokens", 300).ttl == 300
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from pyispyb.app.extensions.authentication.connection_pool import (
+    ConnectionPool,
+    PoolTimeout,
+)
+
+
+def test_connections_are_reused():
+    connections = []
+    closed = []
+
+    def connect():
+        connections.append(object())
+        return connections[-1]
+
+    pool = ConnectionPool(connect, size=2, timeout=1, close=closed.append)
+    with pool.connection() as conn:
+        pass
+    with pool.connection() as same_conn:
+        assert same_conn is conn
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError()
+    # Connection that raised is discarded
+    assert closed == [conn]
+    with pool.connection():
+        pass
+    assert len(connections) == 2
+
+
+def test_concurrency_is_bounded():
+    pool = ConnectionPool(object, size=2, timeout=0.05)
+    in_use = []
+    max_in_use = []
+    lock = threading.Lock()
+
+    def login():
+        with pool.connection():
+            with lock:
+                in_use.append(1)
+                max_in_use.append(len(in_use))
+            time.sleep(0.01)
+            with lock:
+                in_use.pop()
+
+    pool.timeout = 5
+    threads = [threading.Thread(target=login) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(max_in_use) <= 2
+
+    pool.timeout = 0.05
+    with pool.connection(), pool.connection():
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
@@ -0,0 +1,165 @@
+import flask
+import pytest
+
+from pyispyb.app.extensions.flask_sqlalchemy.etag import (
+    NotModified,
+    check_etag,
+    make_etag,
+)
+
+
+def test_make_etag():
+    assert make_etag("/samples", 1, (5, 10)) == make_etag("/samples", 1, (5, 10))
+    assert make_etag("/samples", 1, (5, 10)) != make_etag("/samples", 2, (5, 10))
+
+
+def test_check_etag():
+    app = flask.Flask(__name__)
+    etag = make_etag("/samples")
+
+    with app.test_request_context("/samples"):
+        check_etag(etag)
+        assert flask.request.etag == etag
+
+    with app.test_request_context(
+        "/samples", headers={"If-None-Match": 'W/"%s"' % etag}
+    ):
+        with pytest.raises(NotModified) as ex:
+            check_etag(etag)
+        assert ex.value.etag == etag
+
+
+def create_items_app(tmp_path, version_columns, checksum_tables=()):
+    from flask_restx import fields as f_fields
+    from marshmallow import Schema, fields as ma_fields
+    from sqlalchemy import Column, DateTime, Integer, String
+
+    from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+    from flask_restx import Api
+
+    from pyispyb.flask_restx_patched import Resource
+
+    db = SQLAlchemy()
+
+    class Item(db.Model):
+        __tablename__ = "Item"
+        itemId = Column(Integer, primary_key=True)
+        name = Column(String(45))
+        recordTimeStamp = Column(DateTime)
+
+    class ItemSchema(Schema):
+        itemId = ma_fields.Integer()
+        name = ma_fields.String()
+
+        dumps = 0
+
+        def dump(self, *args, **kwargs):
+            ItemSchema.dumps += 1
+            return super().dump(*args, **kwargs)
+
+    dict_schema = {"itemId": f_fields.Integer(), "name": f_fields.String()}
+
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "etag.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        ETAG_VERSION_COLUMNS=version_columns,
+        ETAG_CHECKSUM_TABLES=list(checksum_tables),
+    )
+    db.init_app(app)
+    api = Api(app)
+
+    class Items(Resource):
+        def get(self):
+            return db.get_db_items(
+                Item, dict_schema, ItemSchema(), {}, negotiate=True
+            )
+
+    api.add_resource(Items, "/items")
+
+    with app.app_context():
+        db.create_all()
+        db.engine.execute(Item.__table__.insert(), itemId=1, name="a")
+    app.item_schema = ItemSchema
+    return app, db, Item
+
+
+def test_etag_changes_after_external_update(tmp_path):
+    # recordTimeStamp is set on insert only, so it is not a version column
+    app, db, Item = create_items_app(tmp_path, {})
+    client = app.test_client()
+
+    etag = client.get("/items").headers["ETag"]
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Update done by another process, not by the db helpers
+    with app.app_context():
+        db.engine.execute(Item.__table__.update().values(name="b"))
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json["data"]["rows"] == [{"itemId": 1, "name": "b"}]
+
+
+def test_etag_from_version_column(tmp_path):
+    import datetime
+
+    app, db, Item = create_items_app(tmp_path, {"Item": "recordTimeStamp"})
+    client = app.test_client()
+
+    etag = client.get("/items").headers["ETag"]
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    with app.app_context():
+        db.engine.execute(
+            Item.__table__.update().values(
+                name="b", recordTimeStamp=datetime.datetime(2021, 1, 1)
+            )
+        )
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_etag_from_checksum_skips_serialization(tmp_path):
+    app, db, Item = create_items_app(tmp_path, {}, ["Item"])
+    client = app.test_client()
+
+    etag = client.get("/items").headers["ETag"]
+    dumps = app.item_schema.dumps
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    # The items were neither loaded nor serialized
+    assert app.item_schema.dumps == dumps
+
+    # Update without version column done by another process
+    with app.app_context():
+        db.engine.execute(Item.__table__.update().values(name="b"))
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json["data"]["rows"] == [{"itemId": 1, "name": "b"}]
+
+
+def test_negotiated_formats_vary_on_accept(tmp_path):
+    app, db, Item = create_items_app(tmp_path, {})
+    app.config["STREAM_CHUNK_SIZE"] = 100
+    client = app.test_client()
+
+    for mimetype in (
+        "application/json",
+        "application/x-ndjson",
+        "application/vnd.ispyb.columns+json",
+    ):
+        response = client.get("/items", headers={"Accept": mimetype})
+        assert response.status_code == 200
+        assert response.mimetype == mimetype
+        assert "Accept" in response.vary
+
+    headers = {"Accept": "application/vnd.ispyb.columns+json"}
+    response = client.get("/items", headers=headers)
+    assert response.json["data"]["rows"] == {"itemId": [1], "name": ["a"]}
+    headers["If-None-Match"] = response.headers["ETag"]
+    response = client.get("/items", headers=headers)
+    assert response.status_code == 304
+    assert "Accept" in response.vary
@@ -0,0 +1,83 @@
+import datetime
+
+import pytest
+import sqlalchemy
+from flask_restx import fields as f_fields
+
+from pyispyb.app.extensions.flask_sqlalchemy.filters import (
+    convert_value,
+    get_filter_clause,
+    parse_filter_key,
+)
+
+
+dict_schema = {
+    "startTime": f_fields.DateTime(),
+    "resolution": f_fields.Float(),
+    "imagePrefix": f_fields.String(),
+}
+
+
+def compile_clause(clause):
+    return str(clause.compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_parse_filter_key():
+    assert parse_filter_key("resolution", dict_schema) == ("resolution", None)
+    assert parse_filter_key("resolution__lt", dict_schema) == ("resolution", "lt")
+    assert parse_filter_key("unknown__lt", dict_schema) is None
+    assert parse_filter_key("limit", dict_schema) is None
+    # Known column with a misspelled operator is not silently ignored
+    with pytest.raises(ValueError):
+        parse_filter_key("resolution__gtt", dict_schema)
+
+
+def test_convert_value():
+    assert convert_value(dict_schema["resolution"], "1.5") == 1.5
+    assert convert_value(
+        dict_schema["startTime"], "20200102"
+    ) == datetime.datetime(2020, 1, 2)
+    with pytest.raises(ValueError):
+        convert_value(dict_schema["startTime"], "yesterday")
+
+
+def test_filter_clause():
+    column = sqlalchemy.column("imagePrefix")
+    clause = get_filter_clause(
+        column, dict_schema["imagePrefix"], "startswith", "ref_10%"
+    )
+    assert compile_clause(clause) == "\"imagePrefix\" LIKE 'ref\\_10\\%%' ESCAPE '\\'"
+
+    column = sqlalchemy.column("resolution")
+    clause = get_filter_clause(column, dict_schema["resolution"], "between", "1,2.5")
+    assert compile_clause(clause) == "resolution BETWEEN 1.0 AND 2.5"
+    with pytest.raises(ValueError):
+        get_filter_clause(column, dict_schema["resolution"], "between", "1")
+    with pytest.raises(ValueError):
+        get_filter_clause(column, dict_schema["resolution"], "startswith", "1")
+
+
+def test_unknown_operator_is_rejected(tmp_path):
+    import flask
+    from werkzeug.exceptions import BadRequest
+
+    from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+
+    db = SQLAlchemy()
+
+    class Item(db.Model):
+        __tablename__ = "Item"
+        itemId = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "filters.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    item_schema = {"itemId": f_fields.Integer()}
+
+    with app.test_request_context("/items"):
+        db.create_all()
+        with pytest.raises(BadRequest):
+            db.get_db_items(Item, item_schema, None, {"itemId__gtt": "3"})
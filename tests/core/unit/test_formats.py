@@ -0,0 +1,34 @@
+import datetime
+import decimal
+
+import pytest
+
+from pyispyb.app.extensions.flask_sqlalchemy.formats import (
+    columns_to_arrow_stream,
+    columns_to_json,
+)
+
+
+columns = {
+    "dataCollectionId": [1, 2],
+    "startTime": [datetime.datetime(2020, 1, 2, 10, 30), None],
+    "resolution": [decimal.Decimal("1.5"), 2.0],
+}
+
+
+def test_columns_to_json():
+    assert columns_to_json(dict(columns)) == {
+        "dataCollectionId": [1, 2],
+        "startTime": ["2020-01-02T10:30:00+00:00", None],
+        "resolution": [1.5, 2.0],
+    }
+
+
+def test_columns_to_arrow_stream():
+    pyarrow = pytest.importorskip("pyarrow")
+
+    data = columns_to_arrow_stream({"dataCollectionId": [1, 2], "runStatus": ["a", None]})
+    table = pyarrow.ipc.open_stream(data).read_all()
+
+    assert table.column_names == ["dataCollectionId", "runStatus"]
+    assert table.to_pydict() == {"dataCollectionId": [1, 2], "runStatus": ["a", None]}
@@ -0,0 +1,48 @@
+import json
+
+import flask
+import pytest
+from werkzeug.exceptions import HTTPException
+
+from pyispyb.app.extensions.api.idempotency import (
+    REPLAYED_HEADER,
+    dispatch_idempotent,
+    get_idempotency_cache,
+)
+from pyispyb.app.extensions.cache import cache
+
+
+def test_dispatch_idempotent():
+    app = flask.Flask(__name__)
+    cache.init_app(app)
+    calls = []
+
+    def dispatch():
+        calls.append(1)
+        return flask.jsonify({"id": len(calls)})
+
+    def post(data):
+        return app.test_request_context(
+            "/items",
+            method="POST",
+            data=data,
+            headers={"Idempotency-Key": "abc", "Authorization": "Bearer token"},
+        )
+
+    with post("{}"):
+        first = dispatch_idempotent(dispatch)
+        # Entries are JSON, so they can be shared in Redis
+        responses = get_idempotency_cache()
+        (entry,) = [value for _, value in responses._entries.values()]
+        assert json.loads(json.dumps(entry)) == entry
+    with post("{}"):
+        replayed = dispatch_idempotent(dispatch)
+    assert calls == [1]
+    assert replayed.get_json() == first.get_json() == {"id": 1}
+    assert replayed.headers[REPLAYED_HEADER] == "true"
+
+    with post('{"a": 1}'):
+        with pytest.raises(HTTPException) as ex:
+            dispatch_idempotent(dispatch)
+    assert ex.value.code == 422
+    assert calls == [1]
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+
+from pyispyb.app.extensions.flask_sqlalchemy.index_advisor import (
+    IndexAdvisor,
+    is_column_indexed,
+    render_migration,
+)
+
+
+Base = declarative_base()
+
+
+class Container(Base):
+    __tablename__ = "Container"
+    containerId = Column(Integer, primary_key=True)
+
+
+class Sample(Base):
+    __tablename__ = "Sample"
+    __table_args__ = (Index("Sample_code_name", "code", "name"),)
+    sampleId = Column(Integer, primary_key=True)
+    containerId = Column(ForeignKey("Container.containerId"))
+    code = Column(String(45))
+    name = Column(String(45))
+    comments = Column(String(45))
+
+
+def test_is_column_indexed():
+    columns = Sample.__table__.columns
+    assert is_column_indexed(columns.sampleId)
+    assert is_column_indexed(columns.containerId)
+    assert is_column_indexed(columns.code)
+    assert not is_column_indexed(columns.name)
+    assert not is_column_indexed(columns.comments)
+
+
+def test_index_advisor():
+    advisor = IndexAdvisor()
+    advisor.record(Sample, ["name", "containerId"])
+    advisor.record(Sample, ["name", "comments", "name"])
+
+    usage = advisor.get_unindexed_usage(min_uses=2)
+    assert [(column.name, uses) for _, column, uses in usage] == [("name", 2)]
+
+    migration = render_migration(
+        [{"index_name": "ix_Sample_name", "table": "Sample", "column": "name"}], "abc"
+    )
+    assert "op.create_index('ix_Sample_name', 'Sample', ['name'])" in migration
+    assert "op.drop_index('ix_Sample_name', table_name='Sample')" in migration
+    assert "down_revision = 'abc'" in migration
+    compile(migration, "migration", "exec")
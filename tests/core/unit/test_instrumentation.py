@@ -0,0 +1,43 @@
+import flask
+
+from pyispyb.app.extensions.flask_sqlalchemy.instrumentation import (
+    RequestStats,
+    add_server_timing,
+    get_statement_shape,
+)
+
+
+def test_get_statement_shape():
+    assert get_statement_shape(
+        "SELECT * FROM Protein\n WHERE proposalId IN (?, ?, ?)"
+    ) == get_statement_shape("SELECT * FROM Protein WHERE proposalId IN (?, ?)")
+    assert get_statement_shape(
+        "SELECT * FROM Protein WHERE proposalId IN (%s, %s)"
+    ) == "SELECT * FROM Protein WHERE proposalId IN (?)"
+
+
+def test_request_stats():
+    stats = RequestStats()
+    for _ in range(3):
+        stats.add("SELECT * FROM Protein WHERE proposalId = ?", 0.01)
+    stats.add("SELECT * FROM Person WHERE personId = ?", 0.02)
+
+    assert stats.count == 4
+    assert stats.get_repeated_shapes(2) == [
+        ("SELECT * FROM Protein WHERE proposalId = ?", 3)
+    ]
+    assert stats.get_server_timing() == 'db;dur=50.0;desc="4 queries"'
+
+
+def test_server_timing_skips_streamed_responses():
+    app = flask.Flask(__name__)
+
+    with app.test_request_context("/items"):
+        flask.request.db_stats = RequestStats()
+        flask.request.db_stats.add("SELECT * FROM Protein", 0.01)
+
+        response = add_server_timing(flask.Response("[]"))
+        assert response.headers["Server-Timing"] == 'db;dur=10.0;desc="1 queries"'
+
+        response = add_server_timing(flask.Response(iter(["{}\n"])))
+        assert "Server-Timing" not in response.headers
@@ -0,0 +1,62 @@
+import flask
+import sqlalchemy
+from marshmallow import Schema, fields as ma_fields
+from sqlalchemy import Column, Integer, String
+
+from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+
+
+db = SQLAlchemy()
+
+
+class Item(db.Model):
+    __tablename__ = "Item"
+    itemId = Column(Integer, primary_key=True)
+    name = Column(String(45))
+
+
+class ItemSchema(Schema):
+    itemId = ma_fields.Integer()
+    name = ma_fields.String()
+
+
+ma_schema = ItemSchema()
+
+
+def create_app(tmp_path):
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "items.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine)
+        db.engine.execute(Item.__table__.insert(), itemId=1, name="old")
+    return app
+
+
+def test_item_memo_is_dropped_on_patch(tmp_path):
+    app = create_app(tmp_path)
+
+    with app.test_request_context("/items/1", method="PATCH"):
+        selects = []
+
+        def count_selects(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        sqlalchemy.event.listen(db.engine, "before_cursor_execute", count_selects)
+        try:
+            assert db.get_db_item(Item, ma_schema, {"itemId": 1})["name"] == "old"
+            assert db.get_db_item(Item, ma_schema, {"itemId": 1})["name"] == "old"
+            assert len(selects) == 1
+
+            db.patch_db_item(Item, ma_schema, {"itemId": 1}, {"name": "new"})
+            del selects[:]
+
+            assert db.get_db_item(Item, ma_schema, {"itemId": 1})["name"] == "new"
+            assert len(selects) == 1
+        finally:
+            sqlalchemy.event.remove(db.engine, "before_cursor_execute", count_selects)
+            db.session.remove()
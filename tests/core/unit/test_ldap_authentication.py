@@ -0,0 +1,91 @@
+import flask
+import pytest
+from flask import Flask
+
+ldap = pytest.importorskip("ldap")
+
+from pyispyb.app.extensions.authentication import LdapAuthentication as ldap_auth
+from pyispyb.app.extensions.cache import cache
+
+
+class FakeLdapServer:
+    """Accepts simple binds of the users in entries."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.binds = []
+        self.connections = 0
+
+    def initialize(self, uri):
+        self.connections += 1
+        return FakeLdapConnection(self)
+
+
+class FakeLdapConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def set_option(self, option, value):
+        pass
+
+    def simple_bind_s(self, dn, password):
+        self.server.binds.append(dn)
+        if self.server.entries.get(dn) != password:
+            raise ldap.INVALID_CREDENTIALS({"desc": "Invalid credentials"})
+
+    def unbind_s(self):
+        pass
+
+
+@pytest.fixture
+def ldap_app(monkeypatch):
+    server = FakeLdapServer(
+        {
+            "uid=staff,ou=internal": "secret",
+            "uid=visitor,ou=external": "secret",
+        }
+    )
+    monkeypatch.setattr(ldap_auth.ldap, "initialize", server.initialize)
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY="key",
+        LDAP_URI="ldap://localhost",
+        LDAP_BASE_INTERNAL="ou=internal",
+        LDAP_BASE_EXTERNAL="ou=external",
+    )
+    cache.init_app(app)
+    authentication = ldap_auth.LdapAuthentication()
+    authentication.init_app(app)
+    with app.app_context():
+        yield authentication, server
+
+
+def test_get_roles(ldap_app):
+    authentication, server = ldap_app
+
+    assert authentication.get_roles("staff", "secret") == ["manager"]
+    assert authentication.get_roles("visitor", "secret") == ["user"]
+    assert authentication.get_roles("visitor", "wrong") == []
+    assert authentication.get_roles("visitor", "") == []
+    # One connection is reused by the logins
+    assert server.connections == 1
+
+
+def test_roles_are_cached(ldap_app):
+    authentication, server = ldap_app
+
+    assert authentication.get_roles("staff", "secret") == ["manager"]
+    assert authentication.get_roles("unknown", "secret") == []
+    binds = len(server.binds)
+    assert authentication.get_roles("staff", "secret") == ["manager"]
+    assert authentication.get_roles("unknown", "secret") == []
+    assert len(server.binds) == binds
+
+
+def test_bytes_secret_key(ldap_app):
+    authentication, _ = ldap_app
+    # Default SECRET_KEY of BaseConfig is os.urandom(16)
+    flask.current_app.config["SECRET_KEY"] = b"\x00\xffkey"
+
+    assert authentication.get_roles("staff", "secret") == ["manager"]
+    assert authentication.get_roles("staff", "secret") == ["manager"]
@@ -0,0 +1,45 @@
+import datetime
+import decimal
+
+import pytest
+import sqlalchemy
+
+from pyispyb.app.extensions.flask_sqlalchemy.pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+def test_cursor_round_trip():
+    values = [
+        12,
+        "tlys_jan_4",
+        datetime.datetime(2016, 1, 14, 12, 40, 34),
+        datetime.date(2016, 1, 14),
+        decimal.Decimal("1.25"),
+        None,
+    ]
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == values
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([{"unknown": 1}]))
+    for value in ({"dt": 5}, {"d": "2016"}, {"dec": []}, {"dec": "x"}):
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor([value]))
+
+
+def test_keyset_filter_with_null():
+    start_time = sqlalchemy.column("startTime")
+    item_id = sqlalchemy.column("dataCollectionId")
+    clause = keyset_filter([(start_time, True), (item_id, False)], [None, 3])
+
+    compiled = str(clause.compile(compile_kwargs={"literal_binds": True}))
+    assert compiled == '"startTime" IS NULL AND "dataCollectionId" > 3'
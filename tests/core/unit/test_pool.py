@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import exc
+
+from pyispyb.app.extensions.flask_sqlalchemy.pool import (
+    InstrumentedQueuePool,
+    get_pool_status,
+)
+
+
+def test_instrumented_queue_pool():
+    pool = InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.1
+    )
+    connection = pool.connect()
+
+    status = get_pool_status(pool)
+    assert status["checked_out"] == 1
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 0
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    connection.close()
+
+    status = get_pool_status(pool)
+    assert status["checked_out"] == 0
+    assert status["timeouts"] == 1
+    assert status["waits"] == 1
+    assert status["max_wait_time"] >= 0.1
+
+
+def test_connect_time_is_not_a_wait():
+    def connect():
+        time.sleep(0.05)
+        return sqlite3.connect(":memory:")
+
+    pool = InstrumentedQueuePool(connect, pool_size=1, max_overflow=1, timeout=0.1)
+    connections = [pool.connect(), pool.connect()]
+
+    status = get_pool_status(pool)
+    assert status["overflow"] == 1
+    assert status["connects"] == 2
+    assert status["connect_time"] >= 0.1
+    assert status["waits"] == 0
+    assert status["wait_time"] == 0.0
+    for connection in connections:
+        connection.close()
@@ -0,0 +1,101 @@
+import flask
+from flask_restx import fields as f_fields
+from marshmallow import Schema, fields as ma_fields
+from sqlalchemy import Column, Integer, String
+
+from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+
+
+db = SQLAlchemy()
+
+
+class Item(db.Model):
+    __tablename__ = "Item"
+    itemId = Column(Integer, primary_key=True)
+    name = Column(String(45))
+
+
+class ItemSchema(Schema):
+    itemId = ma_fields.Integer()
+    name = ma_fields.String()
+
+
+ma_schema = ItemSchema()
+dict_schema = {"itemId": f_fields.Integer(), "name": f_fields.String()}
+
+
+def create_app(tmp_path, max_lag=10):
+    primary_uri = "sqlite:///%s" % (tmp_path / "primary.db")
+    replica_uri = "sqlite:///%s" % (tmp_path / "replica.db")
+
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=primary_uri,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_REPLICAS=[{"uri": replica_uri, "max_lag": max_lag}],
+        REPLICA_MAX_LAG=10,
+        REPLICA_LAG_CHECK_INTERVAL=5,
+        REPLICA_STICKY_TIME=10,
+        SECRET_KEY="secret",
+    )
+    db.init_app(app)
+
+    @app.route("/items/1")
+    def get_item():
+        return get_item_name()
+
+    @app.route("/items", methods=["POST"])
+    def add_item():
+        db.add_db_item(Item, ma_schema, flask.request.json)
+        return "", 201
+
+    with app.app_context():
+        replica = db.get_replica_set().replicas[0]
+        for engine, name in ((db.engine, "primary"), (replica.engine, "replica")):
+            db.metadata.create_all(engine)
+            engine.execute(Item.__table__.insert(), itemId=1, name=name)
+    return app
+
+
+def get_item_name():
+    return db.get_db_item(Item, ma_schema, {"itemId": 1})["name"]
+
+
+def test_reads_use_replica(tmp_path):
+    app = create_app(tmp_path)
+
+    with app.test_request_context("/items/1"):
+        assert get_item_name() == "replica"
+        items = db.get_db_items(Item, dict_schema, ma_schema, {})
+        assert items["data"]["rows"] == [{"itemId": 1, "name": "replica"}]
+        db.session.remove()
+
+    with app.test_request_context("/items/1", method="PATCH"):
+        assert get_item_name() == "primary"
+        db.session.remove()
+
+
+def test_writes_stick_to_primary(tmp_path):
+    app = create_app(tmp_path)
+    writer = app.test_client()
+    reader = app.test_client()
+
+    response = writer.post("/items", json={"itemId": 2, "name": "new"})
+    assert response.status_code == 201
+    assert response.headers["X-Primary-Until"]
+
+    # Just the client which wrote reads from the primary
+    assert writer.get("/items/1").data == b"primary"
+    assert reader.get("/items/1").data == b"replica"
+    headers = {"X-Primary-Until": response.headers["X-Primary-Until"]}
+    assert reader.get("/items/1", headers=headers).data == b"primary"
+    headers = {"X-Primary-Until": "9999999999.0.forged"}
+    assert reader.get("/items/1", headers=headers).data == b"replica"
+
+
+def test_lagging_replica_is_not_used(tmp_path):
+    app = create_app(tmp_path, max_lag=-1)
+
+    with app.test_request_context("/items/1"):
+        assert get_item_name() == "primary"
+        db.session.remove()
@@ -0,0 +1,91 @@
+import sqlalchemy
+
+from pyispyb.app.extensions.flask_sqlalchemy.scoping import (
+    ProposalScope,
+    get_proposal_path,
+    get_scope_clause,
+)
+
+
+def get_metadata():
+    metadata = sqlalchemy.MetaData()
+
+    def table(name, primary_key, *columns):
+        return sqlalchemy.Table(
+            name,
+            metadata,
+            sqlalchemy.Column(primary_key, sqlalchemy.Integer, primary_key=True),
+            *columns
+        )
+
+    def column(name, foreign_key=None):
+        if foreign_key:
+            return sqlalchemy.Column(name, sqlalchemy.ForeignKey(foreign_key))
+        return sqlalchemy.Column(name, sqlalchemy.Integer)
+
+    table("Proposal", "proposalId", column("personId"))
+    table(
+        "ProposalHasPerson",
+        "proposalHasPersonId",
+        column("proposalId", "Proposal.proposalId"),
+        column("personId"),
+    )
+    table("BLSession", "sessionId", column("proposalId", "Proposal.proposalId"))
+    table(
+        "Session_has_Person",
+        "sessionId",
+        column("personId"),
+    )
+    table("Protein", "proteinId", column("proposalId", "Proposal.proposalId"))
+    table("Crystal", "crystalId", column("proteinId", "Protein.proteinId"))
+    table("BLSample", "blSampleId", column("crystalId", "Crystal.crystalId"))
+    return metadata
+
+
+def test_proposal_path():
+    metadata = get_metadata()
+    path = get_proposal_path(metadata.tables["BLSample"])
+    assert [str(foreign_key.parent) for foreign_key in path] == [
+        "BLSample.crystalId",
+        "Crystal.proteinId",
+    ]
+    assert get_proposal_path(metadata.tables["Protein"]) == []
+    assert get_proposal_path(metadata.tables["Session_has_Person"]) is None
+
+
+def test_scope_clause():
+    metadata = get_metadata()
+    engine = sqlalchemy.create_engine("sqlite://")
+    metadata.create_all(engine)
+    tables = metadata.tables
+
+    def insert(table_name, *rows):
+        engine.execute(tables[table_name].insert(), list(rows))
+
+    insert(
+        "Proposal",
+        {"proposalId": 1, "personId": 10},
+        {"proposalId": 2, "personId": 20},
+        {"proposalId": 3, "personId": 20},
+    )
+    insert("ProposalHasPerson", {"proposalId": 2, "personId": 10})
+    insert("BLSession", {"sessionId": 1, "proposalId": 3})
+    for item_id in (1, 2, 3):
+        insert("Protein", {"proteinId": item_id, "proposalId": item_id})
+        insert("Crystal", {"crystalId": item_id, "proteinId": item_id})
+        insert("BLSample", {"blSampleId": item_id, "crystalId": item_id})
+
+    sample = tables["BLSample"]
+
+    def get_sample_ids(scope):
+        query = sqlalchemy.select([sample.c.blSampleId]).where(
+            get_scope_clause(sample, scope)
+        )
+        return sorted(row[0] for row in engine.execute(query))
+
+    assert get_sample_ids(ProposalScope(10)) == [1, 2]
+    assert get_sample_ids(ProposalScope(20)) == [2, 3]
+    assert get_sample_ids(ProposalScope(None)) == []
+
+    insert("Session_has_Person", {"sessionId": 1, "personId": 10})
+    assert get_sample_ids(ProposalScope(10)) == [1, 2, 3]
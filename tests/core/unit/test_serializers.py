@@ -0,0 +1,111 @@
+import datetime
+
+from flask_restx import fields as f_fields
+from flask_restx import marshal
+from marshmallow import Schema, fields as ma_fields
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+
+from pyispyb.app.extensions.flask_sqlalchemy.serializers import (
+    compile_serializer,
+    get_serializer,
+)
+
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "Item"
+    itemId = Column(Integer, primary_key=True)
+    name = Column(String(45))
+    resolution = Column(Float)
+    startTime = Column(DateTime)
+
+
+dict_schema = {
+    "itemId": f_fields.Integer(),
+    "name": f_fields.String(),
+    "resolution": f_fields.Float(),
+    "startTime": f_fields.DateTime(),
+    "comments": f_fields.String(),
+}
+
+
+class ItemSchema(Schema):
+    itemId = ma_fields.Integer()
+    name = ma_fields.String()
+    resolution = ma_fields.Float()
+    startTime = ma_fields.DateTime()
+    comments = ma_fields.String()
+
+
+def test_compile_serializer_matches_marshalling():
+    serialize = compile_serializer(Item, dict_schema)
+    for item in (
+        Item(
+            itemId=1,
+            name="a",
+            resolution=1.5,
+            startTime=datetime.datetime(2020, 1, 2, 3, 4, 5),
+        ),
+        Item(itemId=2, startTime=datetime.datetime(2020, 1, 2, 3, 4, 5, 123)),
+        Item(itemId=3),
+    ):
+        expected = dict(marshal(ItemSchema().dump(item)[0], dict_schema))
+        assert serialize(item) == expected
+
+
+def test_get_serializer_fields():
+    serialize = get_serializer(Item, dict_schema, ("itemId", "name"))
+
+    item = Item(itemId=1, name="a", resolution=1.5)
+    assert serialize(item) == {"itemId": 1, "name": "a"}
+    assert get_serializer(Item, dict_schema, ("itemId", "name")) is serialize
+
+
+def test_get_db_items_compiled_opt_in(tmp_path):
+    import flask
+
+    from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+
+    db = SQLAlchemy()
+
+    class Sample(db.Model):
+        __tablename__ = "Sample"
+        sampleId = Column(Integer, primary_key=True)
+        name = Column(String(45))
+
+    class SampleSchema(Schema):
+        sampleId = ma_fields.Integer()
+        name = ma_fields.Method("get_name")
+
+        def get_name(self, obj):
+            return obj.name.upper()
+
+    sample_dict_schema = {"sampleId": f_fields.Integer(), "name": f_fields.String()}
+
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "items.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.engine.execute(Sample.__table__.insert(), sampleId=1, name="a")
+
+    with app.test_request_context("/samples"):
+        result = db.get_db_items(Sample, sample_dict_schema, SampleSchema(), {})
+        assert result["data"]["rows"] == [{"sampleId": 1, "name": "A"}]
+
+        result = db.get_db_items(
+            Sample, sample_dict_schema, SampleSchema(), {}, compiled=True
+        )
+        assert result["data"]["rows"] == [{"sampleId": 1, "name": "a"}]
+
+        result = db.get_db_items(
+            Sample, sample_dict_schema, SampleSchema(), {"fields": "name"}
+        )
+        assert result["data"]["rows"] == [{"name": "A"}]
@@ -0,0 +1,25 @@
+import json
+
+import sqlalchemy
+
+from pyispyb.app.extensions.flask_sqlalchemy.slow_queries import SlowQueryLog
+
+
+def test_slow_query_log(tmp_path):
+    log_path = tmp_path / "slow_queries.log"
+    slow_query_log = SlowQueryLog(0.5, history_size=2, log_path=str(log_path))
+    engine = sqlalchemy.create_engine("sqlite://")
+    statement = "SELECT * FROM sqlite_master WHERE name = ?"
+
+    with engine.connect() as connection:
+        slow_query_log.add(connection, statement, ("Item",), None, False, 0.1)
+        assert slow_query_log.get_records() == []
+
+        slow_query_log.add(connection, statement, ("Item",), None, False, 1.0)
+
+    record = slow_query_log.get_records()[0]
+    assert record["statement"] == statement
+    assert record["parameters"] == ["Item"]
+    assert record["endpoint"] is None
+    assert isinstance(record["explain"], list) and record["explain"]
+    assert json.loads(log_path.read_text().splitlines()[0]) == record
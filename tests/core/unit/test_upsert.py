@@ -0,0 +1,79 @@
+import sqlalchemy
+from sqlalchemy.dialects import mysql
+
+from pyispyb.app.extensions.flask_sqlalchemy.upsert import (
+    get_unique_keys,
+    get_upsert_statement,
+)
+
+
+def get_table():
+    metadata = sqlalchemy.MetaData()
+    return sqlalchemy.Table(
+        "Statistics",
+        metadata,
+        sqlalchemy.Column("statisticsId", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("scalingId", sqlalchemy.Integer),
+        sqlalchemy.Column("type", sqlalchemy.String(20)),
+        sqlalchemy.Column("completeness", sqlalchemy.Float),
+        sqlalchemy.UniqueConstraint("scalingId", "type"),
+    )
+
+
+def test_sqlite_upsert():
+    table = get_table()
+    engine = sqlalchemy.create_engine("sqlite://")
+    table.metadata.create_all(engine)
+    natural_key = ["scalingId", "type"]
+    assert frozenset(natural_key) in get_unique_keys(engine, "Statistics")
+
+    for completeness in (90.0, 99.5):
+        values = {"scalingId": 1, "type": "overall", "completeness": completeness}
+        engine.execute(get_upsert_statement("sqlite", table, values, natural_key))
+
+    rows = engine.execute(table.select()).fetchall()
+    assert [(row.statisticsId, row.completeness) for row in rows] == [(1, 99.5)]
+
+
+def test_mysql_upsert():
+    table = get_table()
+    values = {"scalingId": 1, "type": "overall", "completeness": 90.0}
+    statement = get_upsert_statement("mysql", table, values, ["scalingId", "type"])
+    sql = str(statement.compile(dialect=mysql.dialect()))
+    assert "ON DUPLICATE KEY UPDATE completeness = VALUES(completeness)" in sql
+
+
+def test_check_unique_keys(tmp_path):
+    import flask
+
+    from pyispyb.app.extensions.flask_sqlalchemy import SQLAlchemy
+
+    db = SQLAlchemy()
+
+    class Statistics(db.Model):
+        __tablename__ = "Statistics"
+        statisticsId = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+        scalingId = sqlalchemy.Column(sqlalchemy.Integer)
+        type = sqlalchemy.Column(sqlalchemy.String(20))
+
+    app = flask.Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///%s" % (tmp_path / "upsert.db"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    # Missing indexes do not prevent the app from starting
+    missing = db.check_unique_keys(app, [(Statistics, ("scalingId", "type"))])
+    assert missing == ["Statistics (scalingId, type)"]
+    assert db.check_unique_keys(app, [(Statistics, ("statisticsId",))]) == []
+
+    # An index created later is found without restarting
+    with app.app_context():
+        db.engine.execute(
+            "CREATE UNIQUE INDEX Statistics_naturalKey "
+            "ON Statistics (scalingId, type)"
+        )
+    assert db.check_unique_keys(app, [(Statistics, ("scalingId", "type"))]) == []
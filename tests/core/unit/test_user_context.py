@@ -0,0 +1,133 @@
+import datetime
+
+import flask
+import pytest
+
+from pyispyb import create_app
+
+
+CONFIG = """server:
+    SERVICE_NAME : "core"
+    API_ROOT : "/ispyb/api/v1"
+    SQLALCHEMY_DATABASE_URI : "sqlite:///%s"
+    AUTH_MODULE : "pyispyb.app.extensions.authentication.DummyAuthentication"
+    AUTH_CLASS : "DummyAuthentication"
+    MASTER_TOKEN : "MasterToken"
+"""
+
+
+def add(db, item):
+    # Fills the required columns the test does not care about
+    for column in item.__table__.columns:
+        if column.nullable or column.primary_key:
+            continue
+        if getattr(item, column.key, None) is None:
+            type_name = type(column.type).__name__.upper()
+            if "DATE" in type_name:
+                value = datetime.datetime(2020, 1, 1)
+            elif "STRING" in type_name or "ENUM" in type_name:
+                value = "x"
+            else:
+                value = 0
+            setattr(item, column.key, value)
+    db.session.add(item)
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("user_context")
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(CONFIG % (tmp_path / "ispyb.db"))
+    app = create_app(str(config_path), "test")
+
+    from pyispyb.app.extensions import db
+    from pyispyb.core import models
+
+    with app.app_context():
+        db.metadata.create_all(
+            db.engine,
+            tables=[
+                models.Person.__table__,
+                models.Proposal.__table__,
+                models.ProposalHasPerson.__table__,
+                models.BLSession.__table__,
+                models.SessionHasPerson.__table__,
+            ],
+        )
+        add(db, models.Person(personId=1, login="bob"))
+        add(db, models.Person(personId=2, login="alice"))
+        # Main contact of 7, member of 8, session participant of 9
+        add(db, models.Proposal(proposalId=7, personId=1))
+        add(db, models.Proposal(proposalId=8, personId=2))
+        add(db, models.Proposal(proposalId=9, personId=2))
+        add(db, models.Proposal(proposalId=10, personId=2))
+        add(db, models.ProposalHasPerson(proposalHasPersonId=1, proposalId=8, personId=1))
+        add(db, models.BLSession(sessionId=1, proposalId=9))
+        add(db, models.BLSession(sessionId=2, proposalId=10))
+        add(db, models.SessionHasPerson(sessionId=1, personId=1))
+        db.session.commit()
+    return app
+
+
+def get_headers(app, username, roles):
+    from pyispyb.app.extensions.authentication import authentication_provider
+
+    with app.app_context():
+        token = authentication_provider.generate_token(username, roles)["token"]
+    return {"Authorization": "Bearer %s" % token}
+
+
+def test_user_context_is_built_once(app, monkeypatch):
+    from pyispyb.app.extensions import authentication
+    from pyispyb.core.modules import contacts
+
+    decodes = []
+    decode_token = authentication.decode_token
+    monkeypatch.setattr(
+        authentication,
+        "decode_token",
+        lambda token: decodes.append(token) or decode_token(token),
+    )
+    # Cached claims of earlier requests would hide the decoding
+    monkeypatch.setitem(app.config, "USER_CACHE_TTL", 0)
+
+    headers = get_headers(app, "carol", ["user"])
+    with app.test_request_context("/", headers=headers):
+        user = contacts.get_user_context()
+        assert contacts.get_user_context() is user
+        assert flask.request.user_info["sub"] == "carol"
+        assert user.username == "carol"
+        assert not user.is_admin
+        assert len(decodes) == 1
+
+
+def test_admin_is_not_scoped(app):
+    from pyispyb.core.modules import contacts
+
+    headers = {"Authorization": "Bearer MasterToken"}
+    with app.test_request_context("/", headers=headers):
+        assert contacts.get_user_context().is_admin
+        assert contacts.get_proposal_scope() is None
+
+
+def test_scope_includes_session_membership(app):
+    from pyispyb.app.extensions import db
+    from pyispyb.core import models, schemas
+    from pyispyb.core.modules import contacts
+
+    headers = get_headers(app, "bob", ["user"])
+    with app.test_request_context("/", headers=headers):
+        user = contacts.get_user_context()
+        assert user.person_id == 1
+        assert user.proposal_ids == [7, 8, 9]
+
+        scope = contacts.get_proposal_scope()
+        assert scope.person_id == 1
+        result = db.get_db_items(
+            models.Proposal,
+            schemas.proposal.dict_schema,
+            schemas.proposal.ma_schema,
+            {},
+            proposal_scope=scope,
+        )
+        assert [row["proposalId"] for row in result["data"]["rows"]] == [7, 8, 9]